@@ -0,0 +1,62 @@
+"""
+Memory benchmark of the RequirementRecord class
+
+Run: python benchmarks/bench_records.py [number of records]
+
+The title and detail strings are shared between the records, so the
+measure gives the footprint of the record itself (object, list slot and
+creation date), to be compared with RequirementRecord.RECORD_MEMORY_TARGET.
+"""
+
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from reqpy import Requirement, RequirementRecord  # noqa: E402
+
+TITLE = "Benchmark requirement title"
+DETAIL = "The system shall be benchmarked"
+START = datetime(2026, 1, 1)
+
+
+def measure(factory, number: int):
+    """return the memory per object (bytes) and the creation time (s)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    objects = [factory(i) for i in range(number)]
+    elapsed = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del objects
+    return memory / number, elapsed
+
+
+def main(number: int = 1_000_000):
+    record_memory, record_time = measure(
+        lambda i: RequirementRecord(TITLE, DETAIL, "VALID",
+                                    START + timedelta(seconds=i)),
+        number)
+    # pydantic objects are slower to create: use a sample
+    sample = max(number // 10, 1)
+    model_memory, model_time = measure(
+        lambda i: Requirement(title=TITLE, detail=DETAIL,
+                              validation_status="VALID",
+                              creation_date=START + timedelta(seconds=i)),
+        sample)
+
+    print(f"RequirementRecord x{number}: {record_memory:.1f} B/record"
+          f" - {record_time:.2f} s")
+    print(f"Requirement x{sample}: {model_memory:.1f} B/object"
+          f" - {model_time * number / sample:.2f} s (extrapolated)")
+    print(f"target: {RequirementRecord.RECORD_MEMORY_TARGET} B/record")
+
+    if record_memory > RequirementRecord.RECORD_MEMORY_TARGET:
+        sys.exit("memory target not reached")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
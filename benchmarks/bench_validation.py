@@ -0,0 +1,60 @@
+"""
+Micro-benchmark of the compiled validators
+
+Run: python benchmarks/bench_validation.py [number of calls]
+
+Compares the per-call cost of validateInstance and validateFileExtension
+with the checkers built once by compileInstanceValidator and
+compileExtensionValidator, and the overhead of the checkArguments
+decorator.
+"""
+
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from reqpy.utils.validation import (  # noqa: E402
+    checkArguments, compileExtensionValidator, compileInstanceValidator,
+    validateFileExtension, validateInstance)
+
+PATH = "requirements/Benchmark_requirement.yml"
+EXTENSIONS = (".yml", ".yaml")
+
+
+def plain(filepath, size):
+    return filepath
+
+
+@checkArguments(filepath=compileExtensionValidator(EXTENSIONS), size=int)
+def decorated(filepath, size):
+    return filepath
+
+
+def checked_by_hand(filepath, size):
+    validateFileExtension(filepath, EXTENSIONS)
+    validateInstance(size, int)
+    return filepath
+
+
+def main(number: int = 200_000):
+    checkInt = compileInstanceValidator((int, float))
+    checkExtension = compileExtensionValidator(EXTENSIONS)
+    cases = {
+        "validateInstance": lambda: validateInstance(3, (int, float)),
+        "compileInstanceValidator": lambda: checkInt(3),
+        "validateFileExtension":
+            lambda: validateFileExtension(PATH, EXTENSIONS),
+        "compileExtensionValidator": lambda: checkExtension(PATH),
+        "no check": lambda: plain(PATH, 3),
+        "checks in the body": lambda: checked_by_hand(PATH, 3),
+        "checkArguments": lambda: decorated(PATH, 3),
+    }
+    for name, case in cases.items():
+        duration = min(timeit.repeat(case, number=number, repeat=3))
+        print(f"{name:>26}: {duration / number * 1e9:8.0f} ns/call")
+
+
+if __name__ == "__main__":
+    main(*(int(arg) for arg in sys.argv[1:]))
@@ -4,3 +4,4 @@
 from .utils import *
 from .requirements import *
 from .database import *
+from .records import *
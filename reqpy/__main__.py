@@ -1,12 +1,277 @@
 #!/usr/bin/python
 
 
+import json
+import pathlib
+import sys
+
 import click
 
-@click.command()
+from reqpy.__settings import (DaemonSettings, FolderStructure,
+                              InterchangeSettings, MigrationSettings,
+                              QuerySettings, ReportSettings)
+from reqpy.database import ReqFolder
+from reqpy.requirements import Requirement
+from reqpy.interchange import (export_requirements, group_requirements,
+                               import_requirements)
+from reqpy.lint import RULES, lint
+from reqpy.migration import MigrationError, import_migrations, migrate
+from reqpy.query import Query, QueryError
+from reqpy.report import write_latex_report
+from reqpy.server import RequirementCache, RequirementDaemon, connect
+
+ROOTDIR_OPTION = click.option(
+    "--rootdir", type=click.Path(exists=True, file_okay=False,
+                                 path_type=pathlib.Path),
+    default=".", help="root directory of the database")
+
+
+@click.group()
+def cli():
+    """Requirements management tools based on files (Yaml)"""
+
+
+@cli.command()
 @click.option("--name",prompt="enter your name",help="fist test")
 def hello(name):
     click.echo(f"HELLO {name}")
-    
+
+
+@cli.command("export")
+@ROOTDIR_OPTION
+@click.option("--format", "format_", default="jsonl",
+              type=click.Choice(InterchangeSettings.formats),
+              help="output format")
+@click.option("--fields", default=None,
+              help="comma separated list of exported fields")
+@click.option("--output", type=click.File("w", encoding="utf-8"),
+              default="-", help="output file (default: stdout)")
+@click.option("--sort-by", default=None,
+              type=click.Choice(sorted(Requirement.__fields__)),
+              help="field of the export order (sorted out of core)")
+@click.option("--reverse", is_flag=True, help="descending order")
+@click.option("--memory-budget", type=int,
+              default=InterchangeSettings.memory_budget,
+              help="memory of the sort (bytes)")
+def export_command(rootdir, format_, fields, output, sort_by, reverse,
+                   memory_budget):
+    """Export the requirements as JSON Lines or CSV"""
+    if fields is not None:
+        fields = [field.strip() for field in fields.split(",")]
+    number = export_requirements(ReqFolder(rootdir=rootdir), output,
+                                 format_, fields, sort_by, reverse,
+                                 memory_budget)
+    click.echo(f"exported: {number}", err=True)
+
+
+@cli.command("group")
+@ROOTDIR_OPTION
+@click.option("--by", "group_by", default="validation_status",
+              type=click.Choice(sorted(Requirement.__fields__)),
+              help="field of the groups")
+@click.option("--titles", is_flag=True, help="list the titles of each group")
+@click.option("--memory-budget", type=int,
+              default=InterchangeSettings.memory_budget,
+              help="memory of the sort (bytes)")
+def group_command(rootdir, group_by, titles, memory_budget):
+    """Count the requirements per value of a field (e.g. status)"""
+    for value, rows in group_requirements(ReqFolder(rootdir=rootdir),
+                                          group_by,
+                                          memory_budget=memory_budget):
+        if titles:  # streamed, the groups are not kept in memory
+            click.echo(f"{value}:")
+            for row in rows:
+                click.echo(f"  {row['title']}")
+        else:
+            click.echo(f"{value}: {sum(1 for _ in rows)}")
+
+
+@cli.command("import")
+@click.argument("input_file", type=click.Path(exists=True, dir_okay=False,
+                                              path_type=pathlib.Path))
+@ROOTDIR_OPTION
+@click.option("--format", "format_", default=None,
+              type=click.Choice(InterchangeSettings.formats),
+              help="input format (default: from the file extension)")
+@click.option("--folder", default=FolderStructure.main_folder,
+              help="folder of the imported requirements")
+@click.option("--workers", type=int, default=None,
+              help="number of validation processes")
+def import_command(input_file, rootdir, format_, folder, workers):
+    """Import requirements from JSON Lines or CSV"""
+    if format_ is None:
+        format_ = "csv" if input_file.suffix.lower() == ".csv" else "jsonl"
+    with open(input_file, "r", encoding="utf-8", newline="") as stream:
+        result = import_requirements(ReqFolder(rootdir=rootdir), stream,
+                                     format_, folder, workers)
+    for number, error in result.errors:
+        click.echo(f"record {number}: {error}", err=True)
+    click.echo(f"imported: {len(result.files)} - " +
+               f"errors: {len(result.errors)}", err=True)
+    if result.errors:
+        sys.exit(1)
+
+
+@cli.command()
+@ROOTDIR_OPTION
+@click.option("--port", type=int, default=DaemonSettings.port,
+              help="listening port on localhost (default: any free port)")
+@click.option("--interval", type=float,
+              default=DaemonSettings.refresh_interval,
+              help="seconds between two scans of the files")
+def serve(rootdir, port, interval):
+    """Run the query daemon of a database"""
+    daemon = RequirementDaemon(ReqFolder(rootdir=rootdir),
+                               port=port, refresh_interval=interval)
+    click.echo(f"serving {len(daemon.cache)} requirements on {daemon.url}",
+               err=True)
+    daemon.serve_forever()
+
+
+def execute(rootdir: pathlib.Path, command: str, **params):
+    """Execute a query on the daemon if running, else locally"""
+    executor = connect(rootdir)
+    if executor is None:
+        executor = RequirementCache(ReqFolder(rootdir=rootdir))
+    click.echo(json.dumps(executor.execute(command, params), indent=2))
+
+
+@cli.command()
+@ROOTDIR_OPTION
+@click.argument("text")
+@click.option("--limit", type=int, default=50, help="maximum of results")
+def search(rootdir, text, limit):
+    """Search a text in the titles and details"""
+    execute(rootdir, "search", text=text, limit=limit)
+
+
+@cli.command("filter")
+@ROOTDIR_OPTION
+@click.option("--status", multiple=True, help="accepted validation status")
+@click.option("--start", default=None, help="first creation date (ISO)")
+@click.option("--end", default=None, help="last creation date (ISO)")
+def filter_command(rootdir, status, start, end):
+    """Filter by validation status and creation date"""
+    execute(rootdir, "filter", status=list(status), start=start, end=end)
+
+
+@cli.command()
+@ROOTDIR_OPTION
+@click.argument("title")
+def get(rootdir, title):
+    """Get a requirement by title"""
+    execute(rootdir, "get", title=title)
+
+
+@cli.command()
+@ROOTDIR_OPTION
+@click.argument("path")
+def validate(rootdir, path):
+    """Validate a requirement file"""
+    execute(rootdir, "validate", path=str(pathlib.Path(path).absolute()))
+
+
+@cli.command("lint")
+@ROOTDIR_OPTION
+@click.option("--rule", "rules", multiple=True,
+              type=click.Choice(sorted(RULES)),
+              help="executed rule (default: all the rules)")
+@click.option("--workers", type=int, default=None,
+              help="number of lint processes")
+@click.option("--no-cache", is_flag=True, help="ignore the cached results")
+def lint_command(rootdir, rules, workers, no_cache):
+    """Check the quality of the requirements"""
+    report = lint(ReqFolder(rootdir=rootdir), rules or None, workers,
+                  use_cache=not no_cache)
+    for issue in report.issues:
+        click.echo(f"{issue.path}: [{issue.rule}] {issue.message}")
+    click.echo(f"files: {report.files} - cached: {report.cached} - " +
+               f"issues: {len(report.issues)}", err=True)
+    for name, duration in report.timings.items():
+        click.echo(f"  {name}: {duration * 1000:.1f} ms", err=True)
+    if report.issues:
+        sys.exit(1)
+
+
+@cli.command("report")
+@click.argument("output_dir", type=click.Path(file_okay=False,
+                                              path_type=pathlib.Path))
+@ROOTDIR_OPTION
+@click.option("--title", default="Requirements", help="title of the report")
+@click.option("--chapter-size", type=int,
+              default=ReportSettings.chapter_size,
+              help="maximum number of requirements per chapter file")
+def report_command(output_dir, rootdir, title, chapter_size):
+    """Write the requirements as a LaTeX report"""
+    report = write_latex_report(ReqFolder(rootdir=rootdir), output_dir,
+                                title, chapter_size)
+    for path, error in report.errors:
+        click.echo(f"{path}: {error}", err=True)
+    click.echo(f"written: {report.requirements} - " +
+               f"chapters: {len(report.chapters)} - " +
+               f"errors: {len(report.errors)} - main: {report.main_file}",
+               err=True)
+
+
+@cli.command("migrate")
+@ROOTDIR_OPTION
+@click.option("--to", "target", type=int, default=None,
+              help="target schema version (default: latest)")
+@click.option("--workers", type=int, default=None,
+              help="number of migration processes")
+@click.option("--chunk-size", type=int,
+              default=MigrationSettings.chunk_size,
+              help="number of files migrated by a worker task")
+@click.option("--dry-run", is_flag=True,
+              help="report the changes without writing the files")
+@click.option("--module", "modules", multiple=True,
+              help="module name or Python file registering migrations " +
+              "(repeatable)")
+def migrate_command(rootdir, target, workers, chunk_size, dry_run, modules):
+    """Migrate the requirement files to a schema version"""
+    try:
+        for module in modules:
+            import_migrations(module)
+        report = migrate(ReqFolder(rootdir=rootdir), target, workers,
+                         dry_run, chunk_size)
+    except MigrationError as error:
+        raise click.ClickException(str(error))
+    for path, fields in report.changed:
+        click.echo(f"{path}: {', '.join(fields)}")
+    for path, error in report.errors:
+        click.echo(f"{path}: {error}", err=True)
+    click.echo(f"schema: {report.from_version} -> {report.to_version} - " +
+               f"files: {report.files} - changed: {len(report.changed)} - " +
+               f"errors: {len(report.errors)}" +
+               (" (dry run)" if report.dry_run else ""), err=True)
+    if report.errors:
+        sys.exit(1)
+
+
+@cli.command("query")
+@click.argument("text")
+@ROOTDIR_OPTION
+@click.option("--limit", type=int, default=QuerySettings.page_size,
+              help="maximum number of results")
+@click.option("--cursor", default=None,
+              help="cursor of the next page (given by the previous page)")
+@click.option("--explain", is_flag=True, help="print the evaluation plan")
+def query_command(text, rootdir, limit, cursor, explain):
+    """Select requirements, e.g. 'status:UNVALID and title~"brake"'"""
+    try:
+        query = Query(text)
+        if explain:
+            click.echo(query.plan.explain(), err=True)
+        page = query.page(ReqFolder(rootdir=rootdir), limit, cursor,
+                          on_error=lambda file, error: click.echo(
+                              f"{file}: {error}", err=True))
+    except QueryError as error:
+        raise click.ClickException(str(error))
+    for file, requirement in page.results:
+        click.echo(f"{file}: {requirement.title}")
+    if page.cursor is not None:
+        click.echo(f"next page: --cursor {page.cursor}", err=True)
+
+
 if __name__=="__main__":
-    hello()
\ No newline at end of file
+    cli()
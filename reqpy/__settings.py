@@ -27,3 +27,91 @@ class FolderStructure(NamedTuple):
         "requirements/info",
     )
     main_folder = "requirements"
+    metadata_folder = ".reqpy"  # folder of the database internal data
+
+
+class LayoutSettings(NamedTuple):
+    flat = "flat"  # every requirement stored directly in its folder
+    sharded = "sharded"  # requirements stored in hash prefix sub-folders
+    shard_levels = 2  # number of prefix directories
+    shard_width = 2  # number of hexadecimal characters per prefix directory
+    layout_file = "layout.yml"  # marker file stored in the metadata folder
+
+
+class IndexSettings(NamedTuple):
+    index_file = "index.npz"  # secondary indexes stored in the metadata folder
+    initial_capacity = 1024  # number of rows allocated for a new index
+
+
+class BundleSettings(NamedTuple):
+    document_start = "---\n"  # separator of the YAML documents
+    index_marker = "# reqpy-bundle-index: "  # trailer line with the offsets
+    offset_marker = "# reqpy-bundle-index-offset: "  # last line of a bundle
+
+
+class RollupSettings(NamedTuple):
+    rollup_file = "rollup.json"  # per-folder aggregates in the metadata folder
+
+
+class CoverageSettings(NamedTuple):
+    coverage_file = "coverage.npz"  # traceability matrix in metadata folder
+
+
+class EventSettings(NamedTuple):
+    changelog_file = "changelog.jsonl"  # changelog in the metadata folder
+    read_block = 4096  # bytes read at once to search the changelog
+
+
+class QuerySettings(NamedTuple):
+    page_size = 100  # default number of results of a query page
+
+
+class MigrationSettings(NamedTuple):
+    schema_file = "schema.yml"  # schema version in the metadata folder
+    checkpoint_file = "migration.json"  # progress of a running migration
+    chunk_size = 200  # number of files migrated by a worker task
+
+
+class InterchangeSettings(NamedTuple):
+    formats = ("jsonl", "csv")  # supported import/export formats
+    chunk_size = 500  # number of records validated by a worker task
+    memory_budget = 64 << 20  # memory of a sorted export (bytes)
+
+
+class DaemonSettings(NamedTuple):
+    daemon_file = "daemon.yml"  # address of the running daemon
+    host = "127.0.0.1"  # the daemon only listens on localhost
+    port = 0  # 0: port chosen by the system
+    refresh_interval = 1.0  # seconds between two scans of the files
+    timeout = 2.0  # seconds before a client request fails
+
+
+class LockSettings(NamedTuple):
+    folder_lock_file = "folder.lock"  # lock of the whole database
+
+
+class TransactionSettings(NamedTuple):
+    journal_folder = "journal"  # write-ahead journals in the metadata folder
+    journal_extension = ".jsonl"
+
+
+class LintSettings(NamedTuple):
+    cache_file = "lint_cache.json"  # lint results in the metadata folder
+    max_detail_words = 300  # maximum number of words of a detail
+    chunk_size = 64  # number of files linted by a worker task
+    read_workers = 8  # threads reading the files
+
+
+class IdSettings(NamedTuple):
+    index_file = "ids.json"  # ID index in the metadata folder
+    counter_file = "ids.counter"  # last allocated ID (and lock of the IDs)
+    bloom_bits = 1 << 16  # initial size of the title Bloom filter
+    bloom_hashes = 7  # number of hash functions of the Bloom filter
+    bits_per_title = 10  # the filter grows above this load (~1% false +)
+
+
+class ReportSettings(NamedTuple):
+    main_file = "main.tex"  # LaTeX file including the chapter files
+    chapter_folder = "chapters"  # folder of the chapter files
+    chapter_size = 500  # maximum number of requirements per chapter file
+    buffer_size = 1 << 20  # write buffer of the LaTeX files (bytes)
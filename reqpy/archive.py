@@ -0,0 +1,305 @@
+""" Read-only access to the requirements of an archived database"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import abc
+import bz2
+import gzip
+import lzma
+import tarfile
+import zipfile
+import zlib
+from pathlib import Path, PurePosixPath
+from typing import (IO, Callable, Dict, Iterable, Iterator, List, Optional,
+                    Tuple)
+import yaml
+from pydantic import ValidationError
+from .__settings import FolderStructure, RequirementFileSettings
+from .requirements import Requirement, ReqFile
+
+__all__ = [
+    "ArchiveError",
+    "ArchiveReader",
+    "ZipArchiveReader",
+    "TarArchiveReader",
+    "open_archive",
+]
+
+# magic numbers of the compressed tar streams and their seekable readers
+_TAR_COMPRESSIONS: Tuple[Tuple[bytes, Callable[[Path], IO[bytes]]], ...] = (
+    (b"\x1f\x8b", gzip.open),
+    (b"BZh", bz2.open),
+    (b"\xfd7zXZ\x00", lzma.open),
+)
+
+
+class ArchiveError(Exception):
+    # raised when an archive is not readable
+    pass
+
+
+def open_archive(path: Path) -> ArchiveReader:
+    """
+    Open an archived database (.zip, .tar, .tar.gz, .tar.bz2, .tar.xz),
+    the format being detected from the content of the file.
+
+    Args:
+        path (Path): path of the archive.
+
+    Returns:
+        ArchiveReader: the reader of the archive.
+
+    Raises:
+        ArchiveError: If the file is not a zip or tar archive.
+    """
+    path = Path(path)
+    if zipfile.is_zipfile(path):
+        return ZipArchiveReader(path)
+    if tarfile.is_tarfile(path):
+        return TarArchiveReader(path)
+    raise ArchiveError(f"The file {path} is not a zip or tar archive")
+
+
+class ArchiveReader(abc.ABC):
+    """
+    Reader of the requirements of an archived database, with the reading
+    methods of ReqFolder, without extracting the archive. The subclasses
+    implement the format specific methods.
+
+    The files are named by their path in the archive. The database root is
+    the archive root, or its single top-level folder if the requirement
+    folder is inside (e.g. baseline-1.0/requirements/...).
+
+    Usage:
+        with open_archive("baseline.tar.gz") as archive:
+            for name, requirement in archive.iter_requirements():
+                ...
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open the archive and index its members.
+
+        Args:
+            path (Path): path of the archive.
+        """
+        self.path = Path(path)
+        self._members = self._read_index()
+        self.root = _find_root(self._members)
+
+    # -------------------------- FORMAT SPECIFIC ------------------------- #
+
+    @abc.abstractmethod
+    def _read_index(self) -> Dict[str, object]:
+        """PRIVATE - location of the regular files, in archive order"""
+
+    @abc.abstractmethod
+    def read_bytes(self, name: str | PurePosixPath) -> bytes:
+        """
+        Read the content of one file of the archive.
+
+        Args:
+            name (str | PurePosixPath): path of the file in the archive.
+
+        Returns:
+            bytes: the content of the file.
+
+        Raises:
+            KeyError: If the file is not in the archive.
+        """
+
+    @abc.abstractmethod
+    def close(self):
+        """Close the archive."""
+
+    # ------------------------------ LISTING ----------------------------- #
+
+    def names(self) -> List[str]:
+        """
+        Get the paths of all the files of the archive.
+
+        Returns:
+            List[str]: the paths, in the order of the archive.
+        """
+        return list(self._members)
+
+    def get_list_of_files(self) -> List[PurePosixPath]:
+        """
+        Get the files of the requirements folder of the archive.
+
+        Returns:
+            List[PurePosixPath]: paths of the files in the archive, in the
+            order of the archive.
+        """
+        prefix = (self.root / FolderStructure.main_folder).as_posix() + "/"
+        return [PurePosixPath(name) for name in self._members
+                if name.startswith(prefix)]
+
+    def get_list_of_requirement_files(self) -> List[PurePosixPath]:
+        """
+        Get the files of the requirements folder of the archive with a
+        requirement file extension.
+
+        Returns:
+            List[PurePosixPath]: paths of the requirement files in the
+            archive, in the order of the archive.
+        """
+        return [
+            file for file in self.get_list_of_files()
+            if file.suffix in RequirementFileSettings.allowed_extensions
+        ]
+
+    # ------------------------------ READING ----------------------------- #
+
+    def read(self, name: str | PurePosixPath) -> Requirement:
+        """
+        Read one requirement of the archive.
+
+        Args:
+            name (str | PurePosixPath): path of the file in the archive.
+
+        Returns:
+            Requirement: the requirement.
+
+        Raises:
+            KeyError: If the file is not in the archive.
+        """
+        return ReqFile.from_yaml(self.read_bytes(name))
+
+    def iter_requirements(
+        self,
+        files: Optional[Iterable[str | PurePosixPath]] = None,
+        on_error: Optional[Callable[[PurePosixPath, Exception],
+                                    None]] = None,
+    ) -> Iterator[Tuple[PurePosixPath, Requirement]]:
+        """
+        Read the requirements one by one (see ReqFolder.iter_requirements).
+
+        Args:
+            files (Iterable[str | PurePosixPath] | None): the requirement
+            files, in the reading order. Defaults to all the requirement
+            files, in the order of the archive (the fastest order for the
+            compressed tar archives).
+            on_error (Callable[[PurePosixPath, Exception], None] | None):
+            called with the files which can not be read (invalid or
+            corrupted in the archive), which are skipped. If None, the
+            errors are raised.
+
+        Yields:
+            Tuple[PurePosixPath, Requirement]: the file and its requirement.
+        """
+        if files is None:
+            files = self.get_list_of_requirement_files()
+        for file in files:
+            file = PurePosixPath(file)
+            try:
+                requirement = self.read(file)
+            except (ValidationError, yaml.YAMLError, OSError, TypeError,
+                    KeyError, EOFError, zipfile.BadZipFile, zlib.error,
+                    lzma.LZMAError, tarfile.ReadError) as error:
+                # corrupted members are skipped as the invalid files
+                if on_error is None:
+                    raise
+                on_error(file, error)
+                continue
+            yield file, requirement
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def __contains__(self, name: str | PurePosixPath) -> bool:
+        return PurePosixPath(name).as_posix() in self._members
+
+    def __enter__(self) -> ArchiveReader:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+
+class ZipArchiveReader(ArchiveReader):
+    """
+    Reader of a zip archive (see ArchiveReader). The members are located
+    with the central directory and only the read members are decompressed.
+    """
+
+    def __init__(self, path: Path):
+        try:
+            self._zip = zipfile.ZipFile(path)
+        except (zipfile.BadZipFile, OSError) as error:
+            raise ArchiveError(
+                f"The archive {path} is not readable") from error
+        super().__init__(path)
+
+    def _read_index(self) -> Dict[str, zipfile.ZipInfo]:
+        return {PurePosixPath(info.filename).as_posix(): info
+                for info in self._zip.infolist() if not info.is_dir()}
+
+    def read_bytes(self, name: str | PurePosixPath) -> bytes:
+        return self._zip.read(self._members[PurePosixPath(name).as_posix()])
+
+    def close(self):
+        self._zip.close()
+
+
+class TarArchiveReader(ArchiveReader):
+    """
+    Reader of a tar archive, compressed or not (see ArchiveReader).
+
+    The members are indexed in one streaming pass (the offset and size of
+    their data). The data of an uncompressed archive are then read
+    directly. A compressed archive has no random access: the data are read
+    from a seekable decompressed stream, so reading the files in the
+    archive order (default of iter_requirements) decompresses the archive
+    once, while going backward restarts the decompression.
+    """
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        with open(path, "rb") as file:
+            magic = file.read(6)
+        opener: Callable[[Path], IO[bytes]] = open
+        for prefix, compressed_opener in _TAR_COMPRESSIONS:
+            if magic.startswith(prefix):
+                opener = compressed_opener
+        self._stream = opener(path, "rb")
+        try:
+            super().__init__(path)
+        except BaseException:
+            self._stream.close()
+            raise
+
+    def _read_index(self) -> Dict[str, Tuple[int, int]]:
+        members: Dict[str, Tuple[int, int]] = {}
+        try:
+            with tarfile.open(fileobj=self._stream, mode="r|") as tar:
+                for info in tar:
+                    if info.isfile():
+                        members[PurePosixPath(info.name).as_posix()] = (
+                            info.offset_data, info.size)
+        except (tarfile.TarError, OSError, EOFError) as error:
+            raise ArchiveError(
+                f"The archive {self.path} is not readable") from error
+        return members
+
+    def read_bytes(self, name: str | PurePosixPath) -> bytes:
+        offset, size = self._members[PurePosixPath(name).as_posix()]
+        self._stream.seek(offset)
+        return self._stream.read(size)
+
+    def close(self):
+        self._stream.close()
+
+
+def _find_root(names: Iterable[str]) -> PurePosixPath:
+    """PRIVATE - root of the database in the archive: the archive root or
+    its single top-level folder containing the requirement folder"""
+    main_folder = FolderStructure.main_folder + "/"
+    top_levels = set()
+    for name in names:
+        if name.startswith(main_folder):
+            return PurePosixPath("")
+        top_levels.add(name.split("/", 1)[0])
+    if len(top_levels) == 1:
+        return PurePosixPath(top_levels.pop())
+    return PurePosixPath("")
@@ -0,0 +1,215 @@
+""" Single file bundle of requirements with random access"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import json
+import mmap
+import os
+import secrets
+from pathlib import Path
+from typing import Dict, Iterator, List, Tuple
+import yaml
+from .__settings import BundleSettings
+from .requirements import Requirement, ReqFile
+
+__all__ = [
+    "BundleError",
+    "BundleWriter",
+    "BundleReader",
+]
+
+_ENCODING = "utf-8"
+
+
+class BundleError(Exception):
+    # raised when a bundle file is not readable
+    pass
+
+
+class BundleWriter():
+    """
+    Writer of a bundle file.
+
+    A bundle is a multi-document YAML stream (one document per requirement,
+    serialized as ReqFile does) followed by a trailer made of YAML comments
+    which gives the byte offsets of the documents:
+
+        # reqpy-bundle-index: {"documents": [[name, start, end], ...]}
+        # reqpy-bundle-index-offset: <offset of the index line>
+
+    The bundle remains a valid YAML stream for sequential readers. It is
+    written to a temporary file which replaces the bundle file once the
+    trailer is written, so a bundle file is always complete.
+
+    Usage:
+        with BundleWriter(path) as bundle:
+            bundle.add("requirements/Title.yml", requirement)
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open a temporary file next to the bundle file.
+
+        Args:
+            path (Path): path of the bundle file (overwritten on close).
+        """
+        self.path = Path(path)
+        self._tmp_path = self.path.with_name(
+            f".{self.path.name}.{secrets.token_hex(4)}.tmp")
+        self._file = open(self._tmp_path, "xb")
+        self._documents: List[Tuple[str, int, int]] = []
+        self._names: set = set()
+
+    def add(self, name: str, requirement: Requirement):
+        """
+        Append a requirement to the bundle.
+
+        Args:
+            name (str): unique name of the requirement in the bundle, e.g.
+            its file path relative to the database.
+            requirement (Requirement): the requirement.
+
+        Raises:
+            BundleError: If the name is already used.
+        """
+        if name in self._names:
+            raise BundleError(f"The name {name} is already in the bundle")
+        document = (BundleSettings.document_start +
+                    ReqFile.to_yaml(requirement)).encode(_ENCODING)
+        start = self._file.tell()
+        self._file.write(document)
+        self._documents.append((name, start, start + len(document)))
+        self._names.add(name)
+
+    def close(self):
+        """Write the trailer index and replace the bundle file."""
+        if self._file.closed:
+            return
+        try:
+            offset = self._file.tell()
+            index = json.dumps({"documents": self._documents},
+                               ensure_ascii=True)
+            self._file.write(
+                (f"{BundleSettings.index_marker}{index}\n" +
+                 f"{BundleSettings.offset_marker}{offset}\n"
+                 ).encode(_ENCODING))
+            self._file.close()
+            os.replace(self._tmp_path, self.path)
+        except BaseException:
+            self.abort()
+            raise
+
+    def abort(self):
+        """Discard the bundle: the bundle file is left unchanged."""
+        self._file.close()
+        self._tmp_path.unlink(missing_ok=True)
+
+    def __enter__(self) -> BundleWriter:
+        return self
+
+    def __exit__(self, exc_type, *args):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class BundleReader():
+    """
+    Reader of a bundle file (see BundleWriter).
+
+    The bundle is memory-mapped and only the requested documents are
+    parsed. Iterating over the reader streams all the requirements.
+
+    Usage:
+        with BundleReader(path) as bundle:
+            requirement = bundle.read("requirements/Title.yml")
+    """
+
+    def __init__(self, path: Path):
+        """
+        Open the bundle file and read its trailer index.
+
+        Args:
+            path (Path): path of the bundle file.
+
+        Raises:
+            BundleError: If the trailer index is missing or corrupted.
+        """
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0,
+                                   access=mmap.ACCESS_READ)
+        except ValueError:  # empty file
+            self._file.close()
+            raise BundleError(f"The bundle {self.path} is empty") from None
+        self._index = self._read_index()
+
+    def _read_index(self) -> Dict[str, Tuple[int, int]]:
+        """PRIVATE - parse the trailer index"""
+        marker = BundleSettings.offset_marker.encode(_ENCODING)
+        position = self._mmap.rfind(marker)
+        try:
+            if position < 0:
+                raise ValueError("missing offset")
+            offset = int(self._mmap[position + len(marker):])
+            line = self._mmap[offset:position].decode(_ENCODING)
+            if not line.startswith(BundleSettings.index_marker):
+                raise ValueError("missing index")
+            index = json.loads(line[len(BundleSettings.index_marker):])
+            return {name: (start, end)
+                    for name, start, end in index["documents"]}
+        except (ValueError, KeyError, TypeError) as error:
+            self.close()
+            raise BundleError(
+                f"The bundle {self.path} has no valid trailer index"
+            ) from error
+
+    def names(self) -> List[str]:
+        """
+        Get the names of the requirements in the bundle.
+
+        Returns:
+            List[str]: the names, in the order of the bundle.
+        """
+        return list(self._index)
+
+    def read(self, name: str) -> Requirement:
+        """
+        Read one requirement of the bundle.
+
+        Args:
+            name (str): name of the requirement.
+
+        Returns:
+            Requirement: the requirement.
+
+        Raises:
+            KeyError: If the name is not in the bundle.
+        """
+        start, end = self._index[name]
+        return ReqFile.from_yaml(self._mmap[start:end])
+
+    def __iter__(self) -> Iterator[Requirement]:
+        """Stream all the requirements of the bundle."""
+        with open(self.path, "rb") as file:
+            for datamap in yaml.safe_load_all(file):
+                yield Requirement(**datamap)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, name: str) -> bool:
+        return name in self._index
+
+    def close(self):
+        """Close the bundle file."""
+        self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> BundleReader:
+        return self
+
+    def __exit__(self, *args):
+        self.close()
@@ -0,0 +1,312 @@
+""" Requirement to test traceability stored as a sparse matrix"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import csv
+from pathlib import Path, PurePosixPath
+from typing import IO, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from scipy import sparse
+from .__settings import CoverageSettings, FolderStructure
+from .database import ReqFolder
+from .layout import logical_folder
+
+__all__ = [
+    "CoverageMatrix",
+]
+
+
+class _KeyMap():
+    """PRIVATE - bidirectional map between keys and consecutive ids"""
+
+    def __init__(self, keys: Iterable[str] = ()):
+        self.keys: List[str] = []
+        self.ids: Dict[str, int] = {}
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def add(self, key: str) -> int:
+        identifier = self.ids.get(key)
+        if identifier is None:
+            identifier = self.ids[key] = len(self.keys)
+            self.keys.append(key)
+        return identifier
+
+
+class CoverageMatrix():
+    """
+    Links between requirements (rows) and tests (columns).
+
+    The links are kept in a scipy.sparse CSR boolean matrix with the maps
+    between the requirement/test keys and the row/column ids, so that the
+    queries are vectorized and the memory only depends on the number of
+    links. New links are buffered and merged in the matrix at the next
+    query.
+
+    The requirement keys are the paths of the requirement files relative
+    to the rootdir (see from_folder), the test keys are free strings.
+    """
+
+    def __init__(
+        self,
+        requirements: Iterable[str] = (),
+        tests: Iterable[str] = (),
+    ):
+        """
+        Create a matrix without links.
+
+        Args:
+            requirements (Iterable[str]): keys of the requirements.
+            tests (Iterable[str]): keys of the tests.
+        """
+        self._requirements = _KeyMap(requirements)
+        self._tests = _KeyMap(tests)
+        self._matrix = sparse.csr_matrix((0, 0), dtype=bool)
+        self._rows: List[int] = []  # links not merged in the matrix
+        self._columns: List[int] = []
+        self._csc: Optional[sparse.csc_matrix] = None
+
+    @classmethod
+    def from_folder(
+        cls,
+        req_folder: ReqFolder,
+        links: Iterable[Tuple[str, str]] = (),
+    ) -> CoverageMatrix:
+        """
+        Create the matrix of all the requirements of a database, so that
+        the requirements without link are reported as uncovered.
+
+        Args:
+            req_folder (ReqFolder): the database.
+            links (Iterable[Tuple[str, str]]): (requirement, test) links.
+
+        Returns:
+            CoverageMatrix: the matrix.
+        """
+        coverage = cls(
+            file.relative_to(req_folder.rootdir).as_posix()
+            for file in req_folder.get_list_of_requirement_files())
+        coverage.add_links(links)
+        return coverage
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        """(number of requirements, number of tests)"""
+        return len(self._requirements), len(self._tests)
+
+    @property
+    def requirements(self) -> List[str]:
+        """keys of the requirements, by row"""
+        return self._requirements.keys
+
+    @property
+    def tests(self) -> List[str]:
+        """keys of the tests, by column"""
+        return self._tests.keys
+
+    # ------------------------------- LINKS ------------------------------ #
+
+    def add_links(self, links: Iterable[Tuple[str, str]]):
+        """
+        Add links between requirements and tests. The unknown requirements
+        and tests are added.
+
+        Args:
+            links (Iterable[Tuple[str, str]]): (requirement, test) links.
+        """
+        add_requirement = self._requirements.add
+        add_test = self._tests.add
+        for requirement, test in links:
+            self._rows.append(add_requirement(str(requirement)))
+            self._columns.append(add_test(str(test)))
+
+    @property
+    def matrix(self) -> sparse.csr_matrix:
+        """
+        The links as a (requirements x tests) CSR boolean matrix.
+        """
+        shape = self.shape
+        if self._rows or self._matrix.shape != shape:
+            matrix = self._matrix
+            if matrix.shape != shape:
+                matrix = sparse.csr_matrix(
+                    (matrix.data, matrix.indices,
+                     np.concatenate([matrix.indptr, np.full(
+                         shape[0] - matrix.shape[0], matrix.indptr[-1])])),
+                    shape=shape)
+            new = sparse.csr_matrix(
+                (np.ones(len(self._rows), dtype=bool),
+                 (np.array(self._rows, dtype=np.int64),
+                  np.array(self._columns, dtype=np.int64))),
+                shape=shape)
+            self._matrix = (matrix + new).astype(bool).tocsr()
+            self._matrix.sort_indices()
+            self._rows, self._columns = [], []
+            self._csc = None
+        return self._matrix
+
+    # ------------------------------ QUERIES ----------------------------- #
+
+    def uncovered(self) -> List[str]:
+        """
+        Get the requirements without test.
+
+        Returns:
+            List[str]: keys of the uncovered requirements.
+        """
+        rows = np.flatnonzero(np.diff(self.matrix.indptr) == 0)
+        return [self._requirements.keys[row] for row in rows]
+
+    def tests_of(self, requirement: str) -> List[str]:
+        """
+        Get the tests of a requirement.
+
+        Args:
+            requirement (str): key of the requirement.
+
+        Returns:
+            List[str]: keys of the tests.
+
+        Raises:
+            KeyError: If the requirement is unknown.
+        """
+        row = self._requirements.ids[str(requirement)]
+        matrix = self.matrix
+        columns = matrix.indices[matrix.indptr[row]:matrix.indptr[row + 1]]
+        return [self._tests.keys[column] for column in columns]
+
+    def requirements_of(self, test: str) -> List[str]:
+        """
+        Get the requirements verified by a test.
+
+        Args:
+            test (str): key of the test.
+
+        Returns:
+            List[str]: keys of the requirements.
+
+        Raises:
+            KeyError: If the test is unknown.
+        """
+        column = self._tests.ids[str(test)]
+        matrix = self.matrix
+        if self._csc is None:
+            self._csc = matrix.tocsc()
+            self._csc.sort_indices()
+        csc = self._csc
+        rows = csc.indices[csc.indptr[column]:csc.indptr[column + 1]]
+        return [self._requirements.keys[row] for row in rows]
+
+    def folder_coverage(self) -> Dict[str, Tuple[int, int, float]]:
+        """
+        Get the coverage of the requirements per folder (direct content of
+        the folder, whatever the storage layout).
+
+        Returns:
+            Dict[str, Tuple[int, int, float]]: per folder, the number of
+            covered requirements, the number of requirements and the ratio.
+        """
+        covered = np.diff(self.matrix.indptr) > 0
+        folders = [logical_folder(PurePosixPath(key)).as_posix()
+                   for key in self._requirements.keys]
+        names, codes = np.unique(np.array(folders, dtype=str),
+                                 return_inverse=True)
+        totals = np.bincount(codes, minlength=len(names))
+        hits = np.bincount(codes, weights=covered, minlength=len(names))
+        return {
+            str(name): (int(hit), int(total), float(hit / total))
+            for name, hit, total in zip(names, hits, totals)
+        }
+
+    # --------------------------- EXPORT / SAVE -------------------------- #
+
+    def export(self, stream: IO[str]) -> int:
+        """
+        Write the traceability matrix as CSV (one row per link, with an
+        empty test for the uncovered requirements), row by row from the
+        sparse matrix.
+
+        Args:
+            stream (IO[str]): output text stream.
+
+        Returns:
+            int: number of written rows.
+        """
+        matrix = self.matrix
+        writer = csv.writer(stream)
+        writer.writerow(("requirement", "test"))
+        written = 0
+        for row, requirement in enumerate(self._requirements.keys):
+            columns = matrix.indices[matrix.indptr[row]:
+                                     matrix.indptr[row + 1]]
+            if len(columns) == 0:
+                writer.writerow((requirement, ""))
+                written += 1
+                continue
+            writer.writerows((requirement, self._tests.keys[column])
+                             for column in columns)
+            written += len(columns)
+        return written
+
+    def save(self, path: Path):
+        """
+        Save the matrix and the key maps (atomic replacement of the file).
+
+        Args:
+            path (Path): file of the matrix (.npz, any name is kept as is).
+        """
+        matrix = self.matrix
+        path = Path(path)
+        tmp_path = path.with_name(path.name + ".tmp")
+        try:
+            # opened file: np.savez does not append the .npz suffix
+            with open(tmp_path, "wb") as file:
+                np.savez(
+                    file,
+                    indptr=matrix.indptr,
+                    indices=matrix.indices,
+                    requirements=np.array(self._requirements.keys,
+                                          dtype=str),
+                    tests=np.array(self._tests.keys, dtype=str),
+                )
+            tmp_path.replace(path)
+        except BaseException:
+            tmp_path.unlink(missing_ok=True)
+            raise
+
+    @classmethod
+    def load(cls, path: Path) -> CoverageMatrix:
+        """
+        Load a saved matrix.
+
+        Args:
+            path (Path): file of the matrix (.npz).
+
+        Returns:
+            CoverageMatrix: the matrix.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            coverage = cls(data["requirements"].tolist(),
+                           data["tests"].tolist())
+            coverage._matrix = sparse.csr_matrix(
+                (np.ones(len(data["indices"]), dtype=bool),
+                 data["indices"], data["indptr"]),
+                shape=coverage.shape)
+        return coverage
+
+    @staticmethod
+    def default_path(req_folder: ReqFolder) -> Path:
+        """
+        Get the default file of the matrix of a database.
+
+        Args:
+            req_folder (ReqFolder): the database.
+
+        Returns:
+            Path: the file in the metadata folder.
+        """
+        return (req_folder.rootdir / FolderStructure.metadata_folder /
+                CoverageSettings.coverage_file)
@@ -1,8 +1,23 @@
 from .__settings import FolderStructure, RequirementFileSettings
+from .layout import (layout_path, logical_folder, read_layout,
+                     remove_empty_shards, write_layout)
+from .requirements import Requirement, ReqFile
+from .indexes import RequirementIndex
+from .rollup import FolderRollup, RollupIndex
+from .bundle import BundleReader, BundleWriter
+from .events import EVENTS, Changelog, FileRenamed, FolderCleaned
+from .locking import lock_database
+from .ids import IdIndex
+from .transaction import Transaction, recover_journals
+from .utils import cachedStat, invalidateStat
+from contextlib import contextmanager
 from pathlib import Path
-from pydantic import BaseModel, validator
+from pydantic import BaseModel, PrivateAttr, ValidationError, validator
 import shutil
-from typing import List
+import stat
+import yaml
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, Optional,
+                    Tuple)
 
 __all__ = [
     "ReqFolder"
@@ -23,6 +38,26 @@ class ReqFolder(BaseModel):
     """
 
     rootdir: Path
+    _index: Optional[RequirementIndex] = PrivateAttr(default=None)
+    _ids: Optional[IdIndex] = PrivateAttr(default=None)
+    _rollup: Optional[RollupIndex] = PrivateAttr(default=None)
+    _layout: Optional[Tuple[str, bool]] = PrivateAttr(default=None)
+
+    def __init__(self, **data: Any):
+        """
+        Initialize the requirement folder, recover the interrupted
+        transactions (see Transaction) and layout migration (see
+        migrate_layout) and attach the changelog, if enabled (see
+        enable_changelog).
+        """
+        super().__init__(**data)
+        changelog = Changelog(self.rootdir)
+        if changelog.exists():
+            changelog.attach()
+        recover_journals(self.rootdir)
+        layout, migrating = self._read_layout()
+        if migrating and self.is_correct_folders():
+            self.migrate_layout(layout)
 
     @validator("rootdir")
     def rootdir_must_be_a_folder_existing_path(cls, rootdir: Path):
@@ -60,6 +95,7 @@ class ReqFolder(BaseModel):
         for folder in FolderStructure.folder_structure:
             tmpPath = self.rootdir / folder
             tmpPath.mkdir(parents=True, exist_ok=True)
+            invalidateStat(tmpPath)
             print("create:", self.rootdir / folder)
     # TODO : add log
 
@@ -71,14 +107,50 @@ class ReqFolder(BaseModel):
             forced (bool): If True, ignore errors and force deletion.
             Defaults to True.
         """
-        for folder in FolderStructure.folder_structure:
-            shutil.rmtree(self.rootdir / folder, ignore_errors=forced)
-            print("remove:", self.rootdir / folder)
+        with EVENTS.batch(), self.lock():
+            for folder in FolderStructure.folder_structure:
+                existed = (self.rootdir / folder).exists()
+                shutil.rmtree(self.rootdir / folder, ignore_errors=forced)
+                print("remove:", self.rootdir / folder)
+                if existed:
+                    EVENTS.emit(FolderCleaned(self.rootdir / folder))
+            invalidateStat()
+
+    @contextmanager
+    def lock(
+        self,
+        shared: bool = False,
+        timeout: Optional[float] = None
+    ) -> Iterator[None]:
+        """
+        Hold the advisory lock of the whole database.
+
+        Bulk writers hold a shared lock (they still lock each written
+        file), the operations which move or delete files hold an exclusive
+        lock. The lock is reentrant in a thread, but a shared lock is not
+        upgraded (see locking.lock_database).
+
+        Args:
+            shared (bool): If True, shared lock, else exclusive lock.
+            Defaults to False.
+            timeout (float | None): seconds to wait for the lock, None to
+            wait forever.
+
+        Raises:
+            LockTimeout: If the lock is not acquired before the timeout.
+            LockUpgradeError: If an exclusive lock is requested while the
+            thread holds the shared lock.
+        """
+        with lock_database(self.rootdir, shared, timeout):
+            yield
 
     def get_missing_drectories(self) -> List[Path]:
         """
         Validate if all required folders are present in the root path.
 
+        The checks use the stat cache of the current scope, if any (see
+        utils.statCacheScope).
+
         Returns:
             List[Path]: A list of missing folders.
         """
@@ -87,7 +159,7 @@ class ReqFolder(BaseModel):
         for folder in FolderStructure.folder_structure:
             tested_Path = self.rootdir / folder
 
-            if not tested_Path.exists():
+            if cachedStat(tested_Path) is None:
                 missing_folders.append(tested_Path)
         return missing_folders
 
@@ -95,6 +167,9 @@ class ReqFolder(BaseModel):
         """
         Get a list of files in the requirements folder.
 
+        The file checks use the stat cache of the current scope, if any (see
+        utils.statCacheScope).
+
         Returns:
             list[Path]: A list of Path objects representing files in the
             requirements folder.
@@ -114,7 +189,72 @@ class ReqFolder(BaseModel):
         requirement_folder = self.rootdir / FolderStructure.main_folder
 
         p = requirement_folder.glob('**/*')
-        return [x for x in p if x.is_file()]
+        return [x for x in p if _is_file(x)]
+
+    def get_list_of_requirement_files(self) -> List[Path]:
+        """
+        Get a list of files in the requirements folder with a requirement
+        file extension.
+
+        Returns:
+            List[Path]: A list of Path objects representing requirement
+            files.
+        """
+        return [
+            file for file in self.get_list_of_files()
+            if file.suffix in RequirementFileSettings.allowed_extensions
+        ]
+
+    def iter_requirements(
+        self,
+        files: Optional[Iterable[Path]] = None,
+        on_error: Optional[Callable[[Path, Exception], None]] = None,
+    ) -> Iterator[Tuple[Path, Requirement]]:
+        """
+        Read the requirements one by one, so that only one requirement is
+        in memory at a time.
+
+        Args:
+            files (Iterable[Path] | None): the requirement files, in the
+            reading order. Defaults to all the requirement files.
+            on_error (Callable[[Path, Exception], None] | None): called
+            with the files which can not be read, which are skipped. If
+            None, the errors are raised.
+
+        Yields:
+            Tuple[Path, Requirement]: the file and its requirement.
+        """
+        if files is None:
+            files = self.get_list_of_requirement_files()
+        for file in files:
+            try:
+                requirement = ReqFile(path=file).read()
+            except (ValidationError, yaml.YAMLError, OSError,
+                    TypeError) as error:
+                if on_error is None:
+                    raise
+                on_error(file, error)
+                continue
+            yield file, requirement
+
+    def load_fields(self, fields: List[str]) -> List[Dict[str, Any]]:
+        """
+        Load some fields of all the requirements, e.g. for a table view.
+
+        The requirement files are scanned only up to the requested fields
+        and no Requirement object is built.
+
+        Args:
+            fields (List[str]): names of the Requirement fields to read.
+
+        Returns:
+            List[Dict[str, Any]]: one row per requirement file with the
+            "path" of the file and the requested fields.
+        """
+        return [
+            {"path": file, **ReqFile(path=file).read_fields(fields)}
+            for file in self.get_list_of_requirement_files()
+        ]
 
     def get_incorrect_files(self) -> List[Path]:
         """
@@ -157,3 +297,366 @@ class ReqFolder(BaseModel):
             return False
         else:  # no missing data
             return True
+
+    def get_layout(self) -> str:
+        """
+        Get the storage layout of the requirement files.
+
+        The layout marker is read once and kept in memory: a migration done
+        by another process is seen by the ReqFolder objects created after
+        it.
+
+        Returns:
+            str: the layout of the database (see LayoutSettings). During a
+            migration, the target layout is returned.
+        """
+        layout, _ = self._read_layout()
+        return layout
+
+    def _read_layout(self) -> Tuple[str, bool]:
+        """PRIVATE - layout marker of the database, read once"""
+        if self._layout is None:
+            self._layout = read_layout(self.rootdir)
+        return self._layout
+
+    def get_requirement_path(
+        self,
+        file_name: str,
+        folder: str = FolderStructure.main_folder
+    ) -> Path:
+        """
+        Get the path of a requirement file according to the layout.
+
+        Args:
+            file_name (str): name of the requirement file.
+            folder (str): folder of the requirement, relative to the
+            rootdir. Defaults to the main folder.
+
+        Returns:
+            Path: path where the requirement file is (or shall be) stored.
+        """
+        return layout_path(self.rootdir / folder, file_name,
+                           self.get_layout())
+
+    def migrate_layout(self, layout: str) -> List[Path]:
+        """
+        Move the requirement files to the expected layout.
+
+        The migration is online: files are moved one by one with an atomic
+        rename, so the database stays readable, and the layout marker is
+        updated first so that new files are directly created with the
+        target layout. An interrupted migration is resumed by calling
+        again this method.
+
+        Args:
+            layout (str): target layout (see LayoutSettings).
+
+        Returns:
+            List[Path]: new paths of the moved files.
+
+        Raises:
+            DataBaseError: If a file already exists at the target path.
+        """
+        with EVENTS.batch(), self.lock():
+            self._layout = None
+            write_layout(self.rootdir, layout, migrating=True)
+
+            moved_files: List[Path] = []
+            for file in self.get_list_of_requirement_files():
+                folder = logical_folder(file)
+                new_file = layout_path(folder, file.name, layout)
+                if new_file == file:
+                    continue
+                if new_file.exists():
+                    raise DataBaseError(
+                        f"Impossible to move {file} - " +
+                        f"the file {new_file} already exists"
+                    )
+                new_file.parent.mkdir(parents=True, exist_ok=True)
+                file.replace(new_file)
+                invalidateStat(file)
+                invalidateStat(new_file)
+                EVENTS.emit(FileRenamed(new_file, file))
+                remove_empty_shards(file.parent, folder)
+                moved_files.append(new_file)
+
+            write_layout(self.rootdir, layout, migrating=False)
+            self._layout = (layout, False)
+        return moved_files
+
+    def get_index(
+        self,
+        refresh: bool = True,
+        on_error: Optional[Callable[[Path, Exception], None]] = None,
+    ) -> RequirementIndex:
+        """
+        Get the secondary indexes (validation status and creation date) of
+        the requirements.
+
+        The index is kept in memory and saved in the metadata folder. When
+        refreshed, only the new, modified and deleted files are processed.
+        The files which can not be read are not indexed (see
+        RequirementIndex.errors).
+
+        Args:
+            refresh (bool): If True, update the index with the current
+            requirement files. Defaults to True.
+            on_error (Callable[[Path, Exception], None] | None): called
+            with the files which can not be read, which are skipped.
+
+        Returns:
+            RequirementIndex: the index of the requirements.
+        """
+        if self._index is None:
+            try:
+                self._index = RequirementIndex.load(self.rootdir)
+            except (OSError, KeyError, ValueError):
+                self._index = RequirementIndex(self.rootdir)
+            refresh = True
+
+        if refresh and self._index.refresh(
+                self.get_list_of_requirement_files(), on_error):
+            self._index.save()
+        return self._index
+
+    def get_id_index(self) -> IdIndex:
+        """
+        Get the index of the requirement IDs (see IdIndex).
+
+        The index is kept in memory, reloaded when it is modified by
+        another process and updated by the events of the requirement files.
+
+        Returns:
+            IdIndex: the index of the requirement IDs.
+        """
+        if self._ids is None:
+            self._ids = IdIndex(self.rootdir).attach()
+        else:
+            self._ids.reload()
+        return self._ids
+
+    def create_requirement(
+        self,
+        requirement: Requirement,
+        folder: str = FolderStructure.main_folder,
+        timeout: Optional[float] = None,
+    ) -> ReqFile:
+        """
+        Create a new requirement file with a new unique ID.
+
+        The uniqueness of the title (see normalize_title), the allocation
+        of the ID and the creation of the file are done under the lock of
+        the IDs, so concurrent creations can not get the same ID or title.
+
+        Args:
+            requirement (Requirement): the requirement (its identifier is
+            replaced by the allocated one).
+            folder (str): folder of the requirement, relative to the
+            rootdir. Defaults to the main folder.
+            timeout (float | None): seconds to wait for the lock, None to
+            wait forever.
+
+        Returns:
+            ReqFile: the created requirement file.
+
+        Raises:
+            DataBaseError: If a requirement already has the same title or
+            the file already exists.
+            LockTimeout: If the lock is not acquired before the timeout.
+        """
+        ids = self.get_id_index()
+        # same lock order as the writers updating the index (see IdIndex)
+        with self.lock(shared=True, timeout=timeout), \
+                ids.locked(timeout=timeout):
+            if ids.has_title(requirement.title):
+                raise DataBaseError(
+                    f"A requirement with the title [{requirement.title}] " +
+                    f"already exists (ID {ids.get_id(requirement.title)})"
+                )
+            path = self.get_requirement_path(
+                ReqFile.title_to_fileName(requirement.title) +
+                RequirementFileSettings.default_extension,
+                folder)
+            if path.exists():
+                raise DataBaseError(
+                    "Impossible to create the requirement - " +
+                    f"the file {path} already exists"
+                )
+            identifier = ids.allocate()[0]
+            path.parent.mkdir(parents=True, exist_ok=True)
+            req_file = ReqFile(path=path)
+            req_file.write(requirement.copy(update={"identifier": identifier}))
+            ids.add(identifier, requirement.title, path)
+            ids.save()
+        return req_file
+
+    def get_by_id(self, identifier: int) -> Optional[ReqFile]:
+        """
+        Get a requirement file by ID.
+
+        Args:
+            identifier (int): the ID of the requirement.
+
+        Returns:
+            ReqFile | None: the requirement file, None if the ID is unknown.
+        """
+        path = self.get_id_index().get_path(identifier)
+        return None if path is None else ReqFile(path=path)
+
+    def get_by_title(self, title: str) -> Optional[ReqFile]:
+        """
+        Get a requirement file with an ID by title (see normalize_title).
+
+        Args:
+            title (str): the title of the requirement.
+
+        Returns:
+            ReqFile | None: the requirement file, None if no requirement
+            with an ID has this title.
+        """
+        ids = self.get_id_index()
+        identifier = ids.get_id(title)
+        return None if identifier is None else self.get_by_id(identifier)
+
+    def rebuild_id_index(
+        self,
+        on_error: Optional[Callable[[Path, Exception], None]] = None,
+    ) -> IdIndex:
+        """
+        Rebuild the index of the IDs from the requirement files, e.g.
+        after files were moved or deleted without the database methods.
+
+        Args:
+            on_error (Callable[[Path, Exception], None] | None): called
+            with the files which are not indexed (unreadable, duplicated
+            ID or title) and the error.
+
+        Returns:
+            IdIndex: the rebuilt index.
+        """
+        ids = self.get_id_index()
+        ids.rebuild(self.get_list_of_requirement_files(), on_error)
+        return ids
+
+    def rollup(
+        self,
+        refresh: bool = True,
+        on_error: Optional[Callable[[Path, Exception], None]] = None,
+    ) -> Dict[str, FolderRollup]:
+        """
+        Get the aggregates (counts per validation status, total and latest
+        creation date) of each requirement folder, sub-folders included.
+
+        The aggregates are kept in memory and saved in the metadata folder.
+        When refreshed, only the new, modified and deleted files are read,
+        and only their folders and the ancestors are recomputed. The files
+        which can not be read are not counted (see RollupIndex.errors).
+
+        Args:
+            refresh (bool): If True, update the aggregates with the current
+            requirement files. Defaults to True.
+            on_error (Callable[[Path, Exception], None] | None): called
+            with the files which can not be read, which are skipped.
+
+        Returns:
+            Dict[str, FolderRollup]: aggregates per folder (relative to the
+            rootdir), including the empty folders of the FolderStructure.
+        """
+        if self._rollup is None:
+            try:
+                self._rollup = RollupIndex.load(self.rootdir)
+            except (OSError, KeyError, ValueError, TypeError):
+                self._rollup = RollupIndex(self.rootdir)
+            refresh = True
+
+        if refresh and self._rollup.refresh(
+                self.get_list_of_requirement_files(), on_error):
+            self._rollup.save()
+        return {
+            folder: self._rollup.get(folder)
+            for folder in sorted(set(FolderStructure.folder_structure) |
+                                 set(self._rollup.folders()))
+        }
+
+    def write_bundle(self, path: Path) -> Path:
+        """
+        Write all the requirements in a single bundle file.
+
+        Args:
+            path (Path): path of the bundle file (see BundleWriter).
+
+        Returns:
+            Path: path of the bundle file.
+        """
+        with BundleWriter(path) as bundle:
+            for file in self.get_list_of_requirement_files():
+                bundle.add(self._relative_name(file),
+                           ReqFile(path=file).read())
+        return Path(path)
+
+    def extract_bundle(self, path: Path) -> List[Path]:
+        """
+        Write the requirements of a bundle file in the database.
+
+        Args:
+            path (Path): path of the bundle file (see BundleReader).
+
+        Returns:
+            List[Path]: the written requirement files.
+
+        Raises:
+            DataBaseError: If a requirement is outside the requirement
+            folders.
+        """
+        written_files: List[Path] = []
+        main_folder = (self.rootdir / FolderStructure.main_folder).resolve()
+        with BundleReader(path) as bundle, EVENTS.batch():
+            for name in bundle.names():
+                file = self.rootdir / name
+                if main_folder not in file.resolve().parents:
+                    raise DataBaseError(
+                        f"The bundle requirement {name} is not in the " +
+                        f"folder {FolderStructure.main_folder}"
+                    )
+                file.parent.mkdir(parents=True, exist_ok=True)
+                ReqFile(path=file).write(bundle.read(name))
+                written_files.append(file)
+        return written_files
+
+    def _relative_name(self, file: Path) -> str:
+        """PRIVATE - name of a file relative to the rootdir"""
+        return file.relative_to(self.rootdir).as_posix()
+
+    def enable_changelog(self) -> Changelog:
+        """
+        Record the changes of the requirement files in a changelog of the
+        metadata folder (see events.Changelog). The changelog is then
+        attached by all the ReqFolder objects of the database.
+
+        Returns:
+            Changelog: the changelog, to read the changes.
+        """
+        changelog = Changelog(self.rootdir)
+        changelog.path.parent.mkdir(parents=True, exist_ok=True)
+        changelog.path.touch(exist_ok=True)
+        return changelog.attach()
+
+    def transaction(self) -> Transaction:
+        """
+        Start an edit session applying several changes atomically.
+
+        Usage:
+            with req_folder.transaction() as tx:
+                tx.write("requirements/Title.yml", requirement)
+
+        Returns:
+            Transaction: the transaction, committed at the end of the
+            with block (rolled back if an exception is raised).
+        """
+        return Transaction(self)
+
+
+def _is_file(path: Path) -> bool:
+    """PRIVATE - check if a path is a regular file (see utils.cachedStat)"""
+    result = cachedStat(path)
+    return result is not None and stat.S_ISREG(result.st_mode)
@@ -0,0 +1,495 @@
+""" Change events of the requirement files and on-disk changelog"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (Callable, Dict, Iterator, List, NamedTuple, Optional,
+                    Union)
+from .__settings import EventSettings, FolderStructure
+from .layout import database_rootdir
+from .locking import open_locked
+
+__all__ = [
+    "FileWritten",
+    "FileRenamed",
+    "FileDeleted",
+    "FolderCleaned",
+    "EventBus",
+    "EVENTS",
+    "coalesce",
+    "ChangeRecord",
+    "Changelog",
+]
+
+
+# ########################################################################## #
+# ################################# EVENTS ################################# #
+# ########################################################################## #
+
+
+class FileWritten(NamedTuple):
+    path: Path  # written requirement file
+    created: bool  # True if the file did not exist
+
+
+class FileRenamed(NamedTuple):
+    path: Path  # new path of the file
+    old_path: Path  # previous path of the file
+
+
+class FileDeleted(NamedTuple):
+    path: Path  # deleted requirement file
+
+
+class FolderCleaned(NamedTuple):
+    path: Path  # deleted folder (with all its content)
+
+
+Event = Union[FileWritten, FileRenamed, FileDeleted, FolderCleaned]
+Subscriber = Callable[[List[Event]], None]
+
+# name of the events in the changelog
+_EVENT_TYPES: Dict[str, type] = {
+    "written": FileWritten,
+    "renamed": FileRenamed,
+    "deleted": FileDeleted,
+    "cleaned": FolderCleaned,
+}
+_EVENT_NAMES = {event_type: name for name, event_type in _EVENT_TYPES.items()}
+_PATH_FIELDS = ("path", "old_path")  # relative to the rootdir in changelog
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# ########################################################################## #
+# ################################### BUS ################################## #
+# ########################################################################## #
+
+
+class EventBus():
+    """
+    Synchronous publisher of the change events.
+
+    The subscribers receive lists of events. Outside a batch, each event
+    is delivered alone; the events of a batch (see batch) are coalesced
+    and delivered once at its end. The events are delivered after the
+    files are modified: the exceptions of the subscribers are logged, not
+    raised to the modifying operation. The events emitted by other processes
+    (e.g. pool workers) are ignored: the bulk operations emit the events
+    of their workers from the parent process.
+
+    The consumers of a database (e.g. its changelog) are attached when an
+    event of the database is emitted (see add_attacher), so that they
+    receive the events of the processes which only use ReqFile.
+    """
+
+    def __init__(self):
+        """Initialize a bus without subscriber."""
+        self._subscribers: List[Subscriber] = []
+        self._attachers: List[Callable[[Path], None]] = []
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._pid = os.getpid()
+
+    def subscribe(self, subscriber: Subscriber) -> Subscriber:
+        """
+        Add a subscriber (usable as a decorator).
+
+        Args:
+            subscriber (Callable[[List[Event]], None]): called with the
+            batches of events.
+
+        Returns:
+            Callable[[List[Event]], None]: the subscriber.
+        """
+        with self._lock:
+            if subscriber not in self._subscribers:
+                self._subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber):
+        """
+        Remove a subscriber (no effect if not subscribed).
+
+        Args:
+            subscriber (Callable[[List[Event]], None]): the subscriber.
+        """
+        with self._lock:
+            if subscriber in self._subscribers:
+                self._subscribers.remove(subscriber)
+
+    def add_attacher(self, attacher: Callable[[Path], None]):
+        """
+        Add a function called with the root directory of the database of
+        each emitted event, before its delivery. It subscribes the
+        consumers of the database, if needed, and shall be cheap when they
+        are already subscribed.
+
+        Args:
+            attacher (Callable[[Path], None]): called with the rootdir.
+        """
+        with self._lock:
+            self._attachers.append(attacher)
+
+    def emit(self, event: Event):
+        """
+        Publish an event.
+
+        Args:
+            event (Event): the event.
+        """
+        if os.getpid() != self._pid or getattr(self._local, "muted", 0):
+            return
+        rootdir = database_rootdir(event.path)
+        if rootdir is not None:
+            for attacher in self._attachers:
+                try:
+                    attacher(rootdir)
+                except Exception:
+                    _LOGGER.exception(f"Event attacher {attacher!r} failed")
+        pending = getattr(self._local, "pending", None)
+        if pending is not None:
+            pending.append(event)
+        else:
+            self._deliver([event])
+
+    @contextmanager
+    def batch(self) -> Iterator[None]:
+        """
+        Group the events emitted by the current thread in the with block,
+        delivered coalesced at the end of the outermost batch (even if an
+        exception is raised, the files being already modified).
+        """
+        if getattr(self._local, "pending", None) is not None:
+            yield  # nested batch
+            return
+        self._local.pending = []
+        try:
+            yield
+        finally:
+            events, self._local.pending = self._local.pending, None
+            if events:
+                self._deliver(coalesce(events))
+
+    @contextmanager
+    def muted(self) -> Iterator[None]:
+        """
+        Ignore the events emitted by the current thread in the with block,
+        for the operations which emit their events themselves.
+        """
+        self._local.muted = getattr(self._local, "muted", 0) + 1
+        try:
+            yield
+        finally:
+            self._local.muted -= 1
+
+    def _deliver(self, events: List[Event]):
+        """PRIVATE - call the subscribers"""
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            try:
+                subscriber(list(events))
+            except Exception:
+                _LOGGER.exception(f"Event subscriber {subscriber!r} failed")
+
+
+# bus of the requirement files
+EVENTS = EventBus()
+
+
+def coalesce(events: List[Event]) -> List[Event]:
+    """
+    Merge the successive events of the same files:
+
+    - written + written: one written (created if the first one was),
+    - created + deleted: nothing, written + deleted: deleted,
+    - created + renamed: created at the new path,
+    - renamed a -> b + renamed b -> c: renamed a -> c,
+    - renamed + deleted: deleted at the first path,
+    - events of the files of a cleaned folder before it: removed.
+
+    Args:
+        events (List[Event]): the events, in emission order.
+
+    Returns:
+        List[Event]: the equivalent events, in emission order.
+    """
+    result: List[Optional[Event]] = []
+    last: Dict[Path, int] = {}  # current path -> index of its last event
+
+    for event in events:
+        if isinstance(event, FolderCleaned):
+            for path, index in list(last.items()):
+                before = result[index]
+                if event.path in path.parents and (
+                        not isinstance(before, FileRenamed) or
+                        event.path in before.old_path.parents):
+                    result[index] = None
+                    del last[path]
+            result.append(event)
+            continue
+
+        index = last.pop(event.old_path if isinstance(event, FileRenamed)
+                         else event.path, None)
+        merged = (_NO_MERGE if index is None
+                  else _merge(result[index], event))
+        if merged is not _NO_MERGE:
+            result[index] = None
+            event = merged
+        if event is not None:
+            last[event.path] = len(result)
+            result.append(event)
+    return [event for event in result if event is not None]
+
+
+_NO_MERGE = object()
+
+
+def _merge(before: Event, event: Event) -> Optional[Event]:
+    """PRIVATE - event equivalent to two successive events of a file (None
+    if no change), _NO_MERGE if they are kept"""
+    if isinstance(before, FileWritten):
+        if isinstance(event, FileWritten):
+            return FileWritten(event.path, before.created)
+        if isinstance(event, FileDeleted):
+            return None if before.created else event
+        if isinstance(event, FileRenamed) and before.created:
+            return FileWritten(event.path, True)
+    elif isinstance(before, FileRenamed):
+        if isinstance(event, FileRenamed):
+            if before.old_path == event.path:
+                return None  # renamed back
+            return FileRenamed(event.path, before.old_path)
+        if isinstance(event, FileDeleted):
+            return FileDeleted(before.old_path)
+    return _NO_MERGE
+
+
+# ########################################################################## #
+# ############################### CHANGELOG ################################ #
+# ########################################################################## #
+
+
+class ChangeRecord(NamedTuple):
+    sequence: int  # position in the changelog (starting at 1)
+    event: Event  # the event, with absolute paths
+
+
+class Changelog():
+    """
+    Append-only changelog of a database, in its metadata folder.
+
+    Each line is an event (JSON) with a sequence number, so that a
+    consumer keeps the last processed number and catches up with read()
+    after a restart, without scanning the requirement files. The
+    changelog is written under an exclusive lock by all the processes and
+    is subscribed to EVENTS (see attach) for the files of the database.
+
+    Attributes:
+        rootdir (Path): root directory of the database.
+        path (Path): the changelog file.
+    """
+
+    def __init__(self, rootdir: Path):
+        """
+        Args:
+            rootdir (Path): root directory of the database.
+        """
+        self.rootdir = Path(rootdir).absolute()
+        self.path = (self.rootdir / FolderStructure.metadata_folder /
+                     EventSettings.changelog_file)
+
+    def exists(self) -> bool:
+        """True if the changelog is enabled (the file exists)."""
+        return self.path.is_file()
+
+    def append(self, events: List[Event]) -> int:
+        """
+        Append events of the database to the changelog. A last line torn
+        by a crash of a writer is removed first, and the appended lines
+        are synced.
+
+        Args:
+            events (List[Event]): the events (the events of files outside
+            the database are ignored).
+
+        Returns:
+            int: the sequence number of the last event of the changelog.
+        """
+        lines = []
+        for event in events:
+            data = self._encode(event)
+            if data is not None:
+                lines.append(data)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open_locked(self.path) as file:
+            if lines:
+                _truncate_torn_line(file)
+            sequence = _last_sequence(file)
+            if lines:
+                file.seek(0, os.SEEK_END)
+                for data in lines:
+                    sequence += 1
+                    file.write((json.dumps({"seq": sequence, **data}) +
+                                "\n").encode("utf-8"))
+                file.flush()
+                os.fsync(file.fileno())
+        return sequence
+
+    __call__ = append  # subscriber of EVENTS
+
+    @property
+    def last_sequence(self) -> int:
+        """sequence number of the last event (0 if empty)"""
+        try:
+            with open_locked(self.path, shared=True) as file:
+                return _last_sequence(file)
+        except FileNotFoundError:
+            return 0
+
+    def read(self, since: int = 0) -> Iterator[ChangeRecord]:
+        """
+        Read the events after a sequence number. The first event is found
+        by a binary search in the file. The corrupted lines (and a line
+        being written) are skipped.
+
+        Args:
+            since (int): last processed sequence number (0: all).
+
+        Yields:
+            ChangeRecord: the events, in sequence order.
+        """
+        try:
+            file = open(self.path, "rb")
+        except FileNotFoundError:
+            return
+        with file:
+            file.seek(_first_offset(file, since))
+            for line in file:
+                try:
+                    data = json.loads(line)
+                    if data["seq"] <= since:
+                        continue
+                    record = ChangeRecord(data["seq"], self._decode(data))
+                except (ValueError, KeyError, TypeError):
+                    continue
+                yield record
+
+    def attach(self) -> Changelog:
+        """
+        Subscribe the changelog of the database to EVENTS (once per
+        database and process).
+
+        Returns:
+            Changelog: the subscribed changelog.
+        """
+        with _ATTACHED_LOCK:
+            changelog = _ATTACHED.get(self.rootdir)
+            if changelog is None:
+                changelog = _ATTACHED[self.rootdir] = self
+                EVENTS.subscribe(changelog)
+        return changelog
+
+    # ------------------------------ PRIVATE ----------------------------- #
+
+    def _encode(self, event: Event) -> Optional[dict]:
+        """PRIVATE - JSON data of an event, None if outside the database"""
+        data = {"type": _EVENT_NAMES[type(event)]}
+        for name, value in event._asdict().items():
+            if name in _PATH_FIELDS:
+                try:
+                    value = Path(value).absolute().relative_to(
+                        self.rootdir).as_posix()
+                except ValueError:
+                    return None
+            data[name] = value
+        return data
+
+    def _decode(self, data: dict) -> Event:
+        """PRIVATE - event of JSON data"""
+        event_type = _EVENT_TYPES[data["type"]]
+        return event_type(**{
+            name: self.rootdir / data[name] if name in _PATH_FIELDS
+            else data[name]
+            for name in event_type._fields
+        })
+
+
+# attached changelogs by rootdir
+_ATTACHED: Dict[Path, Changelog] = {}
+_ATTACHED_LOCK = threading.Lock()
+
+
+def _attach_changelog(rootdir: Path):
+    """PRIVATE - attach the changelog of a database, if enabled"""
+    if rootdir not in _ATTACHED:
+        changelog = Changelog(rootdir)
+        if changelog.exists():
+            changelog.attach()
+
+
+EVENTS.add_attacher(_attach_changelog)
+
+
+def _truncate_torn_line(file):
+    """PRIVATE - remove the last line of a file if it does not end with a
+    new line (write interrupted by a crash)"""
+    position = file.seek(0, os.SEEK_END)
+    while position > 0:
+        step = min(EventSettings.read_block, position)
+        file.seek(position - step)
+        block = file.read(step)
+        end = block.rfind(b"\n")
+        if end >= 0:
+            position = position - step + end + 1
+            break
+        position -= step
+    if position != file.seek(0, os.SEEK_END):
+        file.truncate(position)
+
+
+def _last_sequence(file) -> int:
+    """PRIVATE - sequence number of the last complete line of a file"""
+    end = file.seek(0, os.SEEK_END)
+    position = end
+    tail = b""
+    while position > 0:
+        step = min(EventSettings.read_block, position)
+        position -= step
+        file.seek(position)
+        tail = file.read(step) + tail
+        lines = tail.split(b"\n")
+        # the first piece may be truncated until the start of the file
+        for line in reversed(lines[1:] if position > 0 else lines):
+            try:
+                return int(json.loads(line)["seq"])
+            except (ValueError, KeyError, TypeError):
+                continue
+    return 0
+
+
+def _first_offset(file, since: int) -> int:
+    """PRIVATE - offset of a line before the first line with a sequence
+    number above since (binary search on the line starts)"""
+    low, high = 0, file.seek(0, os.SEEK_END)
+    while high - low > EventSettings.read_block:
+        middle = (low + high) // 2
+        file.seek(middle)
+        file.readline()  # end of the current line
+        start = file.tell()
+        try:
+            sequence = json.loads(file.readline())["seq"]
+        except (ValueError, KeyError, TypeError):
+            high = middle
+            continue
+        if sequence <= since:
+            low = start
+        else:
+            high = middle
+    return low
@@ -0,0 +1,578 @@
+""" Stable requirement IDs and constant time lookup index"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import base64
+import hashlib
+import json
+import os
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import (IO, Callable, Dict, Iterable, Iterator, List, Optional,
+                    Tuple, Union)
+import yaml
+from pydantic import ValidationError
+from .__settings import FolderStructure, IdSettings
+from .events import (EVENTS, Event, FileDeleted, FileRenamed, FileWritten,
+                     FolderCleaned)
+from .locking import open_locked
+from .requirements import ReqFile
+
+__all__ = [
+    "BloomFilter",
+    "IdIndex",
+    "normalize_title",
+]
+
+
+def normalize_title(title: str) -> str:
+    """
+    Get the normalized form of a title used for the uniqueness check:
+    case insensitive, "_" equivalent to a space and repeated white spaces
+    collapsed (as the file names derived from the titles).
+
+    Args:
+        title (str): the title.
+
+    Returns:
+        str: the normalized title.
+    """
+    return " ".join(title.replace("_", " ").split()).casefold()
+
+
+# ########################################################################## #
+# ############################## BLOOM FILTER ############################## #
+# ########################################################################## #
+
+
+class BloomFilter():
+    """
+    Fixed size Bloom filter of strings.
+
+    A negative answer is certain, a positive answer shall be confirmed
+    (false positives). The positions are derived from one BLAKE2b digest
+    (double hashing).
+
+    Attributes:
+        size (int): number of bits.
+        hashes (int): number of positions per key.
+    """
+
+    def __init__(
+        self,
+        size: int = IdSettings.bloom_bits,
+        hashes: int = IdSettings.bloom_hashes,
+        bits: Optional[bytes] = None,
+    ):
+        """
+        Create an empty filter or restore a saved one.
+
+        Args:
+            size (int): number of bits (rounded up to a multiple of 8).
+            hashes (int): number of positions per key.
+            bits (bytes | None): saved bits (see to_bytes).
+        """
+        self.size = -(-size // 8) * 8
+        self.hashes = hashes
+        self._bits = bytearray(self.size // 8) if bits is None \
+            else bytearray(bits)
+
+    def _positions(self, key: str) -> Iterator[int]:
+        """PRIVATE - bit positions of a key"""
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        second = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * second) % self.size for i in range(self.hashes))
+
+    def add(self, key: str):
+        """
+        Add a key to the filter.
+
+        Args:
+            key (str): the key.
+        """
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7))
+                   for position in self._positions(key))
+
+    def to_bytes(self) -> bytes:
+        """
+        Get the bits of the filter.
+
+        Returns:
+            bytes: the bits.
+        """
+        return bytes(self._bits)
+
+
+# ########################################################################## #
+# ################################ ID INDEX ################################ #
+# ########################################################################## #
+
+
+class IdIndex():
+    """
+    Persisted hash index of the requirement IDs.
+
+    The index maps the IDs to the requirement files and the normalized
+    titles to the IDs, and keeps a Bloom filter of the normalized titles
+    so that most uniqueness checks do not look at the dictionary. The IDs
+    are allocated from a counter file of the metadata folder; its lock
+    also serializes the modifications of the index between processes.
+    The index is kept up to date with the events of the requirement files
+    (see attach), e.g. renamed, retitled or moved files; when both are
+    held, the lock of the IDs is taken after the lock of the database.
+
+    Attributes:
+        rootdir (Path): root directory of the database.
+    """
+
+    def __init__(self, rootdir: Path):
+        """
+        Create the index of a database and load the saved one, if any.
+
+        Args:
+            rootdir (Path): root directory of the database.
+        """
+        self.rootdir = Path(rootdir)
+        # ID -> (file relative to the rootdir, normalized title)
+        self._entries: Dict[int, Tuple[str, str]] = {}
+        self._titles: Dict[str, int] = {}
+        self._paths: Dict[str, int] = {}  # file relative to the rootdir -> ID
+        self._bloom = BloomFilter()
+        self._stat: Optional[Tuple[int, int]] = None
+        self._counter: Optional[IO[bytes]] = None
+        self.reload()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    # ------------------------------ LOOKUPS ----------------------------- #
+
+    def get_path(self, identifier: int) -> Optional[Path]:
+        """
+        Get the requirement file of an ID.
+
+        Args:
+            identifier (int): the ID.
+
+        Returns:
+            Path | None: the requirement file, None if the ID is unknown.
+        """
+        entry = self._entries.get(identifier)
+        return None if entry is None else self.rootdir / entry[0]
+
+    def get_id(self, title: str) -> Optional[int]:
+        """
+        Get the ID of a title.
+
+        Args:
+            title (str): the title (see normalize_title).
+
+        Returns:
+            int | None: the ID, None if no requirement has this title.
+        """
+        key = normalize_title(title)
+        if key not in self._bloom:
+            return None
+        return self._titles.get(key)
+
+    def has_title(self, title: str) -> bool:
+        """
+        Check if a requirement already has a title.
+
+        Args:
+            title (str): the title (see normalize_title).
+
+        Returns:
+            bool: True if the title is used.
+        """
+        return self.get_id(title) is not None
+
+    # --------------------------- MODIFICATIONS -------------------------- #
+
+    @contextmanager
+    def locked(self, timeout: Optional[float] = None) -> Iterator[IdIndex]:
+        """
+        Hold the exclusive lock of the IDs and reload the index if it was
+        modified by another process. The lock is reentrant in a thread.
+
+        Args:
+            timeout (float | None): seconds to wait for the lock, None to
+            wait forever.
+
+        Yields:
+            IdIndex: the index.
+
+        Raises:
+            LockTimeout: If the lock is not acquired before the timeout.
+        """
+        counter_path = self._metadata_path(IdSettings.counter_file)
+        held = _HELD.__dict__.setdefault("counters", {})
+        key = counter_path.absolute()
+        if key in held:
+            outer, self._counter = self._counter, held[key]
+            try:
+                self.reload()
+                yield self
+            finally:
+                self._counter = outer
+            return
+
+        counter_path.parent.mkdir(parents=True, exist_ok=True)
+        with open_locked(counter_path, timeout=timeout) as counter:
+            self._counter = held[key] = counter
+            try:
+                self.reload()
+                yield self
+            finally:
+                self._counter = None
+                del held[key]
+
+    def allocate(self, count: int = 1) -> range:
+        """
+        Allocate new IDs, greater than all the allocated ones.
+
+        Args:
+            count (int): number of IDs. Defaults to 1.
+
+        Returns:
+            range: the allocated IDs.
+        """
+        if self._counter is None:
+            with self.locked():
+                return self.allocate(count)
+
+        self._counter.seek(0)
+        last = int(self._counter.read().strip() or 0)
+        self._counter.seek(0)
+        self._counter.truncate()
+        self._counter.write(str(last + count).encode("ascii"))
+        self._counter.flush()
+        os.fsync(self._counter.fileno())
+        return range(last + 1, last + count + 1)
+
+    def add(self, identifier: int, title: str, path: Path):
+        """
+        Add a requirement to the index (not saved).
+
+        Args:
+            identifier (int): the ID of the requirement.
+            title (str): the title of the requirement.
+            path (Path): the requirement file.
+        """
+        self.remove(identifier)
+        key = normalize_title(title)
+        file = self._key(path)
+        if file in self._paths:  # the file had another ID
+            self.remove(self._paths[file])
+        self._entries[identifier] = (file, key)
+        self._titles[key] = identifier
+        self._paths[file] = identifier
+        if len(self._titles) * IdSettings.bits_per_title > self._bloom.size:
+            self._rebuild_bloom()
+        else:
+            self._bloom.add(key)
+
+    def remove(self, identifier: int):
+        """
+        Remove a requirement from the index (not saved).
+
+        Args:
+            identifier (int): the ID of the requirement.
+        """
+        entry = self._entries.pop(identifier, None)
+        if entry is not None:
+            # the title stays in the Bloom filter until the next rebuild
+            if self._titles.get(entry[1]) == identifier:
+                del self._titles[entry[1]]
+            self._paths.pop(entry[0], None)
+
+    def rebuild(
+        self,
+        files: Iterable[Path],
+        on_error: Optional[Callable[[Path, Exception], None]] = None,
+    ) -> int:
+        """
+        Rebuild the index from the requirement files and make the counter
+        greater than all the found IDs. The files without ID are ignored;
+        the files which can not be read, or with the ID or the title
+        (see normalize_title) of a file found before, are not indexed.
+
+        Args:
+            files (Iterable[Path]): the requirement files.
+            on_error (Callable[[Path, Exception], None] | None): called
+            with the files which are not indexed and the error (a
+            ValueError for a duplicated ID or title).
+
+        Returns:
+            int: the number of indexed requirements.
+        """
+        with self.locked():
+            self._entries.clear()
+            self._titles.clear()
+            self._paths.clear()
+            last_found = 0
+            for file in files:
+                try:
+                    fields = ReqFile(path=file).read_fields(
+                        ("title", "identifier"))
+                    if fields["identifier"] is None:
+                        continue
+                    identifier = int(fields["identifier"])
+                    key = normalize_title(fields["title"])
+                    last_found = max(last_found, identifier)
+                    if identifier in self._entries:
+                        raise ValueError(
+                            f"The ID {identifier} of {file} is already " +
+                            f"used by {self._entries[identifier][0]}"
+                        )
+                    if key in self._titles:
+                        raise ValueError(
+                            f"The title [{fields['title']}] of {file} is " +
+                            f"already used by the ID {self._titles[key]}"
+                        )
+                except (ValidationError, yaml.YAMLError, OSError,
+                        ValueError, TypeError, AttributeError) as error:
+                    if on_error is not None:
+                        on_error(Path(file), error)
+                    continue
+                file = self._key(file)
+                self._entries[identifier] = (file, key)
+                self._titles[key] = identifier
+                self._paths[file] = identifier
+            self._rebuild_bloom()
+            self._allocate_until(last_found)
+            self.save()
+        return len(self._entries)
+
+    # ------------------------------ EVENTS ------------------------------ #
+
+    def update(self, events: List[Event]):
+        """
+        Update the index with the events of the requirement files (see
+        events.EVENTS) and save it: the written and renamed files are read
+        again (e.g. modified title or ID), the deleted files are removed.
+        The events which do not modify the index do not lock it.
+
+        Args:
+            events (List[Event]): the events.
+        """
+        events = [event for event in events
+                  if self._key(event.path, strict=False) is not None or
+                  isinstance(event, FileRenamed) and
+                  self._key(event.old_path, strict=False) is not None]
+        if not events:
+            return
+        self.reload()
+        found = {
+            event.path: self._read_id(event.path) for event in events
+            if isinstance(event, (FileWritten, FileRenamed))
+        }
+        if not any(self._concerns(event, found) for event in events):
+            return
+        with self.locked():
+            for event in events:
+                self._apply(event, found)
+            self._allocate_until(max(self._entries, default=0))
+            self.save()
+
+    __call__ = update  # subscriber of EVENTS
+
+    def attach(self) -> IdIndex:
+        """
+        Subscribe the index of the database to EVENTS (once per database
+        and process).
+
+        Returns:
+            IdIndex: the subscribed index.
+        """
+        rootdir = self.rootdir.absolute()
+        with _ATTACHED_LOCK:
+            index = _ATTACHED.get(rootdir)
+            if index is None:
+                index = _ATTACHED[rootdir] = self
+                EVENTS.subscribe(index)
+        return index
+
+    def _read_id(self, path: Path) -> Union[None, Tuple[int, str], object]:
+        """PRIVATE - ID and normalized title of a file: None if it has no
+        ID or can not be read, _MISSING if it does not exist anymore"""
+        try:
+            fields = ReqFile(path=path).read_fields(("title", "identifier"))
+            if fields["identifier"] is None:
+                return None
+            return int(fields["identifier"]), normalize_title(fields["title"])
+        except FileNotFoundError:
+            return _MISSING
+        except (ValidationError, yaml.YAMLError, OSError, ValueError,
+                TypeError, AttributeError):
+            return None
+
+    def _concerns(self, event: Event, found: Dict[Path, object]) -> bool:
+        """PRIVATE - check if an event modifies the index"""
+        if isinstance(event, FolderCleaned):
+            return bool(self._files_in(event.path))
+        if isinstance(event, FileDeleted):
+            return self._key(event.path, strict=False) in self._paths
+        if isinstance(event, FileRenamed) and \
+                self._key(event.old_path, strict=False) in self._paths:
+            return True
+        file = self._key(event.path, strict=False)
+        if file is None:
+            return False
+        entry = found[event.path]
+        if isinstance(event, FileRenamed):
+            return entry not in (None, _MISSING)
+        if entry is _MISSING:  # moved again, see the next events
+            return False
+        current = self._entries.get(self._paths.get(file))
+        return current != (None if entry is None else (file, entry[1])) \
+            or (entry is not None and self._paths.get(file) != entry[0])
+
+    def _apply(self, event: Event, found: Dict[Path, object]):
+        """PRIVATE - apply an event to the index"""
+        if isinstance(event, FolderCleaned):
+            for file in self._files_in(event.path):
+                self.remove(self._paths[file])
+            return
+        identifier = self._paths.get(self._key(
+            event.old_path if isinstance(event, FileRenamed) else event.path,
+            strict=False))
+        if isinstance(event, FileDeleted) or \
+                self._key(event.path, strict=False) is None:
+            if identifier is not None:
+                self.remove(identifier)
+            return
+        entry = found[event.path]
+        if entry is _MISSING:
+            if isinstance(event, FileRenamed) and identifier is not None:
+                # moved again, the title is checked by the next events
+                self.add(identifier, self._entries[identifier][1],
+                         event.path)
+        elif entry is not None:
+            if identifier is not None and identifier != entry[0]:
+                self.remove(identifier)
+            self.add(entry[0], entry[1], event.path)
+        elif identifier is not None:
+            self.remove(identifier)
+
+    def _files_in(self, folder: Path) -> List[str]:
+        """PRIVATE - indexed files of a folder"""
+        prefix = self._key(folder, strict=False)
+        if prefix is None:
+            return []
+        return [file for file in self._paths
+                if file.startswith(prefix + "/")]
+
+    def _allocate_until(self, identifier: int):
+        """PRIVATE - make the counter at least equal to an ID (locked)"""
+        self._counter.seek(0)
+        last = int(self._counter.read().strip() or 0)
+        if identifier > last:
+            self.allocate(identifier - last)
+
+    def _rebuild_bloom(self):
+        """PRIVATE - new Bloom filter sized for the titles"""
+        size = self._bloom.size
+        while len(self._titles) * IdSettings.bits_per_title > size:
+            size *= 2
+        self._bloom = BloomFilter(size, self._bloom.hashes)
+        for key in self._titles:
+            self._bloom.add(key)
+
+    # ---------------------------- PERSISTENCE --------------------------- #
+
+    def save(self):
+        """Write the index in the metadata folder (atomic replacement)."""
+        path = self._metadata_path(IdSettings.index_file)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as file:
+            json.dump({
+                "entries": {str(key): value
+                            for key, value in self._entries.items()},
+                "bloom_size": self._bloom.size,
+                "bloom_hashes": self._bloom.hashes,
+                "bloom": base64.b64encode(self._bloom.to_bytes()).decode(),
+            }, file)
+        tmp_path.replace(path)
+        self._stat = self._file_stat(path)
+
+    def reload(self) -> bool:
+        """
+        Load the saved index if it was modified since the last load.
+
+        Returns:
+            bool: True if the index was loaded.
+        """
+        path = self._metadata_path(IdSettings.index_file)
+        stat = self._file_stat(path)
+        if stat is None or stat == self._stat:
+            return False
+        try:
+            with open(path, "r") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return False
+        self._entries = {int(key): tuple(value)
+                         for key, value in data["entries"].items()}
+        self._titles = {key: identifier
+                        for identifier, (_, key) in self._entries.items()}
+        self._paths = {file: identifier
+                       for identifier, (file, _) in self._entries.items()}
+        self._bloom = BloomFilter(data["bloom_size"], data["bloom_hashes"],
+                                  base64.b64decode(data["bloom"]))
+        self._stat = stat
+        return True
+
+    @staticmethod
+    def _file_stat(path: Path) -> Optional[Tuple[int, int]]:
+        """PRIVATE - modification time and size of a file (None if
+        missing)"""
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def _metadata_path(self, name: str) -> Path:
+        """PRIVATE - path of a file of the metadata folder"""
+        return self.rootdir / FolderStructure.metadata_folder / name
+
+    def _key(self, path: Path, strict: bool = True) -> Optional[str]:
+        """PRIVATE - path of a file relative to the rootdir (None if
+        outside and not strict)"""
+        try:
+            return Path(path).absolute().relative_to(
+                self.rootdir.absolute()).as_posix()
+        except ValueError:
+            if strict:
+                raise
+            return None
+
+
+# result of IdIndex._read_id for the files which do not exist anymore
+_MISSING = object()
+
+# ID locks held by the current thread: counter file -> locked file
+_HELD = threading.local()
+
+# attached indexes by rootdir
+_ATTACHED: Dict[Path, IdIndex] = {}
+_ATTACHED_LOCK = threading.Lock()
+
+
+def _attach_index(rootdir: Path):
+    """PRIVATE - attach the index of a database, if it has IDs"""
+    if rootdir not in _ATTACHED and (
+            rootdir / FolderStructure.metadata_folder /
+            IdSettings.index_file).is_file():
+        IdIndex(rootdir).attach()
+
+
+EVENTS.add_attacher(_attach_index)
@@ -0,0 +1,593 @@
+""" Secondary indexes on the validation status and the creation date"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import bisect
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+import yaml
+from pydantic.datetime_parse import parse_datetime
+from .__settings import (FolderStructure, IndexSettings,
+                         RequirementSettings)
+from .requirements import ReqFile
+
+__all__ = [
+    "IncrementalIndex",
+    "StatusIndex",
+    "DateIndex",
+    "RequirementIndex",
+    "file_signature",
+    "read_status_and_date",
+    "to_microseconds",
+]
+
+
+# ########################################################################## #
+# ########################### INCREMENTAL INDEX ############################ #
+# ########################################################################## #
+
+
+class IncrementalIndex():
+    """
+    Base class of the indexes of the requirement files updated
+    incrementally.
+
+    The files are identified by their path relative to the root directory
+    and their signature (see file_signature) is kept, so that refresh()
+    only reads the new and modified files. The files which can not be read
+    are not indexed: they are recorded with their error and read again
+    once modified. The subclasses implement update, remove, _signature and
+    _keys.
+
+    Attributes:
+        rootdir (Path): The root directory of the database.
+    """
+
+    def __init__(self, rootdir: Path):
+        """
+        Initialize an empty index.
+
+        Args:
+            rootdir (Path): The root directory of the database.
+        """
+        self.rootdir = Path(rootdir)
+        # unreadable files: key -> (signature, error)
+        self._errors: Dict[str, Tuple[Optional[tuple], Exception]] = {}
+
+    @property
+    def errors(self) -> Dict[Path, Exception]:
+        """unreadable files (not indexed) and their errors"""
+        return {self.rootdir / key: error
+                for key, (_, error) in self._errors.items()}
+
+    def update(self, path: Path):
+        """
+        Add or update a requirement file.
+
+        Args:
+            path (Path): path of the requirement file.
+
+        Raises:
+            yaml.YAMLError, OSError, TypeError, ValueError: If the file can
+            not be read (the file is removed from the index).
+        """
+        raise NotImplementedError
+
+    def remove(self, path: Path):
+        """
+        Remove a requirement file.
+
+        Args:
+            path (Path): path of the requirement file.
+        """
+        raise NotImplementedError
+
+    def refresh(
+        self,
+        files: Iterable[Path],
+        on_error: Optional[Callable[[Path, Exception], None]] = None,
+    ) -> bool:
+        """
+        Update the index with the current requirement files. Only the new
+        files and the files with a different modification time or size are
+        read. The files which can not be read are skipped (see errors).
+
+        Args:
+            files (Iterable[Path]): the current requirement files.
+            on_error (Callable[[Path, Exception], None] | None): called
+            with the files which can not be read, which are skipped.
+
+        Returns:
+            bool: True if the index was modified.
+        """
+        modified = False
+        current_keys = set()
+        for file in files:
+            key = self._key(file)
+            current_keys.add(key)
+            try:
+                stat = file_signature(file)
+            except OSError:  # deleted meanwhile, error raised by update
+                stat = None
+            indexed = self._signature(key)
+            if indexed is not None and indexed == stat:
+                continue
+            failed = self._errors.get(key)
+            if failed is None or failed[0] != stat:
+                try:
+                    self.update(file)
+                except (yaml.YAMLError, OSError, TypeError,
+                        ValueError) as error:
+                    failed = self._errors[key] = (stat, error)
+                else:
+                    failed = None
+                modified = True
+            if failed is not None and on_error is not None:
+                on_error(self.rootdir / key, failed[1])
+
+        for key in set(self._errors) - current_keys:
+            del self._errors[key]
+        for key in set(self._keys()) - current_keys:
+            self.remove(self.rootdir / key)
+            modified = True
+        return modified
+
+    # ------------------------------ PRIVATE ----------------------------- #
+
+    def _read(self, path: Path) -> Tuple[str, tuple, str, int]:
+        """PRIVATE - key, signature, validation status and creation date of
+        a file, removed from the index if it can not be read"""
+        key = self._key(path)
+        file = self.rootdir / key
+        try:
+            stat = file_signature(file)
+            status, date = read_status_and_date(file)
+        except Exception:
+            self.remove(path)
+            raise
+        self._errors.pop(key, None)
+        return key, stat, status, date
+
+    def _key(self, path: Path | str) -> str:
+        """PRIVATE - identifier of a file: path relative to the rootdir"""
+        path = Path(path)
+        try:
+            path = path.relative_to(self.rootdir)
+        except ValueError:
+            if path.is_absolute():
+                path = Path(os.path.relpath(path, self.rootdir.absolute()))
+        return path.as_posix()
+
+    def _signature(self, key: str) -> Optional[tuple]:
+        """PRIVATE - signature of an indexed file (None if not indexed)"""
+        raise NotImplementedError
+
+    def _keys(self) -> Iterable[str]:
+        """PRIVATE - keys of the indexed files"""
+        raise NotImplementedError
+
+
+# ########################################################################## #
+# ############################## STATUS INDEX ############################## #
+# ########################################################################## #
+
+
+class StatusIndex():
+    """
+    Bitmap index of the validation status.
+
+    Each validation status has a bit-packed NumPy array where the bit of a
+    row is set if the requirement of the row has this status, so that
+    combinations of status are bitwise operations.
+
+    Attributes:
+        bitmaps (Dict[str, np.ndarray]): bit-packed array per status.
+    """
+
+    def __init__(self, capacity: int = IndexSettings.initial_capacity):
+        """
+        Initialize an empty index.
+
+        Args:
+            capacity (int): number of rows allocated.
+        """
+        size = (capacity + 7) // 8
+        self.bitmaps: Dict[str, np.ndarray] = {
+            status: np.zeros(size, dtype=np.uint8)
+            for status in RequirementSettings.validation_status
+        }
+
+    @property
+    def capacity(self) -> int:
+        """number of rows allocated"""
+        return next(iter(self.bitmaps.values())).size * 8
+
+    def grow(self, capacity: int):
+        """
+        Allocate rows up to the capacity.
+
+        Args:
+            capacity (int): the minimum number of rows.
+        """
+        size = (capacity + 7) // 8
+        for status, bitmap in self.bitmaps.items():
+            if bitmap.size < size:
+                self.bitmaps[status] = np.concatenate(
+                    (bitmap, np.zeros(size - bitmap.size, dtype=np.uint8)))
+
+    def set(self, row: int, status: Optional[str]):
+        """
+        Set the status of a row.
+
+        Args:
+            row (int): the row.
+            status (str | None): the status. None removes the row.
+        """
+        byte, mask = row >> 3, np.uint8(0x80 >> (row & 7))
+        for bitmap_status, bitmap in self.bitmaps.items():
+            if bitmap_status == status:
+                bitmap[byte] |= mask
+            else:
+                bitmap[byte] &= ~mask
+
+    def select(self, *statuses: str) -> np.ndarray:
+        """
+        Get the bitmap of the rows with one of the statuses.
+
+        Args:
+            *statuses (str): the selected statuses.
+
+        Returns:
+            np.ndarray: bit-packed array of the selected rows.
+
+        Raises:
+            ValueError: If a status is not permitted.
+        """
+        result = np.zeros_like(next(iter(self.bitmaps.values())))
+        for status in statuses:
+            try:
+                result |= self.bitmaps[status.upper()]
+            except KeyError:
+                raise ValueError(
+                    f"Validation status [{status}] is not in" +
+                    " the permitted list " +
+                    f"{RequirementSettings.validation_status}"
+                ) from None
+        return result
+
+
+# ########################################################################## #
+# ############################### DATE INDEX ############################### #
+# ########################################################################## #
+
+
+class DateIndex():
+    """
+    Sorted index of the creation date.
+
+    The rows are kept in a single list sorted by (date, row), so a row is
+    found by bisection both to add and to remove it.
+
+    Attributes:
+        entries (List[Tuple[int, int]]): sorted (creation date in POSIX
+        microseconds, row) pairs.
+    """
+
+    def __init__(self, entries: Iterable[Tuple[int, int]] = ()):
+        """
+        Initialize the index.
+
+        Args:
+            entries (Iterable[Tuple[int, int]]): (creation date, row) pairs,
+            sorted once. Defaults to an empty index.
+        """
+        self.entries: List[Tuple[int, int]] = sorted(entries)
+
+    def add(self, row: int, date: int):
+        """
+        Add a row.
+
+        Args:
+            row (int): the row.
+            date (int): the creation date (POSIX microseconds).
+        """
+        bisect.insort(self.entries, (date, row))
+
+    def remove(self, row: int, date: int):
+        """
+        Remove a row.
+
+        Args:
+            row (int): the row.
+            date (int): the creation date of the row (POSIX microseconds).
+
+        Raises:
+            ValueError: If the row is not indexed with this date.
+        """
+        position = bisect.bisect_left(self.entries, (date, row))
+        if (position == len(self.entries) or
+                self.entries[position] != (date, row)):
+            raise ValueError(f"Row {row} is not indexed at date {date}")
+        del self.entries[position]
+
+    def select(self, start: Optional[int] = None,
+               end: Optional[int] = None) -> List[int]:
+        """
+        Get the rows created in [start, end[.
+
+        Args:
+            start (int | None): first date (POSIX microseconds) included.
+            end (int | None): last date (POSIX microseconds) excluded.
+
+        Returns:
+            List[int]: the rows, sorted by creation date.
+        """
+        first = (0 if start is None
+                 else bisect.bisect_left(self.entries, (start,)))
+        last = (len(self.entries) if end is None
+                else bisect.bisect_left(self.entries, (end,)))
+        return [row for _, row in self.entries[first:last]]
+
+
+# ########################################################################## #
+# ########################### REQUIREMENT INDEX ############################ #
+# ########################################################################## #
+
+
+class RequirementIndex(IncrementalIndex):
+    """
+    Secondary indexes of a requirement database.
+
+    The rows are requirement files identified by their path relative to
+    the root directory, updated incrementally (see IncrementalIndex).
+
+    Attributes:
+        rootdir (Path): The root directory of the database.
+        status (StatusIndex): index of the validation status.
+        date (DateIndex): index of the creation date.
+    """
+
+    def __init__(self, rootdir: Path):
+        """
+        Initialize an empty index.
+
+        Args:
+            rootdir (Path): The root directory of the database.
+        """
+        super().__init__(rootdir)
+        self.status = StatusIndex()
+        self.date = DateIndex()
+        self._paths: List[Optional[str]] = []
+        self._rows: Dict[str, int] = {}
+        self._stats: List[tuple] = []
+        self._dates: List[int] = []
+        self._free_rows: List[int] = []
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __contains__(self, path: Path) -> bool:
+        return self._key(path) in self._rows
+
+    # ------------------------------ UPDATE ------------------------------ #
+
+    def update(self, path: Path):
+        key, stat, status, date = self._read(path)
+        row = self._rows.get(key)
+        if row is None:
+            row = self._new_row(key)
+        else:
+            self.date.remove(row, self._dates[row])
+
+        self._stats[row] = stat
+        self._dates[row] = date
+        self.status.set(row, status)
+        self.date.add(row, date)
+
+    def remove(self, path: Path):
+        key = self._key(path)
+        self._errors.pop(key, None)
+        row = self._rows.pop(key, None)
+        if row is None:
+            return
+        self.status.set(row, None)
+        self.date.remove(row, self._dates[row])
+        self._paths[row] = None
+        self._free_rows.append(row)
+
+    # ------------------------------ QUERIES ----------------------------- #
+
+    def filter(
+        self,
+        statuses: Iterable[str] = (),
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None,
+    ) -> List[Path]:
+        """
+        Get the requirement files matching the criteria.
+
+        Args:
+            statuses (Iterable[str]): accepted validation statuses. All the
+            statuses are accepted if empty.
+            start (datetime | None): first creation date included.
+            end (datetime | None): last creation date excluded.
+
+        Returns:
+            List[Path]: the requirement files, sorted by creation date if
+            a date range is given.
+        """
+        statuses = tuple(statuses)
+        if start is None and end is None:
+            if not statuses:
+                return [self.rootdir / key for key in self._rows]
+            rows = np.flatnonzero(np.unpackbits(self.status.select(*statuses)))
+        else:
+            rows = np.array(self.date.select(
+                None if start is None else to_microseconds(start),
+                None if end is None else to_microseconds(end)),
+                dtype=np.int64)
+            if statuses:
+                bits = np.unpackbits(self.status.select(*statuses))
+                rows = rows[bits[rows].astype(bool)]
+        return [self.rootdir / self._paths[row] for row in rows]
+
+    # ---------------------------- PERSISTENCE --------------------------- #
+
+    def save(self, path: Optional[Path] = None):
+        """
+        Save the index.
+
+        Args:
+            path (Path | None): file of the index. Defaults to the index
+            file of the metadata folder.
+        """
+        path = self._index_file() if path is None else Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_name(path.stem + ".tmp.npz")
+        np.savez(
+            tmp_path,
+            paths=np.array([p or "" for p in self._paths], dtype=str),
+            stats=np.array(self._stats, dtype=np.int64).reshape(-1, 2),
+            dates=np.array(self._dates, dtype=np.int64),
+            **{f"status_{status}": bitmap
+               for status, bitmap in self.status.bitmaps.items()},
+        )
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, rootdir: Path,
+             path: Optional[Path] = None) -> RequirementIndex:
+        """
+        Load a saved index.
+
+        Args:
+            rootdir (Path): The root directory of the database.
+            path (Path | None): file of the index. Defaults to the index
+            file of the metadata folder.
+
+        Returns:
+            RequirementIndex: the index.
+
+        Raises:
+            FileNotFoundError: If the index file does not exist.
+        """
+        index = cls(rootdir)
+        path = index._index_file() if path is None else Path(path)
+        with np.load(path, allow_pickle=False) as data:
+            index._paths = [p or None for p in data["paths"].tolist()]
+            index._stats = [tuple(s) for s in data["stats"].tolist()]
+            index._dates = data["dates"].tolist()
+            for status in index.status.bitmaps:
+                index.status.bitmaps[status] = data[f"status_{status}"]
+
+        for row, key in enumerate(index._paths):
+            if key is None:
+                index._free_rows.append(row)
+            else:
+                index._rows[key] = row
+        index.date = DateIndex(
+            (index._dates[row], row) for row in index._rows.values())
+        return index
+
+    # ------------------------------ PRIVATE ----------------------------- #
+
+    def _index_file(self) -> Path:
+        """PRIVATE - default path of the index file"""
+        return (self.rootdir / FolderStructure.metadata_folder /
+                IndexSettings.index_file)
+
+    def _signature(self, key: str) -> Optional[tuple]:
+        row = self._rows.get(key)
+        return None if row is None else self._stats[row]
+
+    def _keys(self) -> Iterable[str]:
+        return self._rows
+
+    def _new_row(self, key: str) -> int:
+        """PRIVATE - allocate a row"""
+        if self._free_rows:
+            row = self._free_rows.pop()
+            self._paths[row] = key
+        else:
+            row = len(self._paths)
+            self._paths.append(key)
+            self._stats.append((0, 0))
+            self._dates.append(0)
+            if row >= self.status.capacity:
+                self.status.grow(2 * self.status.capacity)
+        self._rows[key] = row
+        return row
+
+
+# ########################################################################## #
+# ################################ HELPERS ################################# #
+# ########################################################################## #
+
+
+def file_signature(path: Path) -> Tuple[int, int]:
+    """
+    Get the modification time and size of a file, which change when the
+    file is modified (used by the incremental indexes).
+
+    Args:
+        path (Path): path of the file.
+
+    Returns:
+        Tuple[int, int]: the modification time (ns) and size of the file.
+
+    Raises:
+        OSError: If the file does not exist.
+    """
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+def read_status_and_date(path: Path) -> Tuple[str, int]:
+    """
+    Read the indexed fields of a requirement file (see ReqFile.read_fields).
+
+    Args:
+        path (Path): path of the requirement file.
+
+    Returns:
+        Tuple[str, int]: the validation status and the creation date
+        (POSIX microseconds).
+
+    Raises:
+        yaml.YAMLError, OSError, TypeError, ValueError: If the file can not
+        be read or the fields are not valid.
+    """
+    fields = ReqFile(path=path).read_fields(
+        ("validation_status", "creation_date"))
+    status = str(fields["validation_status"]).upper()
+    if status not in RequirementSettings.validation_status:
+        raise ValueError(
+            f"Validation status [{status}] is not in the permitted list " +
+            f"{RequirementSettings.validation_status}")
+    return status, to_microseconds(fields["creation_date"])
+
+
+def to_microseconds(date: Any) -> int:
+    """
+    Convert a date to a POSIX time in microseconds (naive dates as UTC).
+
+    Args:
+        date (Any): the date, a datetime or a value parsed as the
+        creation_date of Requirement (ISO string, POSIX time).
+
+    Returns:
+        int: the POSIX time in microseconds.
+
+    Raises:
+        TypeError, ValueError: If the value is not a date.
+    """
+    if not isinstance(date, datetime):
+        date = parse_datetime(date)
+    if date.tzinfo is None:
+        date = date.replace(tzinfo=timezone.utc)
+    delta = date - datetime(1970, 1, 1, tzinfo=timezone.utc)
+    return (delta.days * 86_400 + delta.seconds) * 1_000_000 + \
+        delta.microseconds
@@ -0,0 +1,327 @@
+""" Streaming import and export of requirements (JSON Lines and CSV)"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import csv
+import itertools
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import (Any, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional, TextIO, Tuple)
+from pydantic import ValidationError
+from .__settings import (FolderStructure, InterchangeSettings,
+                         RequirementFileSettings)
+from .database import ReqFolder
+from .events import EVENTS
+from .layout import layout_path
+from .locking import ConflictError, content_hash
+from .requirements import Requirement, ReqFile
+from .utils import boundedMap, externalSort, groupBy
+
+__all__ = [
+    "ImportResult",
+    "export_requirements",
+    "group_requirements",
+    "import_requirements",
+]
+
+_EMPTY_HASH = content_hash(b"")
+
+
+class ImportResult(NamedTuple):
+    files: List[Path]  # written requirement files
+    errors: List[Tuple[int, str]]  # (record number, error message)
+
+
+# ########################################################################## #
+# ################################# EXPORT ################################# #
+# ########################################################################## #
+
+
+def export_requirements(
+    req_folder: ReqFolder,
+    stream: TextIO,
+    format: str = "jsonl",
+    fields: Optional[Iterable[str]] = None,
+    sort_by: Optional[str] = None,
+    reverse: bool = False,
+    memory_budget: int = InterchangeSettings.memory_budget,
+) -> int:
+    """
+    Export the requirements of a database, one file at a time.
+
+    Only the requested fields are read from the files (see
+    ReqFile.read_fields), so that the memory use does not depend on the
+    size of the database. A sorted export is sorted out of core (see
+    utils.externalSort): the memory use is bounded by the memory budget.
+
+    Args:
+        req_folder (ReqFolder): the database.
+        stream (TextIO): output text stream.
+        format (str): "jsonl" or "csv". Defaults to "jsonl".
+        fields (Iterable[str] | None): exported Requirement fields.
+        Defaults to all the fields.
+        sort_by (str | None): Requirement field of the export order (the
+        missing values after the others in ascending order). Defaults to
+        None (file order).
+        reverse (bool): descending order. Defaults to False.
+        memory_budget (int): approximate memory of the sort (bytes).
+
+    Returns:
+        int: number of exported requirements.
+
+    Raises:
+        ValueError: If the sort field is not a Requirement field.
+    """
+    _check_format(format)
+    fields = tuple(Requirement.__fields__ if fields is None else fields)
+    if sort_by is not None:
+        _check_field(sort_by, "Sort")
+
+    if format == "csv":
+        writer = csv.DictWriter(stream, fieldnames=fields)
+        writer.writeheader()
+
+    read = fields if sort_by in (None, *fields) else fields + (sort_by,)
+    rows: Iterable[Dict[str, Any]] = (
+        ReqFile(path=file).read_fields(read)
+        for file in req_folder.get_list_of_requirement_files())
+    if sort_by is not None:
+        rows = externalSort(
+            rows, key=lambda row: _sort_key(row[sort_by]), reverse=reverse,
+            memoryBudget=memory_budget)
+
+    number = 0
+    for row in rows:
+        if len(read) != len(fields):
+            del row[sort_by]
+        if format == "csv":
+            writer.writerow({key: _to_text(value)
+                             for key, value in row.items()})
+        else:
+            stream.write(json.dumps(row, default=_to_text) + "\n")
+        number += 1
+    return number
+
+
+def group_requirements(
+    req_folder: ReqFolder,
+    group_by: str = "validation_status",
+    fields: Iterable[str] = ("title",),
+    memory_budget: int = InterchangeSettings.memory_budget,
+) -> Iterator[Tuple[Any, Iterator[Dict[str, Any]]]]:
+    """
+    Group the requirements of a database by the value of a field, e.g. a
+    report per validation status.
+
+    As the sorted export, only the requested fields are read and the
+    requirements are sorted out of core (see utils.groupBy): the memory
+    use is bounded by the memory budget, whatever the size of the groups.
+
+    Args:
+        req_folder (ReqFolder): the database.
+        group_by (str): Requirement field of the groups. Defaults to the
+        validation status.
+        fields (Iterable[str]): Requirement fields of the grouped rows.
+        Defaults to the title.
+        memory_budget (int): approximate memory of the sort (bytes).
+
+    Returns:
+        Iterator[Tuple[Any, Iterator[Dict[str, Any]]]]: (value, rows of the
+        group) in ascending order of the values (the missing values
+        last). A group shall be consumed before the next one.
+
+    Raises:
+        ValueError: If a field is not a Requirement field.
+    """
+    _check_field(group_by, "Group")
+    fields = tuple(fields)
+    for field in fields:
+        _check_field(field, "Group")
+    read = fields if group_by in fields else fields + (group_by,)
+
+    def rows() -> Iterator[Dict[str, Any]]:
+        """the rows with their group key, read lazily"""
+        for file in req_folder.get_list_of_requirement_files():
+            row = ReqFile(path=file).read_fields(read)
+            yield _sort_key(row[group_by]), {
+                field: row[field] for field in fields}
+
+    for key, group in groupBy(rows(), key=lambda item: item[0],
+                              memoryBudget=memory_budget):
+        yield key[1] if not key[0] else None, (row for _, row in group)
+
+
+def _check_field(field: str, usage: str):
+    """PRIVATE - raise a ValueError if a field is not a Requirement field"""
+    if field not in Requirement.__fields__:
+        raise ValueError(
+            f"{usage} field [{field}] is not in the Requirement" +
+            f" fields {tuple(Requirement.__fields__)}"
+        )
+
+
+def _sort_key(value: Any) -> Tuple[bool, Any]:
+    """PRIVATE - sort key of a field value (the missing values after the
+    others)"""
+    if value is None:
+        return (True, 0)
+    if isinstance(value, datetime) and value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return (False, value)
+
+
+def _to_text(value: Any) -> Any:
+    """PRIVATE - serialize the values which are not JSON/CSV types"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if value is None:
+        return ""
+    if isinstance(value, (str, int, float, bool)):
+        return value
+    return str(value)
+
+
+# ########################################################################## #
+# ################################# IMPORT ################################# #
+# ########################################################################## #
+
+
+def import_requirements(
+    req_folder: ReqFolder,
+    stream: TextIO,
+    format: str = "jsonl",
+    folder: str = FolderStructure.main_folder,
+    workers: Optional[int] = None,
+    chunk_size: int = InterchangeSettings.chunk_size,
+) -> ImportResult:
+    """
+    Import requirements in a database.
+
+    The records are read lazily and validated by chunks in a process pool;
+    a bounded number of chunks is in flight, so that the memory use does
+    not depend on the size of the input. The requirement files are named
+    after the title; a "_<n>" suffix is added to the name if a file already
+    exists. The files are created atomically and locked as ReqFile.write
+    does (see ReqFile.write_document). The identifiers of the records are dropped: the IDs of a
+    database are only allocated by ReqFolder.create_requirement.
+
+    Args:
+        req_folder (ReqFolder): the database.
+        stream (TextIO): input text stream.
+        format (str): "jsonl" or "csv". Defaults to "jsonl".
+        folder (str): folder of the imported requirements, relative to
+        the rootdir. Defaults to the main folder.
+        workers (int | None): number of processes. Defaults to the number
+        of CPUs; 0 or 1 validates in the current process.
+        chunk_size (int): number of records per chunk.
+
+    Returns:
+        ImportResult: the written files and the invalid records.
+    """
+    _check_format(format)
+    records = _read_records(stream, format)
+    chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    files: List[Path] = []
+    errors: List[Tuple[int, str]] = []
+
+    with req_folder.lock(shared=True):
+        target = (req_folder.rootdir / folder, req_folder.get_layout())
+        if workers <= 1:
+            results: Iterator[list] = map(_validate_chunk, chunks)
+            for result in results:
+                _write_chunk(target, result, files, errors)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                for result in boundedMap(executor, _validate_chunk,
+                                         chunks, 2 * workers):
+                    _write_chunk(target, result, files, errors)
+
+    return ImportResult(files, errors)
+
+
+def _read_records(
+    stream: TextIO,
+    format: str
+) -> Iterator[Tuple[int, Any]]:
+    """PRIVATE - numbered records of the input stream"""
+    if format == "csv":
+        for number, row in enumerate(csv.DictReader(stream), start=1):
+            # empty cells of non string fields are missing values
+            yield number, {
+                key: value for key, value in row.items()
+                if value != "" or (key in Requirement.__fields__ and
+                                   Requirement.__fields__[key].type_ is str)
+            }
+    else:
+        for number, line in enumerate(stream, start=1):
+            if line.strip():
+                yield number, line
+
+
+def _validate_chunk(
+    chunk: List[Tuple[int, Any]]
+) -> List[Tuple[int, Optional[str], str]]:
+    """PRIVATE - validate records and serialize them as YAML documents.
+    Returns (number, file name or None if invalid, document or error)"""
+    result = []
+    for number, record in chunk:
+        try:
+            if isinstance(record, str):
+                record = json.loads(record)
+            # the IDs are allocated by the database (see IdIndex)
+            record = {key: value for key, value in record.items()
+                      if key != "identifier"}
+            requirement = Requirement(**record)
+        except (ValidationError, ValueError, TypeError) as error:
+            result.append((number, None, str(error)))
+            continue
+        result.append((number,
+                       ReqFile.title_to_fileName(requirement.title),
+                       ReqFile.to_yaml(requirement)))
+    return result
+
+
+def _write_chunk(
+    target: Tuple[Path, str],
+    chunk: List[Tuple[int, Optional[str], str]],
+    files: List[Path],
+    errors: List[Tuple[int, str]],
+):
+    """PRIVATE - write the validated documents of a chunk in the target
+    (folder, layout), with one batch of events per chunk"""
+    extension = RequirementFileSettings.default_extension
+    with EVENTS.batch():
+        for number, name, document in chunk:
+            if name is None:
+                errors.append((number, document))
+                continue
+            for index in itertools.count(1):
+                file_name = (name if index == 1 else f"{name}_{index}") + \
+                    extension
+                path = layout_path(target[0], file_name, target[1])
+                path.parent.mkdir(parents=True, exist_ok=True)
+                try:
+                    # the hash of an empty content: never overwrite an
+                    # existing file
+                    ReqFile(path=path).write_document(
+                        document, expected_hash=_EMPTY_HASH)
+                except ConflictError:
+                    continue
+                files.append(path)
+                break
+
+
+def _check_format(format: str):
+    """PRIVATE - raise a ValueError if the format is not supported"""
+    if format not in InterchangeSettings.formats:
+        raise ValueError(
+            f"Format [{format}] is not in the permitted list " +
+            f"{InterchangeSettings.formats}"
+        )
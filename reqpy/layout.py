@@ -0,0 +1,196 @@
+""" Storage layout of the requirement files (flat or hash sharded)"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import hashlib
+from pathlib import Path
+from typing import Optional, Tuple
+import yaml
+from .__settings import FolderStructure, LayoutSettings
+
+__all__ = [
+    "shard_key",
+    "shard_folders",
+    "is_sharded_path",
+    "logical_folder",
+    "database_rootdir",
+    "layout_path",
+    "remove_empty_shards",
+    "read_layout",
+    "write_layout",
+]
+
+LAYOUTS = (LayoutSettings.flat, LayoutSettings.sharded)
+
+
+def shard_key(file_name: str) -> str:
+    """
+    Compute the stable key used to shard a requirement file.
+
+    Args:
+        file_name (str): file name or stem of the requirement file.
+
+    Returns:
+        str: hexadecimal digest derived from the file stem.
+    """
+    stem = Path(file_name).stem
+    return hashlib.sha1(stem.encode("utf-8")).hexdigest()
+
+
+def shard_folders(file_name: str) -> Tuple[str, ...]:
+    """
+    Get the prefix directories of a requirement file in the sharded layout.
+
+    Args:
+        file_name (str): file name or stem of the requirement file.
+
+    Returns:
+        Tuple[str, ...]: prefix directories, e.g. ("3f", "a2").
+    """
+    key = shard_key(file_name)
+    width = LayoutSettings.shard_width
+    return tuple(
+        key[level * width:(level + 1) * width]
+        for level in range(LayoutSettings.shard_levels)
+    )
+
+
+def is_sharded_path(path: Path) -> bool:
+    """
+    Check if a requirement file is stored in its shard directories.
+
+    Args:
+        path (Path): path of the requirement file.
+
+    Returns:
+        bool: True if the parent directories match the shard key of the file.
+    """
+    path = Path(path)
+    levels = LayoutSettings.shard_levels
+    parents = path.parent.parts[-levels:]
+    return len(parents) == levels and parents == shard_folders(path.name)
+
+
+def logical_folder(path: Path) -> Path:
+    """
+    Get the folder a requirement file belongs to, whatever the layout.
+
+    Args:
+        path (Path): path of the requirement file.
+
+    Returns:
+        Path: parent folder without the shard directories.
+    """
+    path = Path(path)
+    if is_sharded_path(path):
+        return path.parents[LayoutSettings.shard_levels]
+    return path.parent
+
+
+def database_rootdir(path: Path) -> Optional[Path]:
+    """
+    Get the root directory of the database of a requirement file.
+
+    Args:
+        path (Path): path of the requirement file (or folder).
+
+    Returns:
+        Path | None: the nearest parent holding the file (or folder) in its
+        main folder (see FolderStructure), None if the file is not in a
+        main folder.
+    """
+    path = Path(path).absolute()
+    for parent in path.parents:
+        if path.relative_to(parent).parts[0] == FolderStructure.main_folder:
+            return parent
+    return None
+
+
+def layout_path(folder: Path, file_name: str, layout: str) -> Path:
+    """
+    Get the path of a requirement file in a folder for a given layout.
+
+    Args:
+        folder (Path): logical folder of the requirement file.
+        file_name (str): name of the requirement file.
+        layout (str): layout of the database (see LayoutSettings).
+
+    Returns:
+        Path: path of the requirement file.
+
+    Raises:
+        ValueError: If the layout is unknown.
+    """
+    _check_layout(layout)
+    if layout == LayoutSettings.sharded:
+        return Path(folder).joinpath(*shard_folders(file_name), file_name)
+    return Path(folder) / file_name
+
+
+def remove_empty_shards(directory: Path, folder: Path):
+    """
+    Remove the empty shard directories of a moved or renamed file.
+
+    Args:
+        directory (Path): former parent directory of the file.
+        folder (Path): logical folder of the file (see logical_folder),
+        which is never removed.
+    """
+    directory, folder = Path(directory), Path(folder)
+    while (directory != folder and folder in directory.parents and
+           not any(directory.iterdir())):
+        directory.rmdir()
+        directory = directory.parent
+
+
+def read_layout(rootdir: Path) -> Tuple[str, bool]:
+    """
+    Read the layout marker of a database.
+
+    Args:
+        rootdir (Path): root directory of the database.
+
+    Returns:
+        Tuple[str, bool]: the layout and True if a migration toward this
+        layout is not completed. A database without marker is flat.
+    """
+    marker = _layout_file(rootdir)
+    if not marker.is_file():
+        return LayoutSettings.flat, False
+    with open(marker, "r") as file:
+        data = yaml.safe_load(file) or {}
+    layout = data.get("layout", LayoutSettings.flat)
+    _check_layout(layout)
+    return layout, bool(data.get("migrating", False))
+
+
+def write_layout(rootdir: Path, layout: str, migrating: bool = False):
+    """
+    Write the layout marker of a database.
+
+    Args:
+        rootdir (Path): root directory of the database.
+        layout (str): layout of the database (see LayoutSettings).
+        migrating (bool): True while files are moved toward the layout.
+    """
+    _check_layout(layout)
+    marker = _layout_file(rootdir)
+    marker.parent.mkdir(parents=True, exist_ok=True)
+    tmp_marker = marker.with_suffix(".tmp")
+    with open(tmp_marker, "w") as file:
+        yaml.safe_dump({"layout": layout, "migrating": migrating}, file)
+    tmp_marker.replace(marker)
+
+
+def _layout_file(rootdir: Path) -> Path:
+    """PRIVATE - path of the layout marker"""
+    return (Path(rootdir) / FolderStructure.metadata_folder /
+            LayoutSettings.layout_file)
+
+
+def _check_layout(layout: str):
+    """PRIVATE - raise a ValueError if the layout is unknown"""
+    if layout not in LAYOUTS:
+        raise ValueError(
+            f"Layout [{layout}] is not in the permitted list {LAYOUTS}"
+        )
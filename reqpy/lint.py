@@ -0,0 +1,283 @@
+""" Pluggable lint rules engine for the requirement quality"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import itertools
+import json
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import (Callable, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional, Tuple, Union)
+import yaml
+from pydantic import ValidationError
+from .__settings import FolderStructure, LintSettings
+from .database import ReqFolder
+from .locking import content_hash
+from .requirements import Requirement, ReqFile
+from .utils import boundedMap
+from .utils.fileIO import readMany
+
+__all__ = [
+    "LintRule",
+    "LintIssue",
+    "LintReport",
+    "RULES",
+    "register_rule",
+    "lint",
+]
+
+# result of a rule: None or empty if the requirement is correct, else the
+# message(s) describing the issue(s)
+RuleResult = Union[None, str, List[str]]
+
+
+class LintRule(NamedTuple):
+    name: str  # unique name of the rule
+    version: str  # to change when the rule is modified (invalidate cache)
+    function: Callable[[Requirement], RuleResult]  # module level function
+    description: str = ""
+
+
+class LintIssue(NamedTuple):
+    path: Path  # requirement file
+    rule: str  # name of the rule
+    message: str
+
+
+class LintReport(NamedTuple):
+    issues: List[LintIssue]  # issues of all the linted files
+    timings: Dict[str, float]  # execution time per rule (seconds)
+    files: int  # number of linted files
+    cached: int  # number of files with all the results in the cache
+
+
+# registered rules by name
+RULES: Dict[str, LintRule] = {}
+
+# name of the pseudo rule reporting the files which can not be read
+SCHEMA_RULE = "schema"
+
+
+def register_rule(
+    name: str,
+    version: str = "1",
+    description: str = ""
+) -> Callable:
+    """
+    Decorator registering a lint rule.
+
+    The decorated function shall be defined at module level (it is sent
+    to the worker processes) and return None if the requirement is
+    correct, else a message or a list of messages.
+
+    Args:
+        name (str): unique name of the rule.
+        version (str): version of the rule, to change when the rule is
+        modified so that the cached results are not used.
+        description (str): description of the rule.
+
+    Returns:
+        Callable: the decorator.
+    """
+    def decorator(function: Callable[[Requirement], RuleResult]):
+        RULES[name] = LintRule(name, version, function, description)
+        return function
+    return decorator
+
+
+# ########################################################################## #
+# ############################### BUILT-IN RULES ########################### #
+# ########################################################################## #
+
+
+@register_rule("shall", description="detail shall contain 'shall'")
+def detail_contains_shall(requirement: Requirement) -> RuleResult:
+    if not re.search(r"\bshall\b", requirement.detail, re.IGNORECASE):
+        return "The detail does not contain 'shall'"
+    return None
+
+
+@register_rule("no-tbd", description="no TBD in the title or detail")
+def no_tbd(requirement: Requirement) -> RuleResult:
+    messages = [
+        f"The {field} contains 'TBD'"
+        for field in ("title", "detail")
+        if re.search(r"\bTBD\b", getattr(requirement, field), re.IGNORECASE)
+    ]
+    return messages
+
+
+@register_rule("max-words",
+               description="detail below LintSettings.max_detail_words")
+def detail_max_words(requirement: Requirement) -> RuleResult:
+    number = len(requirement.detail.split())
+    if number > LintSettings.max_detail_words:
+        return (f"The detail has {number} words " +
+                f"(max: {LintSettings.max_detail_words})")
+    return None
+
+
+# ########################################################################## #
+# ################################# ENGINE ################################# #
+# ########################################################################## #
+
+
+def lint(
+    req_folder: ReqFolder,
+    rules: Optional[Iterable[str]] = None,
+    workers: Optional[int] = None,
+    use_cache: bool = True,
+) -> LintReport:
+    """
+    Lint the requirements of a database.
+
+    The results are cached per (rule, rule version, file content hash) in
+    the metadata folder, so that only the new and modified files, or the
+    modified rules, are executed; the cache keeps the results of the
+    linted files for the executed rules only. The files are linted by
+    chunks in a process pool. A rule raising an exception is reported as
+    an issue of the file (not cached), the other rules are executed.
+
+    Args:
+        req_folder (ReqFolder): the database.
+        rules (Iterable[str] | None): names of the executed rules.
+        Defaults to all the registered rules.
+        workers (int | None): number of processes. Defaults to the number
+        of CPUs; 0 or 1 lints in the current process.
+        use_cache (bool): If False, all the rules are executed. Defaults
+        to True.
+
+    Returns:
+        LintReport: the issues, sorted by file and rule, and the time spent
+        per rule.
+
+    Raises:
+        KeyError: If a rule is not registered.
+    """
+    selected = [RULES[name] for name in (RULES if rules is None else rules)]
+    cache_path = (req_folder.rootdir / FolderStructure.metadata_folder /
+                  LintSettings.cache_file)
+    cache = _read_cache(cache_path) if use_cache else {}
+    new_cache: Dict[str, Dict[str, List[str]]] = {
+        _cache_key(rule): {} for rule in selected}
+
+    issues: List[LintIssue] = []
+    timings = {rule.name: 0.0 for rule in selected}
+    files = req_folder.get_list_of_requirement_files()
+    cached = 0
+
+    def pending_tasks() -> Iterator[Tuple[Path, bytes, List[LintRule]]]:
+        """the files with rules without cached results, read lazily on a
+        thread pool"""
+        nonlocal cached
+        for file, data in readMany(files, LintSettings.read_workers):
+            digest = content_hash(data)
+            missing_rules = []
+            for rule in selected:
+                messages = cache.get(_cache_key(rule), {}).get(digest)
+                if messages is None:
+                    missing_rules.append(rule)
+                else:
+                    new_cache[_cache_key(rule)][digest] = messages
+                    issues.extend(LintIssue(file, rule.name, message)
+                                  for message in messages)
+            if missing_rules:
+                yield file, data, missing_rules
+            else:
+                cached += 1
+
+    tasks = pending_tasks()
+    chunks = iter(lambda: list(itertools.islice(
+        tasks, LintSettings.chunk_size)), [])
+    if workers is None:
+        workers = os.cpu_count() or 1
+    rules_by_name = {rule.name: rule for rule in selected}
+    if workers <= 1:
+        results = map(_lint_chunk, chunks)
+        _collect(results, rules_by_name, new_cache, issues, timings)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = boundedMap(executor, _lint_chunk, chunks, 2 * workers)
+            _collect(results, rules_by_name, new_cache, issues, timings)
+
+    _write_cache(cache_path, new_cache)
+    # stable sort: the messages of a rule keep their order
+    issues.sort(key=lambda issue: (issue.path, issue.rule))
+    return LintReport(issues, timings, len(files), cached)
+
+
+def _lint_chunk(
+    chunk: List[Tuple[Path, bytes, List[LintRule]]]
+) -> List[Tuple[Path, str, Optional[str], List[str], float, bool]]:
+    """PRIVATE - execute the rules on the files of a chunk. Returns
+    (path, content hash, rule name or None, messages, duration, True if
+    the rule failed)"""
+    results = []
+    for path, data, rules in chunk:
+        digest = content_hash(data)
+        try:
+            requirement = ReqFile.from_yaml(data)
+        except (ValidationError, yaml.YAMLError, TypeError) as error:
+            results.append((path, digest, None, [str(error)], 0.0, False))
+            continue
+        for rule in rules:
+            start = time.perf_counter()
+            try:
+                messages = rule.function(requirement) or []
+                failed = False
+            except Exception as error:
+                messages = [f"The rule failed: {type(error).__name__}: " +
+                            f"{error}"]
+                failed = True
+            duration = time.perf_counter() - start
+            if isinstance(messages, str):
+                messages = [messages]
+            results.append((path, digest, rule.name, list(messages),
+                            duration, failed))
+    return results
+
+
+def _collect(
+    results: Iterable[list],
+    rules: Dict[str, LintRule],
+    new_cache: Dict[str, Dict[str, List[str]]],
+    issues: List[LintIssue],
+    timings: Dict[str, float],
+):
+    """PRIVATE - merge the results of the chunks"""
+    for path, digest, name, messages, duration, failed in \
+            itertools.chain.from_iterable(results):
+        if name is None:  # the file can not be read
+            issues.extend(LintIssue(path, SCHEMA_RULE, message)
+                          for message in messages)
+            continue
+        if not failed:
+            new_cache[_cache_key(rules[name])][digest] = messages
+        timings[name] += duration
+        issues.extend(LintIssue(path, name, message) for message in messages)
+
+
+def _cache_key(rule: LintRule) -> str:
+    """PRIVATE - key of the rule results in the cache"""
+    return f"{rule.name}@{rule.version}"
+
+
+def _read_cache(path: Path) -> Dict[str, Dict[str, List[str]]]:
+    """PRIVATE - read the cache (empty if missing or corrupted)"""
+    try:
+        with open(path, "r") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_cache(path: Path, cache: Dict[str, Dict[str, List[str]]]):
+    """PRIVATE - write the cache"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as file:
+        json.dump(cache, file)
+    tmp_path.replace(path)
@@ -0,0 +1,272 @@
+""" Advisory file locks and content hashes for concurrent writers"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import hashlib
+import os
+import secrets
+import stat
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Iterator, Optional
+from .__settings import FolderStructure, LockSettings
+
+try:
+    import fcntl
+except ImportError:  # not available on Windows: locks are disabled
+    fcntl = None  # type: ignore
+
+__all__ = [
+    "ConflictError",
+    "LockTimeout",
+    "LockUpgradeError",
+    "content_hash",
+    "lock_file",
+    "open_locked",
+    "lock_database",
+    "replace_file",
+    "create_file",
+]
+
+_POLLING_PERIOD = 0.01  # seconds between two attempts with a timeout
+
+# database locks held by the current thread: lock file -> shared mode
+_HELD = threading.local()
+
+
+class ConflictError(Exception):
+    # raised when a file was modified since it was read
+    pass
+
+
+class LockTimeout(Exception):
+    # raised when a lock is not acquired before the timeout
+    pass
+
+
+class LockUpgradeError(Exception):
+    # raised when an exclusive lock is requested under a shared lock
+    pass
+
+
+def content_hash(data: bytes) -> str:
+    """
+    Compute the hash of a file content (optimistic concurrency token).
+
+    Args:
+        data (bytes): the content of the file (empty for a missing file).
+
+    Returns:
+        str: the SHA-256 hexadecimal digest.
+    """
+    return hashlib.sha256(data).hexdigest()
+
+
+@contextmanager
+def lock_file(
+    file: IO,
+    shared: bool = False,
+    timeout: Optional[float] = None
+) -> Iterator[IO]:
+    """
+    Hold an advisory lock (fcntl.flock) on an opened file.
+
+    Args:
+        file (IO): the opened file.
+        shared (bool): If True, shared (read) lock, else exclusive (write)
+        lock. Defaults to False.
+        timeout (float | None): seconds before giving up, None to wait
+        forever.
+
+    Yields:
+        IO: the locked file.
+
+    Raises:
+        LockTimeout: If the lock is not acquired before the timeout.
+    """
+    if fcntl is None:
+        yield file
+        return
+
+    operation = fcntl.LOCK_SH if shared else fcntl.LOCK_EX
+    if timeout is None:
+        fcntl.flock(file.fileno(), operation)
+    else:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                fcntl.flock(file.fileno(), operation | fcntl.LOCK_NB)
+                break
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise LockTimeout(
+                        f"Impossible to lock {file.name} in {timeout} s"
+                    ) from None
+                time.sleep(_POLLING_PERIOD)
+    try:
+        yield file
+    finally:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+@contextmanager
+def open_locked(
+    path: Path,
+    shared: bool = False,
+    timeout: Optional[float] = None,
+    create: bool = True,
+) -> Iterator[IO[bytes]]:
+    """
+    Open a file in binary mode and lock it.
+
+    A shared lock opens an existing file for reading. An exclusive lock
+    opens the file for reading and writing without truncating it, and
+    creates it if needed. If the file was replaced (see replace_file)
+    while waiting for the lock, the new file is opened and locked.
+
+    Args:
+        path (Path): path of the file.
+        shared (bool): If True, shared (read) lock, else exclusive (write)
+        lock. Defaults to False.
+        timeout (float | None): seconds before giving up, None to wait
+        forever.
+        create (bool): If False, an exclusive lock opens an existing file
+        only. Defaults to True.
+
+    Yields:
+        IO[bytes]: the locked file.
+
+    Raises:
+        FileNotFoundError: If the file does not exist and is not created.
+    """
+    flags = os.O_RDWR | (os.O_CREAT if create else 0)
+    while True:
+        if shared:
+            file = open(path, "rb")
+        else:
+            file = os.fdopen(os.open(path, flags, 0o666), "r+b")
+        with file, lock_file(file, shared, timeout):
+            if _is_current(file, path):
+                yield file
+                return
+
+
+@contextmanager
+def lock_database(
+    rootdir: Path,
+    shared: bool = False,
+    timeout: Optional[float] = None
+) -> Iterator[None]:
+    """
+    Hold the advisory lock of a whole database (see ReqFolder.lock).
+
+    The lock is reentrant in a thread: a nested lock of the same database
+    is held by the outer one, if the outer lock is exclusive or both are
+    shared. A shared lock is never upgraded (two upgrading holders would
+    wait for each other).
+
+    Args:
+        rootdir (Path): root directory of the database.
+        shared (bool): If True, shared lock, else exclusive lock.
+        Defaults to False.
+        timeout (float | None): seconds to wait for the lock, None to
+        wait forever.
+
+    Raises:
+        LockTimeout: If the lock is not acquired before the timeout.
+        LockUpgradeError: If an exclusive lock is requested while the
+        thread holds the shared lock.
+    """
+    lock_path = (Path(rootdir) / FolderStructure.metadata_folder /
+                 LockSettings.folder_lock_file).resolve()
+    held = _HELD.__dict__.setdefault("locks", {})
+    if lock_path in held:
+        if held[lock_path] and not shared:
+            raise LockUpgradeError(
+                f"The exclusive lock of the database {rootdir} is " +
+                "requested while its shared lock is held"
+            )
+        yield
+        return
+
+    lock_path.parent.mkdir(parents=True, exist_ok=True)
+    lock_path.touch(exist_ok=True)
+    with open_locked(lock_path, shared=shared, timeout=timeout):
+        held[lock_path] = shared
+        try:
+            yield
+        finally:
+            del held[lock_path]
+
+
+def replace_file(path: Path, data: bytes):
+    """
+    Replace the content of a file atomically: the data are written to a
+    temporary file of the same folder, renamed over the file. The readers
+    see the old or the new content, never a partial one.
+
+    The caller shall hold the exclusive lock of the file (see open_locked).
+
+    Args:
+        path (Path): path of the file.
+        data (bytes): the new content.
+    """
+    tmp_path = _write_temp(Path(path), data)
+    try:
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def create_file(path: Path, data: bytes) -> bool:
+    """
+    Create a file with its content atomically, if it does not exist (the
+    readers never see an empty file).
+
+    Args:
+        path (Path): path of the file.
+        data (bytes): the content.
+
+    Returns:
+        bool: True if the file was created, False if it exists (or if the
+        file system has no hard link).
+    """
+    tmp_path = _write_temp(Path(path), data)
+    try:
+        os.link(tmp_path, path)
+    except OSError:  # FileExistsError or no hard link
+        return False
+    finally:
+        tmp_path.unlink()
+    return True
+
+
+def _is_current(file: IO, path: Path) -> bool:
+    """PRIVATE - True if the opened file is still the file of the path"""
+    try:
+        current = os.stat(path)
+    except FileNotFoundError:
+        return False
+    opened = os.fstat(file.fileno())
+    return (current.st_ino, current.st_dev) == (opened.st_ino, opened.st_dev)
+
+
+def _write_temp(path: Path, data: bytes) -> Path:
+    """PRIVATE - write the data to a temporary file next to the path, with
+    the permissions of the file if it exists"""
+    tmp_path = path.with_name(f".{path.name}.{secrets.token_hex(4)}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(data)
+        try:
+            os.chmod(tmp_path, stat.S_IMODE(os.stat(path).st_mode))
+        except FileNotFoundError:
+            pass
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return tmp_path
@@ -0,0 +1,414 @@
+""" Versioned schema migrations of the requirement files"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import importlib
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import (Any, Callable, Dict, Iterator, List, NamedTuple,
+                    Optional, Tuple)
+import yaml
+from pydantic import ValidationError
+from .__settings import FolderStructure, MigrationSettings
+from .database import ReqFolder
+from .events import EVENTS, FileWritten
+from .locking import (ConflictError, LockTimeout, content_hash, open_locked,
+                      replace_file)
+from .requirements import Requirement, ReqFile
+from .utils import boundedMap, invalidateStat
+
+__all__ = [
+    "Migration",
+    "MigrationError",
+    "MigrationReport",
+    "MIGRATIONS",
+    "register_migration",
+    "import_migrations",
+    "get_schema_version",
+    "migrate",
+]
+
+# a migration transforms the raw YAML data of a requirement file
+MigrationFunction = Callable[[Dict[str, Any]], Dict[str, Any]]
+
+
+class MigrationError(Exception):
+    # raised when a migration can not be started or resumed
+    pass
+
+
+class Migration(NamedTuple):
+    version: int  # schema version reached after the migration
+    function: MigrationFunction  # module level function
+    description: str = ""
+
+
+class MigrationReport(NamedTuple):
+    from_version: int  # schema version before the migration
+    to_version: int  # schema version after the migration
+    files: int  # number of processed files (in this run)
+    changed: List[Tuple[Path, List[str]]]  # modified files and fields
+    errors: List[Tuple[Path, str]]  # files which can not be migrated
+    resumed: bool  # True if an interrupted migration was resumed
+    dry_run: bool  # True if no file was written
+
+
+# registered migrations by version
+MIGRATIONS: Dict[int, Migration] = {}
+
+
+def register_migration(version: int, description: str = "") -> Callable:
+    """
+    Decorator registering a migration of the requirement files.
+
+    The decorated function shall be defined at module level (it is sent
+    to the worker processes), take the raw data of a requirement file and
+    return the migrated data. It shall be idempotent: an interrupted
+    migration is resumed from its last checkpoint, so a file may be
+    migrated twice.
+
+    Args:
+        version (int): schema version reached after the migration (1 for
+        the first migration).
+        description (str): description of the migration.
+
+    Returns:
+        Callable: the decorator.
+
+    Raises:
+        ValueError: If a migration is already registered for the version.
+    """
+    def decorator(function: MigrationFunction):
+        if version in MIGRATIONS:
+            raise ValueError(
+                f"A migration is already registered for the version {version}"
+            )
+        MIGRATIONS[version] = Migration(version, function, description)
+        return function
+    return decorator
+
+
+def import_migrations(module: str):
+    """
+    Import a module registering migrations (see register_migration).
+
+    Args:
+        module (str): name of an importable module, or path of a Python
+        file (its folder is added to sys.path, so that the worker processes
+        import it too).
+
+    Raises:
+        MigrationError: If the module can not be imported.
+    """
+    path = Path(module)
+    if path.suffix == ".py":
+        if not path.is_file():
+            raise MigrationError(f"The migration file {path} does not exist")
+        folder = str(path.parent.absolute())
+        if folder not in sys.path:
+            sys.path.insert(0, folder)
+        module = path.stem
+    try:
+        importlib.import_module(module)
+    except ImportError as error:
+        raise MigrationError(
+            f"Impossible to import the migrations of [{module}]: {error}"
+        ) from error
+
+
+def get_schema_version(rootdir: Path) -> int:
+    """
+    Get the schema version of the requirement files of a database.
+
+    Args:
+        rootdir (Path): root directory of the database.
+
+    Returns:
+        int: the schema version (0 if never migrated).
+    """
+    try:
+        with open(_metadata_file(rootdir, MigrationSettings.schema_file),
+                  "r") as file:
+            return int((yaml.safe_load(file) or {}).get("version", 0))
+    except FileNotFoundError:
+        return 0
+
+
+def migrate(
+    req_folder: ReqFolder,
+    target: Optional[int] = None,
+    workers: Optional[int] = None,
+    dry_run: bool = False,
+    chunk_size: int = MigrationSettings.chunk_size,
+) -> MigrationReport:
+    """
+    Migrate the requirement files to a schema version.
+
+    The files are processed in path order, by chunks in a process pool.
+    After each chunk, the last processed file and the files which failed
+    so far are saved in a checkpoint of the metadata folder, so that an
+    interrupted migration is resumed from there by calling again this
+    function (the failures of the interrupted run are reported again). The
+    schema version is updated once all the files are migrated without
+    error; otherwise the checkpoint is removed and the next call migrates
+    again all the files (the migrations are idempotent).
+
+    The migrated files are validated with the Requirement class when the
+    target is the latest version, else they are written as migrated. The
+    fields unknown to the Requirement class (e.g. added by a migration) are
+    not validated and written after the validated ones. A checkpoint which
+    can not be read (e.g. truncated) is ignored.
+
+    Args:
+        req_folder (ReqFolder): the database.
+        target (int | None): target schema version. Defaults to the latest
+        registered migration.
+        workers (int | None): number of processes. Defaults to the number
+        of CPUs; 0 or 1 migrates in the current process.
+        dry_run (bool): If True, report the changes without writing any
+        file (nor checkpoint). Defaults to False.
+        chunk_size (int): number of files per chunk.
+
+    Returns:
+        MigrationReport: the modified files and the errors.
+
+    Raises:
+        MigrationError: If the target is lower than the current version, a
+        migration is missing, or an interrupted migration has another
+        target.
+    """
+    rootdir = req_folder.rootdir
+    current = get_schema_version(rootdir)
+    if target is None:
+        target = max(MIGRATIONS, default=current)
+    if target < current:
+        raise MigrationError(
+            f"The schema version {current} is newer than the target " +
+            f"{target} (no downgrade)"
+        )
+    missing = [version for version in range(current + 1, target + 1)
+               if version not in MIGRATIONS]
+    if missing:
+        raise MigrationError(f"No migration registered for {missing}")
+
+    checkpoint_file = _metadata_file(rootdir,
+                                     MigrationSettings.checkpoint_file)
+    checkpoint = _read_checkpoint(checkpoint_file)
+    resumed = checkpoint is not None and not dry_run
+    if resumed and (checkpoint["from"], checkpoint["to"]) != (current,
+                                                             target):
+        raise MigrationError(
+            "An interrupted migration from " +
+            f"{checkpoint['from']} to {checkpoint['to']} shall be " +
+            f"resumed first (checkpoint {checkpoint_file})"
+        )
+    last_key = checkpoint["last"] if resumed else None
+
+    functions = [MIGRATIONS[version].function
+                 for version in range(current + 1, target + 1)]
+    validate = target == max(MIGRATIONS, default=target)
+    changed: List[Tuple[Path, List[str]]] = []
+    errors: List[Tuple[Path, str]] = [
+        (rootdir / key, error)
+        for key, error in (checkpoint.get("failed", {}) if resumed
+                           else {}).items()]
+    processed = 0
+    if not functions:
+        return MigrationReport(current, target, 0, changed, errors,
+                               resumed, dry_run)
+
+    with req_folder.lock(shared=True):
+        keys = sorted(
+            file.relative_to(rootdir).as_posix()
+            for file in req_folder.get_list_of_requirement_files())
+        if last_key is not None:
+            keys = [key for key in keys if key > last_key]
+        pending = iter(keys)
+        chunks: Iterator[tuple] = iter(lambda: (
+            str(rootdir), functions, validate, dry_run,
+            list(itertools.islice(pending, chunk_size))), None)
+        chunks = itertools.takewhile(lambda chunk: chunk[4], chunks)
+
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers <= 1:
+            results: Iterator[tuple] = map(_migrate_chunk, chunks)
+            processed = _collect(results, rootdir, changed, errors,
+                                 checkpoint_file, (current, target), dry_run)
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                processed = _collect(
+                    boundedMap(executor, _migrate_chunk, chunks,
+                               2 * workers),
+                    rootdir, changed, errors, checkpoint_file,
+                    (current, target), dry_run)
+
+        if not dry_run:
+            if not errors:
+                _write_schema_version(rootdir, target)
+            checkpoint_file.unlink(missing_ok=True)
+
+    return MigrationReport(current, target, processed, changed, errors,
+                           resumed, dry_run)
+
+
+def _migrate_chunk(
+    chunk: Tuple[str, List[MigrationFunction], bool, bool, List[str]]
+) -> Tuple[List[str], List[Tuple[str, Optional[List[str]], str]]]:
+    """PRIVATE - migrate the files of a chunk. Returns the keys and, per
+    modified or failed file, (key, changed fields or None, error)"""
+    rootdir, functions, validate, dry_run, keys = chunk
+    # the events are emitted by the parent process (see _collect)
+    with EVENTS.muted():
+        results = _migrate_files(Path(rootdir), functions, validate,
+                                 dry_run, keys)
+    return keys, results
+
+
+def _migrate_files(
+    rootdir: Path,
+    functions: List[MigrationFunction],
+    validate: bool,
+    dry_run: bool,
+    keys: List[str],
+) -> List[Tuple[str, Optional[List[str]], str]]:
+    """PRIVATE - migrate files (see _migrate_chunk)"""
+    results = []
+    for key in keys:
+        path = rootdir / key
+        try:
+            with open_locked(path, shared=True) as file:
+                data = file.read()
+            original = yaml.safe_load(data) or {}
+            migrated = dict(original)
+            for function in functions:
+                migrated = function(dict(migrated))
+            fields = sorted(
+                name for name in set(original) | set(migrated)
+                if original.get(name, _MISSING) !=
+                migrated.get(name, _MISSING))
+            if not fields:
+                continue
+            if validate:
+                document = _validate(migrated)
+                if not dry_run:
+                    ReqFile(path=path).write_document(
+                        document, expected_hash=content_hash(data))
+            elif not dry_run:
+                _write_raw(path, migrated, content_hash(data))
+            results.append((key, fields, ""))
+        except (ValidationError, yaml.YAMLError, OSError, TypeError,
+                ValueError, ConflictError, LockTimeout) as error:
+            results.append((key, None, str(error)))
+    return results
+
+
+_MISSING = object()
+
+
+def _validate(data: Dict[str, Any]) -> str:
+    """PRIVATE - validate the fields of the Requirement class and serialize
+    them, followed by the other fields (not validated)"""
+    known = {name: value for name, value in data.items()
+             if name in Requirement.__fields__}
+    extra = {name: value for name, value in data.items()
+             if name not in known}
+    document = ReqFile.to_yaml(Requirement(**known))
+    if extra:
+        document += yaml.safe_dump(extra, sort_keys=False,
+                                   allow_unicode=True)
+    return document
+
+
+def _write_raw(path: Path, data: Dict[str, Any], expected_hash: str):
+    """PRIVATE - write migrated data not validated (intermediate version)
+    if the file was not modified since it was read"""
+    content = yaml.safe_dump(data, sort_keys=False,
+                             allow_unicode=True).encode("utf-8")
+    with open_locked(path, create=False) as file:
+        if content_hash(file.read()) != expected_hash:
+            raise ConflictError(
+                f"The file {path} was modified by another writer " +
+                "(content hash mismatch)"
+            )
+        replace_file(path, content)
+    invalidateStat(path)
+
+
+def _collect(
+    results: Iterator[tuple],
+    rootdir: Path,
+    changed: List[Tuple[Path, List[str]]],
+    errors: List[Tuple[Path, str]],
+    checkpoint_file: Path,
+    versions: Tuple[int, int],
+    dry_run: bool,
+) -> int:
+    """PRIVATE - merge the results of the chunks (in order), emit the
+    events of the written files (one batch per chunk) and save the
+    checkpoint after each chunk. Returns the number of processed files"""
+    processed = 0
+    for keys, chunk_results in results:
+        with EVENTS.batch():
+            for key, fields, error in chunk_results:
+                if fields is None:
+                    errors.append((rootdir / key, error))
+                    continue
+                changed.append((rootdir / key, fields))
+                if not dry_run:
+                    EVENTS.emit(FileWritten(rootdir / key, False))
+        processed += len(keys)
+        if not dry_run:
+            _write_checkpoint(checkpoint_file, {
+                "from": versions[0], "to": versions[1], "last": keys[-1],
+                "failed": {path.relative_to(rootdir).as_posix(): error
+                           for path, error in errors}})
+    return processed
+
+
+def _metadata_file(rootdir: Path, name: str) -> Path:
+    """PRIVATE - path of a file of the metadata folder"""
+    return Path(rootdir) / FolderStructure.metadata_folder / name
+
+
+def _read_checkpoint(path: Path) -> Optional[Dict[str, Any]]:
+    """PRIVATE - checkpoint of an interrupted migration (None if none or
+    corrupted: the migration restarts from the first file)"""
+    try:
+        with open(path, "r") as file:
+            checkpoint = json.load(file)
+    except (OSError, ValueError):
+        return None
+    if not (isinstance(checkpoint, dict) and
+            {"from", "to", "last"} <= set(checkpoint) and
+            isinstance(checkpoint.get("failed", {}), dict)):
+        return None
+    return checkpoint
+
+
+def _write_checkpoint(path: Path, checkpoint: Dict[str, Any]):
+    """PRIVATE - write the checkpoint (atomic replacement)"""
+    _write_metadata(path, json.dumps(checkpoint))
+
+
+def _write_schema_version(rootdir: Path, version: int):
+    """PRIVATE - write the schema version of the database (atomic
+    replacement)"""
+    _write_metadata(_metadata_file(rootdir, MigrationSettings.schema_file),
+                    yaml.safe_dump({"version": version}))
+
+
+def _write_metadata(path: Path, content: str):
+    """PRIVATE - write a metadata file: synced temporary file renamed over
+    the file"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as file:
+        file.write(content)
+        file.flush()
+        os.fsync(file.fileno())
+    os.replace(tmp_path, path)
@@ -0,0 +1,142 @@
+""" Projection tools to read some fields of a requirement file"""
+
+# IMPORT SECTION
+from __future__ import annotations
+from pathlib import Path
+from typing import Any, Dict, Iterable
+import yaml
+
+__all__ = [
+    "read_fields",
+]
+
+# use the libyaml parser if available
+Loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def read_fields(path: Path, fields: Iterable[str]) -> Dict[str, Any]:
+    """
+    Read some top-level keys of a YAML file without loading the whole file.
+
+    The YAML event stream is scanned and the scan is stopped as soon as
+    all the requested keys are found. The values of the other keys are
+    skipped without being constructed. The aliases of the anchors of the
+    read values are resolved; the files whose requested values use the
+    anchors of skipped values, or with a top-level merge key, are fully
+    loaded.
+
+    Args:
+        path (Path): path of the YAML file.
+        fields (Iterable[str]): top-level keys to read.
+
+    Returns:
+        Dict[str, Any]: the found keys and their values.
+    """
+    fields = list(fields)
+    expected = set(fields)
+    result: Dict[str, Any] = {}
+    anchors: Dict[str, yaml.Node] = {}
+
+    with open(path, "r") as file:
+        loader = Loader(file)
+        try:
+            # stream, document and mapping start
+            for event_type in (yaml.StreamStartEvent,
+                               yaml.DocumentStartEvent):
+                if not loader.check_event(event_type):
+                    return result
+                loader.get_event()
+            if not loader.check_event(yaml.MappingStartEvent):
+                return result
+            loader.get_event()
+
+            while expected and not loader.check_event(yaml.MappingEndEvent):
+                key = loader.get_event()
+                if isinstance(key, yaml.ScalarEvent) and key.value == "<<":
+                    raise _FullLoad
+                if (isinstance(key, yaml.ScalarEvent) and
+                   key.value in expected):
+                    expected.discard(key.value)
+                    node = _compose(loader, loader.get_event(), anchors)
+                    result[key.value] = loader.construct_object(
+                        node, deep=True)
+                else:
+                    _skip(loader, loader.get_event())
+        except _FullLoad:
+            return _read_fields_fully(path, fields)
+        finally:
+            loader.dispose()
+    return result
+
+
+class _FullLoad(Exception):
+    """PRIVATE - raised when the projection needs the whole file"""
+    pass
+
+
+def _read_fields_fully(path: Path, fields: Iterable[str]) -> Dict[str, Any]:
+    """PRIVATE - read_fields by loading the whole file"""
+    with open(path, "r") as file:
+        data = yaml.load(file, Loader=Loader)
+    if not isinstance(data, dict):
+        return {}
+    return {field: data[field] for field in fields if field in data}
+
+
+def _compose(loader: Any, event: yaml.Event,
+             anchors: Dict[str, yaml.Node]) -> yaml.Node:
+    """PRIVATE - build the YAML node starting with the event (anchors: the
+    nodes of the anchors read so far)"""
+    if isinstance(event, yaml.AliasEvent):
+        if event.anchor not in anchors:  # anchor of a skipped value
+            raise _FullLoad
+        return anchors[event.anchor]
+
+    if isinstance(event, yaml.ScalarEvent):
+        tag = event.tag
+        if tag is None or tag == "!":
+            tag = loader.resolve(yaml.ScalarNode, event.value,
+                                 event.implicit)
+        node = yaml.ScalarNode(tag, event.value, style=event.style)
+
+    elif isinstance(event, yaml.SequenceStartEvent):
+        tag = event.tag or loader.resolve(yaml.SequenceNode, None, True)
+        node = yaml.SequenceNode(tag, [])
+        if event.anchor is not None:  # may be used by its own items
+            anchors[event.anchor] = node
+        while not loader.check_event(yaml.SequenceEndEvent):
+            node.value.append(_compose(loader, loader.get_event(), anchors))
+        loader.get_event()
+
+    elif isinstance(event, yaml.MappingStartEvent):
+        tag = event.tag or loader.resolve(yaml.MappingNode, None, True)
+        node = yaml.MappingNode(tag, [])
+        if event.anchor is not None:
+            anchors[event.anchor] = node
+        while not loader.check_event(yaml.MappingEndEvent):
+            key = _compose(loader, loader.get_event(), anchors)
+            node.value.append(
+                (key, _compose(loader, loader.get_event(), anchors)))
+        loader.get_event()
+
+    else:
+        raise yaml.YAMLError(f"Unsupported YAML event {event}")
+
+    if event.anchor is not None:
+        anchors[event.anchor] = node
+    return node
+
+
+def _skip(loader: Any, event: yaml.Event):
+    """PRIVATE - consume the events of a value without building it"""
+    depth = 0
+    while True:
+        if isinstance(event, (yaml.SequenceStartEvent,
+                              yaml.MappingStartEvent)):
+            depth += 1
+        elif isinstance(event, (yaml.SequenceEndEvent,
+                                yaml.MappingEndEvent)):
+            depth -= 1
+        if depth == 0:
+            return
+        event = loader.get_event()
@@ -0,0 +1,618 @@
+""" Query language on the requirements of a database"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import base64
+import bisect
+import json
+import re
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from typing import (Any, Callable, Dict, FrozenSet, Iterator, List,
+                    NamedTuple, Optional, Tuple, Union)
+import yaml
+from pydantic import ValidationError
+from .__settings import QuerySettings, RequirementSettings
+from .database import ReqFolder
+from .indexes import to_microseconds
+from .locking import content_hash
+from .requirements import Requirement, ReqFile
+
+__all__ = [
+    "QueryError",
+    "Term",
+    "And",
+    "Or",
+    "Not",
+    "QueryPlan",
+    "QueryPage",
+    "Query",
+    "parse_query",
+    "plan_query",
+]
+
+# query field -> (Requirement attribute, permitted operators)
+FIELDS = {
+    "status": ("validation_status", (":", "=", "!=")),
+    "created": ("creation_date", (":", "=", "!=", "<", "<=", ">", ">=")),
+    "title": ("title", (":", "=", "!=", "~")),
+    "detail": ("detail", (":", "=", "!=", "~")),
+    "id": ("identifier", (":", "=", "!=", "<", "<=", ">", ">=")),
+}
+
+KEYWORDS = ("and", "or", "not")
+
+_TOKEN = re.compile(
+    r'\s*(?:(?P<string>"(?:[^"\\]|\\.)*")'
+    r'|(?P<op><=|>=|!=|[:=<>~()])'
+    r'|(?P<word>[^\s:=<>~()!"]+))'
+)
+
+
+class QueryError(Exception):
+    # raised when a query is not valid
+    pass
+
+
+# ########################################################################## #
+# ################################## AST ################################### #
+# ########################################################################## #
+
+
+class Term(NamedTuple):
+    field: str  # query field (see FIELDS)
+    op: str  # ":" and "=" are equal, "~" contains (case insensitive)
+    value: Any  # str, int or (start, end) creation dates (UTC, naive)
+
+
+class And(NamedTuple):
+    operands: Tuple[Node, ...]
+
+
+class Or(NamedTuple):
+    operands: Tuple[Node, ...]
+
+
+class Not(NamedTuple):
+    operand: Node
+
+
+Node = Union[Term, And, Or, Not]
+
+
+# ########################################################################## #
+# ################################# PARSER ################################# #
+# ########################################################################## #
+
+
+def parse_query(text: str) -> Node:
+    """
+    Parse a query into its syntax tree.
+
+    A query combines terms "field op value" with and, or, not and
+    parentheses (not > and > or), e.g.:
+
+        status:UNVALID and created>=2026-01-01 and title~"brake"
+
+    The fields are status, created, title, detail and id (see FIELDS). The
+    operators are ":" or "=" (equal, case insensitive for the texts), "!=",
+    "<", "<=", ">", ">=" (created and id) and "~" (the text contains the
+    value, case insensitive). The values with spaces or ":" (e.g. a time)
+    are double quoted. A date without time is the whole day (UTC).
+
+    Args:
+        text (str): the query.
+
+    Returns:
+        Node: the syntax tree.
+
+    Raises:
+        QueryError: If the query is not valid.
+    """
+    parser = _Parser(text)
+    node = parser.parse_or()
+    if parser.token is not None:
+        parser.fail(f"Unexpected [{parser.token[1]}]")
+    return node
+
+
+class _Parser():
+    """PRIVATE - recursive descent parser of the queries"""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.tokens = _tokenize(text)
+        self.position = 0
+
+    @property
+    def token(self) -> Optional[Tuple[str, str, int]]:
+        if self.position < len(self.tokens):
+            return self.tokens[self.position]
+        return None
+
+    def fail(self, message: str):
+        column = len(self.text) if self.token is None else self.token[2]
+        raise QueryError(
+            f"{message} at position {column} of the query [{self.text}]")
+
+    def next(self) -> Tuple[str, str, int]:
+        token = self.token
+        if token is None:
+            self.fail("Unexpected end")
+        self.position += 1
+        return token
+
+    def keyword(self, word: str) -> bool:
+        token = self.token
+        if (token is not None and token[0] == "word" and
+                token[1].lower() == word):
+            self.position += 1
+            return True
+        return False
+
+    def parse_or(self) -> Node:
+        operands = [self.parse_and()]
+        while self.keyword("or"):
+            operands.append(self.parse_and())
+        return operands[0] if len(operands) == 1 else Or(tuple(operands))
+
+    def parse_and(self) -> Node:
+        operands = [self.parse_not()]
+        while self.keyword("and"):
+            operands.append(self.parse_not())
+        return operands[0] if len(operands) == 1 else And(tuple(operands))
+
+    def parse_not(self) -> Node:
+        if self.keyword("not"):
+            return Not(self.parse_not())
+        if self.token is not None and self.token[1] == "(" and \
+                self.token[0] == "op":
+            self.next()
+            node = self.parse_or()
+            if self.token is None or self.token[1] != ")":
+                self.fail("Missing [)]")
+            self.next()
+            return node
+        return self.parse_term()
+
+    def parse_term(self) -> Term:
+        kind, field, _ = self.next()
+        field = field.lower()
+        if kind != "word" or field not in FIELDS:
+            self.position -= 1
+            self.fail(f"Unknown field [{field}] (fields: {tuple(FIELDS)})")
+        kind, op, _ = self.next()
+        if kind != "op" or op not in FIELDS[field][1]:
+            self.position -= 1
+            self.fail(
+                f"Operator [{op}] not permitted for the field [{field}] " +
+                f"(operators: {FIELDS[field][1]})")
+        kind, value, _ = self.next()
+        if kind == "op":
+            self.position -= 1
+            self.fail("Missing value")
+        if kind == "string":
+            value = re.sub(r"\\(.)", r"\1", value[1:-1])
+        try:
+            value = _convert(field, value)
+        except ValueError as error:
+            self.position -= 1
+            self.fail(str(error))
+        return Term(field, "=" if op == ":" else op, value)
+
+
+def _tokenize(text: str) -> List[Tuple[str, str, int]]:
+    """PRIVATE - (kind, text, position) of the tokens of a query"""
+    tokens = []
+    position = 0
+    while True:
+        match = _TOKEN.match(text, position)
+        if match is None or match.end() == position:
+            break
+        position = match.end()
+        kind = match.lastgroup
+        tokens.append((kind, match.group(kind), match.start(kind)))
+    if text[position:].strip():
+        column = len(text) - len(text[position:].lstrip())
+        raise QueryError(
+            f"Invalid character at position {column} of the query [{text}]")
+    return tokens
+
+
+def _convert(field: str, value: str) -> Any:
+    """PRIVATE - value of a term from its text"""
+    if field == "status":
+        if value.upper() not in RequirementSettings.validation_status:
+            raise ValueError(
+                f"Validation status [{value}] is not in the permitted " +
+                f"list {RequirementSettings.validation_status}")
+        return value.upper()
+    if field == "id":
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"Invalid ID [{value}]") from None
+    if field == "created":
+        try:
+            start = datetime.fromisoformat(value)
+        except ValueError:
+            raise ValueError(f"Invalid date [{value}]") from None
+        if start.tzinfo is not None:
+            start = start.astimezone(timezone.utc).replace(tzinfo=None)
+        if len(value) <= 10:  # date without time: the whole day
+            return start, start + timedelta(days=1)
+        return start, start + timedelta(microseconds=1)
+    return value
+
+
+# ########################################################################## #
+# ############################### PREDICATES ############################### #
+# ########################################################################## #
+
+
+def _compile(node: Node) -> Callable[[Any], bool]:
+    """PRIVATE - predicate of a syntax tree on the Requirement attributes"""
+    if isinstance(node, And):
+        predicates = [_compile(operand) for operand in node.operands]
+        return lambda item: all(predicate(item) for predicate in predicates)
+    if isinstance(node, Or):
+        predicates = [_compile(operand) for operand in node.operands]
+        return lambda item: any(predicate(item) for predicate in predicates)
+    if isinstance(node, Not):
+        predicate = _compile(node.operand)
+        return lambda item: not predicate(item)
+
+    attribute = FIELDS[node.field][0]
+    op, value = node.op, node.value
+    if node.field == "created":
+        start, end = (to_microseconds(bound) for bound in value)
+        test = {
+            "=": lambda date: start <= date < end,
+            "!=": lambda date: not start <= date < end,
+            "<": lambda date: date < start,
+            "<=": lambda date: date < end,
+            ">": lambda date: date >= end,
+            ">=": lambda date: date >= start,
+        }[op]
+        return lambda item: test(
+            to_microseconds(_as_datetime(getattr(item, attribute))))
+    if node.field == "id":
+        test = {
+            "=": lambda other: other == value,
+            "!=": lambda other: other != value,
+            "<": lambda other: other is not None and other < value,
+            "<=": lambda other: other is not None and other <= value,
+            ">": lambda other: other is not None and other > value,
+            ">=": lambda other: other is not None and other >= value,
+        }[op]
+        return lambda item: test(getattr(item, attribute))
+
+    text = value.lower() if node.field != "status" else value
+    test = {
+        "=": lambda other: other == text,
+        "!=": lambda other: other != text,
+        "~": lambda other: text in other,
+    }[op]
+    if node.field == "status":
+        return lambda item: test(str(getattr(item, attribute)).upper())
+    return lambda item: test(str(getattr(item, attribute)).lower())
+
+
+def _as_datetime(value: Any) -> datetime:
+    """PRIVATE - creation date read from a file"""
+    if isinstance(value, str):
+        return datetime.fromisoformat(value)
+    if not isinstance(value, datetime) and isinstance(value, date):
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+def _fields(node: Node) -> FrozenSet[str]:
+    """PRIVATE - Requirement attributes used by a syntax tree"""
+    if isinstance(node, Term):
+        return frozenset((FIELDS[node.field][0],))
+    if isinstance(node, Not):
+        return _fields(node.operand)
+    return frozenset().union(*(_fields(operand)
+                               for operand in node.operands))
+
+
+# ########################################################################## #
+# ################################# PLANNER ################################ #
+# ########################################################################## #
+
+
+class QueryPlan(NamedTuple):
+    statuses: Optional[FrozenSet[str]]  # index: accepted statuses, None: all
+    start: Optional[datetime]  # index: first creation date included
+    end: Optional[datetime]  # index: last creation date excluded
+    residual: Optional[Node]  # evaluated on the files (None: nothing)
+
+    @property
+    def uses_index(self) -> bool:
+        """True if the candidates come from the secondary indexes"""
+        return (self.statuses is not None or self.start is not None or
+                self.end is not None)
+
+    def explain(self) -> str:
+        """
+        Describe the plan.
+
+        Returns:
+            str: the index selection and the residual predicate.
+        """
+        if self.uses_index:
+            source = "index(" + ", ".join(
+                part for part in (
+                    None if self.statuses is None else
+                    f"status in {sorted(self.statuses)}",
+                    None if self.start is None else
+                    f"created >= {self.start.isoformat()}",
+                    None if self.end is None else
+                    f"created < {self.end.isoformat()}",
+                ) if part is not None) + ")"
+        else:
+            source = "scan(all files)"
+        if self.residual is None:
+            return source
+        return f"{source} -> filter({self.residual})"
+
+
+def plan_query(node: Node) -> QueryPlan:
+    """
+    Plan the evaluation of a syntax tree.
+
+    The terms of the top-level "and" on the validation status (=, !=, or
+    of =) and on the creation date (=, <, <=, >, >=) are answered by the
+    secondary indexes (see RequirementIndex), the other terms (texts, IDs)
+    are evaluated on the candidate files only. Without such term, all the
+    files are scanned.
+
+    Args:
+        node (Node): the syntax tree.
+
+    Returns:
+        QueryPlan: the plan.
+    """
+    operands = node.operands if isinstance(node, And) else (node,)
+    statuses: Optional[FrozenSet[str]] = None
+    start: Optional[datetime] = None
+    end: Optional[datetime] = None
+    residual: List[Node] = []
+    for operand in operands:
+        selected = _status_selection(operand)
+        if selected is not None:
+            statuses = (selected if statuses is None
+                        else statuses & selected)
+            continue
+        if (isinstance(operand, Term) and operand.field == "created" and
+                operand.op != "!="):
+            low, high = operand.value
+            lower, upper = {
+                "=": (low, high),
+                "<": (None, low),
+                "<=": (None, high),
+                ">": (high, None),
+                ">=": (low, None),
+            }[operand.op]
+            if lower is not None:
+                start = lower if start is None else max(start, lower)
+            if upper is not None:
+                end = upper if end is None else min(end, upper)
+            continue
+        residual.append(operand)
+    return QueryPlan(
+        statuses, start, end,
+        None if not residual else
+        residual[0] if len(residual) == 1 else And(tuple(residual)))
+
+
+def _status_selection(node: Node) -> Optional[FrozenSet[str]]:
+    """PRIVATE - statuses selected by a node answered by the status index,
+    None if the node is not such a node"""
+    if isinstance(node, Term) and node.field == "status":
+        if node.op == "=":
+            return frozenset((node.value,))
+        return frozenset(RequirementSettings.validation_status) - \
+            {node.value}
+    if isinstance(node, Not):
+        selected = _status_selection(node.operand)
+        if selected is not None:
+            return frozenset(RequirementSettings.validation_status) - \
+                selected
+    if isinstance(node, Or):
+        selections = [_status_selection(operand)
+                      for operand in node.operands]
+        if all(selected is not None for selected in selections):
+            return frozenset().union(*selections)
+    return None
+
+
+# ########################################################################## #
+# ################################ EXECUTION ############################### #
+# ########################################################################## #
+
+
+class QueryPage(NamedTuple):
+    results: List[Tuple[Path, Requirement]]  # matching files, by path
+    cursor: Optional[str]  # cursor of the next page (None: last page)
+
+
+class Query():
+    """
+    Compiled query on the requirements of a database (see parse_query for
+    the syntax).
+
+    The results are sorted by file path (relative to the rootdir) and
+    produced lazily. A page returns a cursor holding the last path, so
+    the next page starts after it without evaluating the previous results
+    again, and is not shifted by the files added or removed in between.
+
+    Usage:
+        query = Query('status:UNVALID and title~"brake"')
+        for file, requirement in query.iter(req_folder):
+            ...
+
+    Attributes:
+        text (str): the query.
+        ast (Node): the syntax tree.
+        plan (QueryPlan): the evaluation plan.
+    """
+
+    def __init__(self, text: str):
+        """
+        Parse, compile and plan a query.
+
+        Args:
+            text (str): the query.
+
+        Raises:
+            QueryError: If the query is not valid.
+        """
+        self.text = text
+        self.ast = parse_query(text)
+        self.plan = plan_query(self.ast)
+        self._predicate = _compile(self.ast)
+        self._residual = (None if self.plan.residual is None
+                          else _compile(self.plan.residual))
+        self._residual_fields = (() if self.plan.residual is None
+                                 else tuple(_fields(self.plan.residual)))
+
+    def matches(self, requirement: Requirement) -> bool:
+        """
+        Check if a requirement matches the query.
+
+        Args:
+            requirement (Requirement): the requirement.
+
+        Returns:
+            bool: True if the requirement matches.
+        """
+        return self._predicate(requirement)
+
+    def iter(
+        self,
+        req_folder: ReqFolder,
+        cursor: Optional[str] = None,
+        on_error: Optional[Callable[[Path, Exception], None]] = None,
+    ) -> Iterator[Tuple[Path, Requirement]]:
+        """
+        Get the matching requirements of a database lazily.
+
+        Args:
+            req_folder (ReqFolder): the database.
+            cursor (str | None): start after the cursor of a page.
+            on_error (Callable[[Path, Exception], None] | None): called
+            with the files which can not be read, which are skipped. If
+            None, the errors are raised.
+
+        Yields:
+            Tuple[Path, Requirement]: the file and its requirement, by path.
+
+        Raises:
+            QueryError: If the cursor is not a cursor of this query.
+        """
+        for _, file, requirement in self._iter(req_folder, cursor,
+                                               on_error):
+            yield file, requirement
+
+    def page(
+        self,
+        req_folder: ReqFolder,
+        limit: int = QuerySettings.page_size,
+        cursor: Optional[str] = None,
+        on_error: Optional[Callable[[Path, Exception], None]] = None,
+    ) -> QueryPage:
+        """
+        Get a page of the matching requirements of a database.
+
+        Args:
+            req_folder (ReqFolder): the database.
+            limit (int): maximum number of results.
+            cursor (str | None): cursor of the previous page, None for the
+            first page.
+            on_error (Callable[[Path, Exception], None] | None): see iter.
+
+        Returns:
+            QueryPage: the results and the cursor of the next page.
+
+        Raises:
+            QueryError: If the cursor is not a cursor of this query.
+        """
+        results: List[Tuple[Path, Requirement]] = []
+        last_key = None
+        for key, file, requirement in self._iter(req_folder, cursor,
+                                                 on_error):
+            if len(results) == limit:
+                return QueryPage(results, self._cursor(last_key))
+            results.append((file, requirement))
+            last_key = key
+        return QueryPage(results, None)
+
+    # ------------------------------ PRIVATE ----------------------------- #
+
+    def _iter(
+        self,
+        req_folder: ReqFolder,
+        cursor: Optional[str],
+        on_error: Optional[Callable[[Path, Exception], None]],
+    ) -> Iterator[Tuple[str, Path, Requirement]]:
+        """PRIVATE - (key, file, requirement) of the matching files"""
+        after = None if cursor is None else self._after(cursor)
+        rootdir = req_folder.rootdir
+        plan = self.plan
+        unreadable: Dict[str, Exception] = {}  # files not indexed
+        if not plan.uses_index:
+            files = req_folder.get_list_of_requirement_files()
+        elif plan.statuses is not None and not plan.statuses:
+            files = []
+        else:
+            index = req_folder.get_index()
+            files = index.filter(plan.statuses or (), plan.start, plan.end)
+            unreadable = {file.relative_to(rootdir).as_posix(): error
+                          for file, error in index.errors.items()}
+        keys = sorted({file.relative_to(rootdir).as_posix()
+                       for file in files} | set(unreadable))
+        if after is not None:
+            keys = keys[bisect.bisect_right(keys, after):]
+
+        for key in keys:
+            file = rootdir / key
+            req_file = ReqFile(path=file)
+            try:
+                if key in unreadable:
+                    raise unreadable[key]
+                # projection of the residual fields before the whole file
+                if self._residual is not None and not self._residual(
+                        SimpleNamespace(**req_file.read_fields(
+                            self._residual_fields))):
+                    continue
+                requirement = req_file.read()
+            except (ValidationError, yaml.YAMLError, OSError, TypeError,
+                    ValueError) as error:
+                if on_error is None:
+                    raise
+                on_error(file, error)
+                continue
+            yield key, file, requirement
+
+    def _cursor(self, key: str) -> str:
+        """PRIVATE - opaque cursor after a file"""
+        data = json.dumps({"query": self._query_hash(), "after": key})
+        return base64.urlsafe_b64encode(data.encode("utf-8")).decode("ascii")
+
+    def _after(self, cursor: str) -> str:
+        """PRIVATE - last file of a cursor"""
+        try:
+            data = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+            if data["query"] != self._query_hash():
+                raise ValueError("other query")
+            return str(data["after"])
+        except (ValueError, KeyError, TypeError) as error:
+            raise QueryError(
+                f"Invalid cursor for the query [{self.text}]") from error
+
+    def _query_hash(self) -> str:
+        """PRIVATE - short hash of the syntax tree"""
+        return content_hash(repr(self.ast).encode("utf-8"))[:16]
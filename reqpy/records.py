@@ -0,0 +1,149 @@
+""" Compact immutable requirement records for in-memory services"""
+
+# IMPORT SECTION
+from __future__ import annotations
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+from .__settings import RequirementSettings
+from .requirements import Requirement
+from .utils import ImmutableClass
+
+__all__ = [
+    "RequirementRecord",
+]
+
+# interned validation status: all the records share the same str objects
+_STATUS = {status: status for status in RequirementSettings.validation_status}
+
+
+class RequirementRecord(ImmutableClass):
+    """
+    Compact and immutable representation of a requirement.
+
+    The record uses __slots__ (no per-instance __dict__) and shares the
+    validation status strings between all the records. Its footprint,
+    without the title and detail strings, is below
+    RECORD_MEMORY_TARGET bytes (see benchmarks/bench_records.py).
+
+    Attributes:
+        title (str): The title of the requirement.
+        detail (str): The content of the requirement.
+        validation_status (str): The validation status of the requirement.
+        creation_date (datetime): The creation date of the requirement.
+        identifier (int | None): The stable unique ID of the requirement.
+    """
+
+    __slots__ = ("title", "detail", "validation_status", "creation_date",
+                 "identifier")
+
+    # memory per record in bytes (slots object + creation date; the ID is
+    # None or an int shared with the ID index)
+    RECORD_MEMORY_TARGET = 136
+
+    def __init__(
+        self,
+        title: str,
+        detail: str,
+        validation_status: str,
+        creation_date: datetime,
+        identifier: Optional[int] = None,
+    ):
+        """
+        Initialize the record.
+
+        Args:
+            title (str): The title of the requirement.
+            detail (str): The content of the requirement.
+            validation_status (str): The validation status of the
+            requirement.
+            creation_date (datetime): The creation date of the requirement.
+            identifier (int | None): The stable unique ID of the
+            requirement. Defaults to None (no ID).
+
+        Raises:
+            ValueError: If the validation status is not permitted.
+        """
+        try:
+            status = _STATUS[validation_status]
+        except KeyError:
+            try:
+                status = _STATUS[validation_status.upper()]
+            except (KeyError, AttributeError):
+                raise ValueError(
+                    f"Validation status [{validation_status}] is not in" +
+                    " the permitted list " +
+                    f"{RequirementSettings.validation_status}"
+                ) from None
+        object.__setattr__(self, "title", title)
+        object.__setattr__(self, "detail", detail)
+        object.__setattr__(self, "validation_status", status)
+        object.__setattr__(self, "creation_date", creation_date)
+        object.__setattr__(self, "identifier", identifier)
+        super().__init__()
+
+    @classmethod
+    def from_requirement(cls, requirement: Requirement) -> RequirementRecord:
+        """
+        Create a record from a Requirement object.
+
+        Args:
+            requirement (Requirement): The requirement to convert.
+
+        Returns:
+            RequirementRecord: the record sharing the requirement values.
+        """
+        return cls(
+            requirement.title,
+            requirement.detail,
+            requirement.validation_status,
+            requirement.creation_date,
+            requirement.identifier,
+        )
+
+    def to_requirement(self, validate: bool = True) -> Requirement:
+        """
+        Convert the record to a Requirement object.
+
+        Args:
+            validate (bool): If False, the Requirement object is built
+            without validation (faster for records built from valid
+            requirements). Defaults to True.
+
+        Returns:
+            Requirement: the requirement.
+        """
+        if validate:
+            return Requirement(**self.to_dict())
+        return Requirement.construct(**self.to_dict())
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Get the record as a dictionary of the Requirement fields.
+
+        Returns:
+            Dict[str, Any]: the fields of the record.
+        """
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def _astuple(self) -> Tuple[Any, ...]:
+        """PRIVATE - values of the record"""
+        return (self.title, self.detail, self.validation_status,
+                self.creation_date, self.identifier)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RequirementRecord):
+            return NotImplemented
+        return self._astuple() == other._astuple()
+
+    def __hash__(self) -> int:
+        return hash(self._astuple())
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(title={self.title!r}, " +
+            f"validation_status={self.validation_status!r}, " +
+            f"creation_date={self.creation_date!r})"
+        )
+
+    def __reduce__(self):
+        return (type(self), self._astuple())
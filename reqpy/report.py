@@ -0,0 +1,190 @@
+""" Streaming LaTeX report of a requirement database"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import re
+from pathlib import Path
+from typing import IO, List, NamedTuple, Optional, Tuple
+from .__settings import FolderStructure, ReportSettings
+from .database import ReqFolder
+from .layout import logical_folder
+from .requirements import Requirement
+
+__all__ = [
+    "LatexReport",
+    "escape_latex",
+    "write_latex_report",
+]
+
+# translation table of the LaTeX special characters (compiled once)
+LATEX_ESCAPE = str.maketrans({
+    "\\": r"\textbackslash{}",
+    "&": r"\&",
+    "%": r"\%",
+    "$": r"\$",
+    "#": r"\#",
+    "_": r"\_",
+    "{": r"\{",
+    "}": r"\}",
+    "~": r"\textasciitilde{}",
+    "^": r"\textasciicircum{}",
+    "<": r"\textless{}",
+    ">": r"\textgreater{}",
+})
+
+PREAMBLE = r"""\documentclass{report}
+\usepackage[T1]{fontenc}
+\usepackage[utf8]{inputenc}
+\usepackage{lmodern}
+\usepackage{textcomp}
+\title{%s}
+\begin{document}
+\maketitle
+\tableofcontents
+"""
+
+
+# characters of the label keys written as they are, the others are encoded
+LABEL_CHARACTERS = re.compile(r"[^A-Za-z0-9/._-]")
+
+
+class LatexReport(NamedTuple):
+    main_file: Path  # file to compile
+    chapters: List[Path]  # chapter files included with \input
+    requirements: int  # number of written requirements
+    errors: List[Tuple[Path, str]]  # files which can not be read
+
+
+def escape_latex(text: str) -> str:
+    """
+    Escape the LaTeX special characters of a text.
+
+    Args:
+        text (str): the text.
+
+    Returns:
+        str: the text to write in a LaTeX document.
+    """
+    return text.translate(LATEX_ESCAPE)
+
+
+def write_latex_report(
+    req_folder: ReqFolder,
+    output_dir: Path,
+    title: str = "Requirements",
+    chapter_size: int = ReportSettings.chapter_size,
+) -> LatexReport:
+    """
+    Write the requirements of a database as a LaTeX report.
+
+    The requirements are read one by one and written directly to disk:
+    each folder of the database is a chapter, split in chapter files of at
+    most chapter_size requirements, included by the main file with
+    \\input. The memory use does not depend on the number of requirements.
+    The chapter files of a previous report are removed first. Each section
+    is labelled req:id-<ID>, or req:path-<file relative to the rootdir>
+    for the requirements without ID.
+
+    Args:
+        req_folder (ReqFolder): the database.
+        output_dir (Path): folder of the main file and of the chapter
+        folder (created if needed).
+        title (str): title of the report.
+        chapter_size (int): maximum number of requirements per chapter
+        file.
+
+    Returns:
+        LatexReport: the written files and the unreadable requirements.
+    """
+    output_dir = Path(output_dir)
+    chapter_dir = output_dir / ReportSettings.chapter_folder
+    chapter_dir.mkdir(parents=True, exist_ok=True)
+    for stale_chapter in chapter_dir.glob("chapter_*.tex"):
+        stale_chapter.unlink()
+    main_folder = req_folder.rootdir / FolderStructure.main_folder
+
+    files = sorted(req_folder.get_list_of_requirement_files(),
+                   key=lambda file: (logical_folder(file), file.name))
+    errors: List[Tuple[Path, str]] = []
+    chapters: List[Path] = []
+    written = 0
+    main_file = output_dir / ReportSettings.main_file
+
+    with _open(main_file) as main:
+        main.write(PREAMBLE % escape_latex(title))
+        chapter: Optional[IO[str]] = None
+        current_folder = None
+        in_chapter = 0
+        try:
+            for file, requirement in req_folder.iter_requirements(
+                    files, on_error=lambda file, error: errors.append(
+                        (file, str(error)))):
+                folder = logical_folder(file)
+                if (chapter is None or folder != current_folder or
+                        in_chapter >= chapter_size):
+                    if chapter is not None:
+                        chapter.close()
+                    path = chapter_dir / (
+                        f"chapter_{len(chapters) + 1:04d}.tex")
+                    chapters.append(path)
+                    main.write("\\input{" +
+                               path.relative_to(output_dir).as_posix() +
+                               "}\n")
+                    chapter = _open(path)
+                    if folder != current_folder:
+                        chapter.write(_chapter_heading(folder, main_folder))
+                    current_folder = folder
+                    in_chapter = 0
+                label = _label(requirement, file, req_folder.rootdir)
+                chapter.write(_section(requirement, label))
+                in_chapter += 1
+                written += 1
+        finally:
+            if chapter is not None:
+                chapter.close()
+        main.write("\\end{document}\n")
+
+    return LatexReport(main_file, chapters, written, errors)
+
+
+def _open(path: Path) -> IO[str]:
+    """PRIVATE - open a LaTeX file with a large write buffer"""
+    return open(path, "w", encoding="utf-8",
+                buffering=ReportSettings.buffer_size)
+
+
+def _chapter_heading(folder: Path, main_folder: Path) -> str:
+    """PRIVATE - chapter of a database folder"""
+    try:
+        name = folder.relative_to(main_folder).as_posix()
+    except ValueError:
+        name = folder.as_posix()
+    if name in ("", "."):
+        name = FolderStructure.main_folder
+    return "\\chapter{" + escape_latex(name) + "}\n"
+
+
+def _label(requirement: Requirement, file: Path, rootdir: Path) -> str:
+    """PRIVATE - unique label key of a requirement: its ID, else its file
+    (the other characters than LABEL_CHARACTERS are encoded as +<hex>+)"""
+    if requirement.identifier is not None:
+        return f"id-{requirement.identifier}"
+    try:
+        name = file.relative_to(rootdir)
+    except ValueError:
+        name = file
+    return "path-" + LABEL_CHARACTERS.sub(
+        lambda match: f"+{ord(match.group()):x}+",
+        name.with_suffix("").as_posix())
+
+
+def _section(requirement: Requirement, label: str) -> str:
+    """PRIVATE - section of a requirement"""
+    return (
+        "\\section{" + escape_latex(requirement.title) + "}\n" +
+        "\\label{req:" + label + "}\n" +
+        "\\textbf{Status:} " + requirement.validation_status +
+        " \\quad \\textbf{Created:} " +
+        requirement.creation_date.strftime("%Y-%m-%d") + "\n\n" +
+        escape_latex(requirement.detail) + "\n\n"
+    )
@@ -3,13 +3,22 @@
 # IMPORT SECTION
 from __future__ import annotations
 import yaml
+from contextlib import nullcontext
 from pathlib import Path
 # from enum import auto, StrEnum
 from datetime import datetime
 from pydantic import BaseModel, Field, validator
 from pydantic.json import pydantic_encoder
 from .__settings import RequirementSettings, RequirementFileSettings
+from .layout import (database_rootdir, is_sharded_path, logical_folder,
+                     remove_empty_shards, shard_folders)
+from .projection import read_fields
+from .locking import (ConflictError, content_hash, create_file,
+                      lock_database, open_locked, replace_file)
+from .events import EVENTS, FileRenamed, FileWritten
+from typing import Any, Dict, Iterable, Optional, Tuple
 from .utils.validation import has_punctuation_or_accent
+from .utils import invalidateStat
 
 
 __all__ = [
@@ -17,6 +26,8 @@ __all__ = [
     "ReqFile",
 ]
 
+_EMPTY_HASH = content_hash(b"")  # hash of a missing file
+
 # ########################################################################## #
 # ############################### UTILS CLASS ############################## #
 # ########################################################################## #
@@ -50,6 +61,8 @@ class Requirement(BaseModel):
         validation_status (ValidationStatus): The validation status of
          the requirement.
         creation_date (datetime): The creation date of the requirement.
+        identifier (int | None): The stable unique ID of the requirement in
+         its database (see ReqFolder.create_requirement).
 
     """
 
@@ -64,6 +77,7 @@ class Requirement(BaseModel):
     )
     validation_status: str = "UNVALID"
     creation_date: datetime = datetime.now()
+    identifier: Optional[int] = None
 
     @validator('validation_status')
     def status_is_conform(cls, value: str):
@@ -172,26 +186,192 @@ class ReqFile(BaseModel):
         Returns:
             Requirement: The Requirement object parsed from the file.
 
+        Raises:
+            FileNotFoundError: If the file does not exist.
+        """
+        return self.read_with_hash()[0]
+
+    def read_with_hash(self) -> Tuple[Requirement, str]:
+        """
+        Reads the requirement file under a shared lock and returns the
+        Requirement object and the hash of the file content, to be given
+        to write() for an optimistic concurrency check.
+
+        Returns:
+            Tuple[Requirement, str]: The Requirement object parsed from the
+            file and the content hash.
+
         Raises:
             FileNotFoundError: If the file does not exist.
         """
         if self.exists():
-            with open(self.path, 'r') as file:
-                datamap = yaml.safe_load(file)
-            return Requirement(**datamap)
+            with open_locked(self.path, shared=True) as file:
+                data = file.read()
+            return self.from_yaml(data), content_hash(data)
         raise FileNotFoundError(
             f"Impossible to read. The file {self.path} does not exist"
         )
 
-    def write(self, requirement):
+    def content_hash(self) -> str:
+        """
+        Computes the hash of the file content.
+
+        Returns:
+            str: the content hash (hash of an empty content if the file
+            does not exist).
+        """
+        if not self.exists():
+            return content_hash(b"")
+        with open_locked(self.path, shared=True) as file:
+            return content_hash(file.read())
+
+    def read_fields(self, fields: Iterable[str]) -> Dict[str, Any]:
+        """
+        Reads some fields of the requirement file without building and
+        validating a Requirement object.
+
+        Args:
+            fields (Iterable[str]): names of the Requirement fields to read.
+
+        Returns:
+            Dict[str, Any]: the requested fields. A field missing in the
+            file gets the default value of the Requirement class.
+
+        Raises:
+            ValueError: If a field is not a Requirement field.
+            FileNotFoundError: If the file does not exist.
+        """
+        fields = tuple(fields)
+        unknown_fields = [
+            field for field in fields if field not in Requirement.__fields__
+        ]
+        if unknown_fields:
+            raise ValueError(
+                f"Fields {unknown_fields} are not in the Requirement" +
+                f" fields {tuple(Requirement.__fields__)}"
+            )
+        if not self.exists():
+            raise FileNotFoundError(
+                f"Impossible to read. The file {self.path} does not exist"
+            )
+
+        data = read_fields(self.path, fields)
+        return {
+            field: data.get(field, Requirement.__fields__[field].default)
+            for field in fields
+        }
+
+    def write(
+        self,
+        requirement: Requirement,
+        expected_hash: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> str:
         """
         Writes a YAML file based on the Requirement object.
 
+        The file is written under an exclusive advisory lock, so that
+        concurrent writers of the same file do not interleave, and under
+        the shared lock of its database (see ReqFolder.lock), so that the
+        files are not written while the database files are moved or
+        deleted. The content
+        is replaced atomically (temporary file renamed over the file), so
+        that the readers without lock never see a partial file.
+        A FileWritten event is emitted (see events.EVENTS).
+
         Args:
             requirement (Requirement): The Requirement object to write.
+            expected_hash (str | None): content hash of the file when it
+            was read (see read_with_hash, the hash of a missing file is
+            the hash of an empty content). If given and the file was
+            modified since, the file is not written. Defaults to None
+            (no check).
+            timeout (float | None): seconds to wait for the lock, None to
+            wait forever.
 
         Returns:
-            None
+            str: the content hash of the written file.
+
+        Raises:
+            ConflictError: If the file content does not match the
+            expected hash.
+            LockTimeout: If the file is not locked before the timeout.
+
+        Notes:
+            - see ReqFile.to_yaml for the serialization.
+        """
+        return self.write_document(self.to_yaml(requirement), expected_hash,
+                                   timeout)
+
+    def write_document(
+        self,
+        document: str,
+        expected_hash: Optional[str] = None,
+        timeout: Optional[float] = None,
+    ) -> str:
+        """
+        Writes a YAML document already serialized by ReqFile.to_yaml, e.g.
+        validated by another process, as ReqFile.write does.
+
+        Args:
+            document (str): the YAML document.
+            expected_hash (str | None): content hash of the file when it
+            was read, the hash of an empty content to only create the
+            file. Defaults to None (no check).
+            timeout (float | None): seconds to wait for the lock, None to
+            wait forever.
+
+        Returns:
+            str: the content hash of the written file.
+
+        Raises:
+            ConflictError: If the file content does not match the
+            expected hash.
+            LockTimeout: If the file is not locked before the timeout.
+        """
+        data = document.encode("utf-8")
+        created = not self.exists()
+        # a file expected with a content is never created
+        create = expected_hash in (None, _EMPTY_HASH)
+        if created and not create:
+            raise ConflictError(
+                f"The file {self.path} was deleted by another writer " +
+                "(content hash mismatch)"
+            )
+
+        rootdir = database_rootdir(self.path)
+        with (nullcontext() if rootdir is None else
+              lock_database(rootdir, shared=True, timeout=timeout)):
+            if not (created and create and create_file(self.path, data)):
+                try:
+                    with open_locked(self.path, timeout=timeout,
+                                     create=create) as file:
+                        if (expected_hash is not None and
+                                content_hash(file.read()) != expected_hash):
+                            raise ConflictError(
+                                f"The file {self.path} was modified by " +
+                                "another writer (content hash mismatch)"
+                            )
+                        replace_file(self.path, data)
+                except FileNotFoundError:
+                    raise ConflictError(
+                        f"The file {self.path} was deleted by another " +
+                        "writer (content hash mismatch)"
+                    ) from None
+        invalidateStat(self.path)
+        EVENTS.emit(FileWritten(self.path, created))
+        return content_hash(data)
+
+    @staticmethod
+    def to_yaml(requirement: Requirement) -> str:
+        """
+        Serializes a Requirement object as a YAML document.
+
+        Args:
+            requirement (Requirement): The Requirement object to serialize.
+
+        Returns:
+            str: the YAML document.
 
         Notes:
             - The writing of multiline string for YAML is updated.
@@ -213,9 +393,24 @@ class ReqFile(BaseModel):
             str, str_presenter)  # to use with safe_dump
 
         data_json = pydantic_encoder(requirement)
+        if data_json.get("identifier") is None:
+            # requirements without ID keep the original file format
+            data_json.pop("identifier", None)
+
+        return yaml.safe_dump(data_json)
+
+    @staticmethod
+    def from_yaml(document: str | bytes) -> Requirement:
+        """
+        Parses a YAML document into a Requirement object.
 
-        with open(self.path, 'w+') as file:
-            yaml.safe_dump(data_json, file)
+        Args:
+            document (str | bytes): the YAML document.
+
+        Returns:
+            Requirement: The Requirement object parsed from the document.
+        """
+        return Requirement(**yaml.safe_load(document))
 
     def get_valid_fileName(self):
         """
@@ -224,10 +419,21 @@ class ReqFile(BaseModel):
         Returns:
             str: The valid file name based on the requirement title.
         """
-        requirement_title = self.read().title
+        return self.title_to_fileName(self.read().title)
+
+    @staticmethod
+    def title_to_fileName(title: str) -> str:
+        """
+        Get the valid file name (without extension) of a requirement title.
 
+        Args:
+            title (str): The requirement title.
+
+        Returns:
+            str: The valid file name.
+        """
         # Replace white space with _
-        return requirement_title.replace(" ", "_")
+        return title.replace(" ", "_")
 
     def is_valid_fileName(self):
         """
@@ -241,20 +447,30 @@ class ReqFile(BaseModel):
 
     def rename_file(self) -> Path:
         """
-        Rename the requirement file to a valid file name.
+        Rename the requirement file to a valid file name. A FileRenamed
+        event is emitted (see events.EVENTS) and the shard directories left
+        empty are removed.
 
         Returns:
             (Path) new file
         """
         # Specify the folder path and the file name
-        folder_path = self.path.parent
+        folder_path = logical_folder(self.path)
         new_file_name = (self.get_valid_fileName() + RequirementFileSettings.default_extension)
 
-        # Create the Path objects for the new file
+        # Create the Path objects for the new file (kept in the shard
+        # directories if the file is stored with the sharded layout)
+        if is_sharded_path(self.path):
+            folder_path = folder_path.joinpath(*shard_folders(new_file_name))
+            folder_path.mkdir(parents=True, exist_ok=True)
         new_file_path = folder_path / new_file_name
 
         # rename file
-        self.path = self.path.rename(new_file_path)
+        invalidateStat(self.path)
+        old_path, self.path = self.path, self.path.rename(new_file_path)
+        invalidateStat(self.path)
+        remove_empty_shards(old_path.parent, logical_folder(old_path))
+        EVENTS.emit(FileRenamed(self.path, old_path))
 
         return new_file_path
 
@@ -0,0 +1,236 @@
+""" Incremental per-folder aggregates of a requirement database"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import bisect
+import json
+from collections import Counter
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+from .__settings import FolderStructure, RollupSettings
+from .indexes import IncrementalIndex
+from .layout import logical_folder
+
+__all__ = [
+    "FolderRollup",
+    "RollupIndex",
+]
+
+_EPOCH = datetime(1970, 1, 1)
+
+
+class FolderRollup(NamedTuple):
+    counts: Dict[str, int]  # number of requirements per validation status
+    total: int  # number of requirements in the folder and sub-folders
+    latest: Optional[datetime]  # latest creation date (UTC), None if empty
+
+
+class _Node():
+    """PRIVATE - aggregates of a folder: own files and whole subtree"""
+
+    def __init__(self):
+        self.children: Set[str] = set()
+        self.own_counts: Counter = Counter()
+        self.own_dates: List[int] = []  # sorted creation dates (us)
+        self.counts: Counter = Counter()  # subtree
+        self.latest: Optional[int] = None  # subtree
+
+
+class RollupIndex(IncrementalIndex):
+    """
+    Per-folder aggregates of the requirements (counts per validation
+    status, total and latest creation date), each folder including its
+    sub-folders, updated incrementally (see IncrementalIndex).
+
+    Each folder keeps the aggregates of its own files and of its subtree.
+    When a file is added, modified or removed, only its folder and the
+    chain of its ancestors are recomputed, from the subtree aggregates of
+    their direct children.
+
+    Attributes:
+        rootdir (Path): The root directory of the database.
+    """
+
+    def __init__(self, rootdir: Path):
+        """
+        Initialize empty aggregates.
+
+        Args:
+            rootdir (Path): The root directory of the database.
+        """
+        super().__init__(rootdir)
+        # file key -> (folder key, status, creation date (us), stat)
+        self._files: Dict[str, Tuple[str, str, int, tuple]] = {}
+        self._nodes: Dict[str, _Node] = {}
+
+    def __len__(self) -> int:
+        return len(self._files)
+
+    # ------------------------------ QUERIES ----------------------------- #
+
+    def get(self, folder: Path | str) -> FolderRollup:
+        """
+        Get the aggregates of a folder.
+
+        Args:
+            folder (Path | str): the folder (absolute or relative to the
+            rootdir).
+
+        Returns:
+            FolderRollup: the aggregates (zero if the folder has no
+            requirement).
+        """
+        node = self._nodes.get(self._key(folder))
+        if node is None:
+            return FolderRollup({}, 0, None)
+        return FolderRollup(
+            dict(node.counts), sum(node.counts.values()),
+            None if node.latest is None else
+            _EPOCH + timedelta(microseconds=node.latest))
+
+    def folders(self) -> Dict[str, FolderRollup]:
+        """
+        Get the aggregates of all the folders with requirements.
+
+        Returns:
+            Dict[str, FolderRollup]: aggregates per folder (relative to the
+            rootdir), sorted by folder.
+        """
+        return {key: self.get(key) for key in sorted(self._nodes)}
+
+    # ------------------------------ UPDATE ------------------------------ #
+
+    def update(self, path: Path):
+        key, stat, status, date = self._read(path)
+        self._remove_file(key)
+        entry = (self._key(logical_folder(self.rootdir / key)), status, date,
+                 stat)
+        self._files[key] = entry
+        node = self._node(entry[0])
+        node.own_counts[entry[1]] += 1
+        bisect.insort(node.own_dates, entry[2])
+        self._recompute(entry[0])
+
+    def remove(self, path: Path):
+        self._errors.pop(self._key(path), None)
+        folder = self._remove_file(self._key(path))
+        if folder is not None:
+            self._recompute(folder)
+
+    # ---------------------------- PERSISTENCE --------------------------- #
+
+    def save(self, path: Optional[Path] = None):
+        """
+        Save the file entries (the aggregates are rebuilt at loading).
+
+        Args:
+            path (Path | None): file of the aggregates. Defaults to the
+            rollup file of the metadata folder.
+        """
+        path = self._rollup_file() if path is None else Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w") as file:
+            json.dump(self._files, file)
+        tmp_path.replace(path)
+
+    @classmethod
+    def load(cls, rootdir: Path, path: Optional[Path] = None) -> RollupIndex:
+        """
+        Load saved aggregates.
+
+        Args:
+            rootdir (Path): The root directory of the database.
+            path (Path | None): file of the aggregates. Defaults to the
+            rollup file of the metadata folder.
+
+        Returns:
+            RollupIndex: the aggregates.
+
+        Raises:
+            FileNotFoundError: If the rollup file does not exist.
+        """
+        index = cls(rootdir)
+        path = index._rollup_file() if path is None else Path(path)
+        with open(path, "r") as file:
+            entries = json.load(file)
+        for key, (folder, status, date, stat) in entries.items():
+            index._files[key] = (folder, status, date, tuple(stat))
+            node = index._node(folder)
+            node.own_counts[status] += 1
+            node.own_dates.append(date)
+        for node in index._nodes.values():
+            node.own_dates.sort()
+        # children before parents
+        for folder in sorted(index._nodes, key=lambda key: -key.count("/")):
+            index._aggregate(index._nodes[folder])
+        return index
+
+    # ------------------------------ PRIVATE ----------------------------- #
+
+    def _rollup_file(self) -> Path:
+        """PRIVATE - default path of the rollup file"""
+        return (self.rootdir / FolderStructure.metadata_folder /
+                RollupSettings.rollup_file)
+
+    def _signature(self, key: str) -> Optional[tuple]:
+        entry = self._files.get(key)
+        return None if entry is None else entry[3]
+
+    def _keys(self) -> Iterable[str]:
+        return self._files
+
+    def _node(self, folder: str) -> _Node:
+        """PRIVATE - node of a folder, created with its ancestors"""
+        node = self._nodes.get(folder)
+        if node is None:
+            node = self._nodes[folder] = _Node()
+            parent = _parent(folder)
+            if parent is not None:
+                self._node(parent).children.add(folder)
+        return node
+
+    def _remove_file(self, key: str) -> Optional[str]:
+        """PRIVATE - remove the own contribution of a file, return its
+        folder"""
+        entry = self._files.pop(key, None)
+        if entry is None:
+            return None
+        node = self._nodes[entry[0]]
+        node.own_counts[entry[1]] -= 1
+        if node.own_counts[entry[1]] == 0:
+            del node.own_counts[entry[1]]
+        del node.own_dates[bisect.bisect_left(node.own_dates, entry[2])]
+        return entry[0]
+
+    def _aggregate(self, node: _Node):
+        """PRIVATE - subtree aggregates from the own files and the children"""
+        node.counts = Counter(node.own_counts)
+        dates = [node.own_dates[-1]] if node.own_dates else []
+        for child in node.children:
+            child_node = self._nodes[child]
+            node.counts.update(child_node.counts)
+            if child_node.latest is not None:
+                dates.append(child_node.latest)
+        node.latest = max(dates, default=None)
+
+    def _recompute(self, folder: str):
+        """PRIVATE - recompute a folder and its ancestors, and drop the
+        empty folders"""
+        while folder is not None:
+            node = self._nodes[folder]
+            self._aggregate(node)
+            parent = _parent(folder)
+            if not node.counts and not node.children:
+                del self._nodes[folder]
+                if parent is not None:
+                    self._nodes[parent].children.discard(folder)
+            folder = parent
+
+
+def _parent(folder: str) -> Optional[str]:
+    """PRIVATE - parent folder key (None above the top-level folders)"""
+    if "/" not in folder:
+        return None
+    return folder.rsplit("/", 1)[0]
@@ -0,0 +1,461 @@
+""" Local query daemon keeping a requirement database in memory"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import json
+import logging
+import os
+import threading
+import urllib.error
+import urllib.request
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Set
+import yaml
+from pydantic import ValidationError
+from pydantic.json import pydantic_encoder
+from .__settings import DaemonSettings, FolderStructure
+from .database import ReqFolder
+from .indexes import RequirementIndex
+from .requirements import Requirement, ReqFile
+
+__all__ = [
+    "RequirementCache",
+    "RequirementDaemon",
+    "DaemonClient",
+    "DaemonError",
+    "connect",
+]
+
+COMMANDS = ("ping", "search", "filter", "get", "validate")
+
+_LOGGER = logging.getLogger(__name__)
+
+
+# ########################################################################## #
+# ############################ IN-MEMORY CACHE ############################# #
+# ########################################################################## #
+
+
+class RequirementCache():
+    """
+    Requirements of a database loaded once and kept up to date.
+
+    refresh() reloads only the new and modified files (modification time
+    and size) and drops the deleted ones. The queries are answered from
+    memory and return JSON compatible data.
+
+    Attributes:
+        req_folder (ReqFolder): the database.
+        errors (Dict[Path, str]): the files which can not be read.
+    """
+
+    def __init__(self, req_folder: ReqFolder):
+        """
+        Load the requirements of the database.
+
+        Args:
+            req_folder (ReqFolder): the database.
+        """
+        self.req_folder = req_folder
+        self.errors: Dict[Path, str] = {}
+        self._requirements: Dict[Path, Requirement] = {}
+        self._stats: Dict[Path, tuple] = {}
+        self._titles: Dict[str, Set[Path]] = {}  # lowered title -> files
+        self._index = RequirementIndex(req_folder.rootdir)
+        self._lock = threading.RLock()
+        self.refresh()
+
+    def __len__(self) -> int:
+        return len(self._requirements)
+
+    def refresh(self) -> bool:
+        """
+        Update the cache with the current requirement files.
+
+        Returns:
+            bool: True if the cache was modified.
+        """
+        files = self.req_folder.get_list_of_requirement_files()
+        current = set(files)
+        modified = False
+        with self._lock:
+            for file in files:
+                try:
+                    stat = os.stat(file)
+                except FileNotFoundError:
+                    current.discard(file)
+                    continue
+                stat = (stat.st_mtime_ns, stat.st_size)
+                if self._stats.get(file) != stat:
+                    self._stats[file] = stat
+                    self._load(file)
+                    modified = True
+            for file in set(self._stats) - current:
+                self._unload(file)
+                modified = True
+        return modified
+
+    def _load(self, file: Path):
+        """PRIVATE - (re)load a requirement file"""
+        self._unload(file, keep_stat=True)
+        try:
+            requirement = ReqFile(path=file).read()
+            self._index.update(file)
+        except (ValidationError, yaml.YAMLError, OSError, TypeError) as error:
+            self.errors[file] = str(error)
+            return
+        self._requirements[file] = requirement
+        self._titles.setdefault(requirement.title.lower(), set()).add(file)
+
+    def _unload(self, file: Path, keep_stat: bool = False):
+        """PRIVATE - remove a requirement file"""
+        requirement = self._requirements.pop(file, None)
+        if requirement is not None:
+            files = self._titles.get(requirement.title.lower(), set())
+            files.discard(file)
+            if not files:
+                self._titles.pop(requirement.title.lower(), None)
+            self._index.remove(file)
+        self.errors.pop(file, None)
+        if not keep_stat:
+            self._stats.pop(file, None)
+
+    # ------------------------------ QUERIES ----------------------------- #
+
+    def execute(self, command: str, params: Optional[Dict[str, Any]] = None):
+        """
+        Execute a query.
+
+        Args:
+            command (str): one of COMMANDS.
+            params (Dict[str, Any] | None): keyword arguments of the query.
+
+        Returns:
+            Any: JSON compatible result of the query.
+
+        Raises:
+            ValueError: If the command is unknown.
+        """
+        if command not in COMMANDS:
+            raise ValueError(
+                f"Command [{command}] is not in the permitted list {COMMANDS}"
+            )
+        with self._lock:
+            return getattr(self, command)(**(params or {}))
+
+    def ping(self) -> Dict[str, Any]:
+        """
+        Get the status of the cache.
+
+        Returns:
+            Dict[str, Any]: the rootdir and the number of requirements.
+        """
+        return {"rootdir": str(self.req_folder.rootdir.absolute()),
+                "requirements": len(self._requirements),
+                "errors": len(self.errors)}
+
+    def search(self, text: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """
+        Search a text (case insensitive) in the titles and details.
+
+        Args:
+            text (str): the searched text.
+            limit (int): maximum number of results.
+
+        Returns:
+            List[Dict[str, Any]]: the matching requirements.
+        """
+        text = text.lower()
+        result = []
+        for file, requirement in self._requirements.items():
+            if (text in requirement.title.lower() or
+               text in requirement.detail.lower()):
+                result.append(_to_json(file, requirement))
+                if len(result) >= limit:
+                    break
+        return result
+
+    def filter(
+        self,
+        status: Iterable[str] = (),
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Get the requirements by validation status and creation date.
+
+        Args:
+            status (Iterable[str]): accepted validation statuses.
+            start (str | None): first creation date (ISO format) included.
+            end (str | None): last creation date (ISO format) excluded.
+
+        Returns:
+            List[Dict[str, Any]]: the matching requirements.
+        """
+        if isinstance(status, str):
+            status = (status,)
+        files = self._index.filter(
+            status,
+            None if start is None else datetime.fromisoformat(start),
+            None if end is None else datetime.fromisoformat(end))
+        return [_to_json(file, self._requirements[file]) for file in files
+                if file in self._requirements]
+
+    def get(self, title: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a requirement by title (case insensitive). If several files
+        have the title, the first one by path is returned.
+
+        Args:
+            title (str): the title.
+
+        Returns:
+            Dict[str, Any] | None: the requirement or None if not found.
+        """
+        files = self._titles.get(title.lower())
+        if not files:
+            return None
+        file = min(files)
+        return _to_json(file, self._requirements[file])
+
+    def validate(self, path: str) -> Dict[str, Any]:
+        """
+        Validate one requirement file of the database.
+
+        Args:
+            path (str): path of the file, relative to the rootdir or
+            absolute.
+
+        Returns:
+            Dict[str, Any]: the path, the validity and the error message.
+
+        Raises:
+            ValueError: If the file is not in the rootdir.
+        """
+        rootdir = self.req_folder.rootdir.resolve()
+        file = (rootdir / path).resolve()
+        if rootdir not in file.parents:
+            raise ValueError(
+                f"The file {path} is not in the database {rootdir}"
+            )
+        try:
+            ReqFile(path=file).read()
+        except (ValidationError, yaml.YAMLError, OSError, TypeError) as error:
+            return {"path": path, "valid": False, "error": str(error)}
+        return {"path": path, "valid": True, "error": None}
+
+
+def _to_json(file: Path, requirement: Requirement) -> Dict[str, Any]:
+    """PRIVATE - JSON compatible representation of a requirement"""
+    return json.loads(json.dumps({"path": str(file), **requirement.dict()},
+                                 default=pydantic_encoder))
+
+
+# ########################################################################## #
+# ################################# DAEMON ################################# #
+# ########################################################################## #
+
+
+class _RequestHandler(BaseHTTPRequestHandler):
+    """PRIVATE - JSON over HTTP: POST {"command": .., "params": {..}}"""
+
+    def do_POST(self):
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            request = json.loads(self.rfile.read(length) or b"{}")
+            result = self.server.cache.execute(request.get("command"),
+                                               request.get("params"))
+            self._send(200, {"result": result})
+        except (ValueError, TypeError, AttributeError) as error:
+            # AttributeError: the request is not a JSON object
+            self._send(400, {"error": str(error)})
+        except KeyError as error:
+            self._send(400, {"error": f"Unknown key {error}"})
+
+    def _send(self, code: int, data: Dict[str, Any]):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """no log for each request"""
+
+
+class RequirementDaemon():
+    """
+    Query daemon of a database listening on localhost.
+
+    The address of the daemon is written in the metadata folder of the
+    database, so that the clients find it (see connect).
+
+    Attributes:
+        cache (RequirementCache): the requirements in memory.
+        url (str): the address of the daemon.
+    """
+
+    def __init__(
+        self,
+        req_folder: ReqFolder,
+        host: str = DaemonSettings.host,
+        port: int = DaemonSettings.port,
+        refresh_interval: float = DaemonSettings.refresh_interval,
+    ):
+        """
+        Load the database and open the server socket.
+
+        Args:
+            req_folder (ReqFolder): the database.
+            host (str): listening address.
+            port (int): listening port (0: chosen by the system).
+            refresh_interval (float): seconds between two scans of the
+            files.
+        """
+        self.cache = RequirementCache(req_folder)
+        self._server = ThreadingHTTPServer((host, port), _RequestHandler)
+        self._server.daemon_threads = True
+        self._server.cache = self.cache
+        self._interval = refresh_interval
+        self._stopped = threading.Event()
+        self._threads: List[threading.Thread] = []
+        host, port = self._server.server_address[:2]
+        self.url = f"http://{host}:{port}"
+
+    def start(self):
+        """Serve in background threads."""
+        self._threads = [
+            threading.Thread(target=self._watch, daemon=True),
+            threading.Thread(target=self._server.serve_forever, daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        self._write_daemon_file()
+
+    def serve_forever(self):
+        """Serve until stop() is called or the process is interrupted."""
+        self.start()
+        try:
+            self._stopped.wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self):
+        """Stop serving and remove the daemon file."""
+        self._stopped.set()
+        self._server.shutdown()
+        self._server.server_close()
+        for thread in self._threads:
+            thread.join()
+        daemon_file = _daemon_file(self.cache.req_folder.rootdir)
+        if _read_daemon_file(daemon_file).get("url") == self.url:
+            daemon_file.unlink()
+
+    def _watch(self):
+        """PRIVATE - keep the cache up to date, whatever the errors (e.g.
+        requirement folders being recreated)"""
+        while not self._stopped.wait(self._interval):
+            try:
+                self.cache.refresh()
+            except Exception:
+                _LOGGER.exception("Refresh of the requirement cache failed")
+
+    def _write_daemon_file(self):
+        """PRIVATE - publish the address of the daemon"""
+        daemon_file = _daemon_file(self.cache.req_folder.rootdir)
+        daemon_file.parent.mkdir(parents=True, exist_ok=True)
+        with open(daemon_file, "w") as file:
+            yaml.safe_dump({"url": self.url, "pid": os.getpid()}, file)
+
+
+# ########################################################################## #
+# ################################# CLIENT ################################# #
+# ########################################################################## #
+
+
+class DaemonError(Exception):
+    # raised when the daemon returns an error
+    pass
+
+
+class DaemonClient():
+    """
+    Client of a RequirementDaemon, with the same execute() method as
+    RequirementCache.
+
+    Attributes:
+        url (str): the address of the daemon.
+    """
+
+    def __init__(self, url: str, timeout: float = DaemonSettings.timeout):
+        self.url = url
+        self.timeout = timeout
+
+    def execute(self, command: str, params: Optional[Dict[str, Any]] = None):
+        """
+        Execute a query on the daemon.
+
+        Args:
+            command (str): one of COMMANDS.
+            params (Dict[str, Any] | None): keyword arguments of the query.
+
+        Returns:
+            Any: result of the query.
+
+        Raises:
+            DaemonError: If the daemon rejects the query.
+            OSError: If the daemon is not reachable.
+        """
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({"command": command,
+                             "params": params or {}}).encode("utf-8"),
+            headers={"Content-Type": "application/json"},
+        )
+        try:
+            with urllib.request.urlopen(request,
+                                        timeout=self.timeout) as response:
+                return json.loads(response.read())["result"]
+        except urllib.error.HTTPError as error:
+            raise DaemonError(json.loads(error.read())["error"]) from None
+
+
+def connect(rootdir: Path) -> Optional[DaemonClient]:
+    """
+    Get a client of the daemon running for a database.
+
+    Args:
+        rootdir (Path): root directory of the database.
+
+    Returns:
+        DaemonClient | None: the client, or None if no daemon is running.
+    """
+    url = _read_daemon_file(_daemon_file(rootdir)).get("url")
+    if url is None:
+        return None
+    client = DaemonClient(url)
+    try:
+        client.execute("ping")
+    except (OSError, DaemonError, ValueError):
+        return None
+    return client
+
+
+def _daemon_file(rootdir: Path) -> Path:
+    """PRIVATE - path of the daemon file"""
+    return (Path(rootdir) / FolderStructure.metadata_folder /
+            DaemonSettings.daemon_file)
+
+
+def _read_daemon_file(daemon_file: Path) -> Dict[str, Any]:
+    """PRIVATE - content of the daemon file (empty if missing)"""
+    try:
+        with open(daemon_file, "r") as file:
+            return yaml.safe_load(file) or {}
+    except (OSError, yaml.YAMLError):
+        return {}
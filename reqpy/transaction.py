@@ -0,0 +1,290 @@
+""" Transactional edit sessions with a write-ahead journal"""
+
+# IMPORT SECTION
+from __future__ import annotations
+import json
+import os
+import uuid
+from pathlib import Path
+from typing import IO, TYPE_CHECKING, Dict, List, Optional
+from .__settings import FolderStructure, TransactionSettings
+from .events import EVENTS, FileDeleted, FileWritten
+from .locking import (LockTimeout, LockUpgradeError, create_file,
+                      lock_database, lock_file, open_locked, replace_file)
+from .requirements import Requirement, ReqFile
+
+if TYPE_CHECKING:
+    from .database import ReqFolder
+
+__all__ = [
+    "TransactionError",
+    "Transaction",
+    "recover_journals",
+]
+
+
+class TransactionError(Exception):
+    # raised when a transaction is used after its end
+    pass
+
+
+class Transaction():
+    """
+    Edit session applying several requirement changes atomically.
+
+    The changes are buffered in memory and appended to a write-ahead
+    journal. On commit, a commit record is appended and the journal is
+    synced once, then the files are replaced atomically (under their file
+    locks) and synced in one batch, and the journal is deleted. If the
+    process stops before the commit record, nothing is applied; after it,
+    the journal is replayed by recover_journals (called when a ReqFolder
+    is created).
+
+    Usage:
+        with req_folder.transaction() as tx:
+            tx.write("requirements/Title.yml", requirement)
+            tx.delete("requirements/Old_title.yml")
+    """
+
+    def __init__(self, req_folder: ReqFolder):
+        """
+        Start the transaction.
+
+        Args:
+            req_folder (ReqFolder): the database.
+        """
+        self.req_folder = req_folder
+        self._changes: Dict[Path, Optional[str]] = {}
+        self._journal_path = (
+            _journal_folder(req_folder.rootdir) /
+            (uuid.uuid4().hex + TransactionSettings.journal_extension))
+        self._journal_path.parent.mkdir(parents=True, exist_ok=True)
+        # the journal lock tells the recovery that the session is alive: the
+        # journal is locked under a temporary name, then made visible
+        tmp_path = self._journal_path.with_suffix(".tmp")
+        self._journal: Optional[IO[str]] = open(tmp_path, "x")
+        self._journal_lock = lock_file(self._journal)
+        self._journal_lock.__enter__()
+        tmp_path.rename(self._journal_path)
+
+    # ------------------------------ CHANGES ----------------------------- #
+
+    def write(self, path: Path, requirement: Requirement):
+        """
+        Write a requirement file at commit.
+
+        Args:
+            path (Path): path of the file (absolute or relative to the
+            rootdir).
+            requirement (Requirement): the requirement.
+        """
+        path = self._path(path)
+        ReqFile(path=path)  # check the extension
+        data = ReqFile.to_yaml(requirement)
+        self._append({"op": "write", "path": self._key(path), "data": data})
+        self._changes[path] = data
+
+    def delete(self, path: Path):
+        """
+        Delete a requirement file at commit.
+
+        Args:
+            path (Path): path of the file (absolute or relative to the
+            rootdir).
+        """
+        path = self._path(path)
+        self._append({"op": "delete", "path": self._key(path)})
+        self._changes[path] = None
+
+    def read(self, path: Path) -> Requirement:
+        """
+        Read a requirement, including the changes of the transaction.
+
+        Args:
+            path (Path): path of the file (absolute or relative to the
+            rootdir).
+
+        Returns:
+            Requirement: the requirement.
+
+        Raises:
+            FileNotFoundError: If the file does not exist or is deleted.
+        """
+        path = self._path(path)
+        if path not in self._changes:
+            return ReqFile(path=path).read()
+        data = self._changes[path]
+        if data is None:
+            raise FileNotFoundError(
+                f"Impossible to read. The file {path} is deleted"
+            )
+        return ReqFile.from_yaml(data)
+
+    # ---------------------------- END OF SESSION ------------------------ #
+
+    def commit(self) -> List[Path]:
+        """
+        Apply the changes.
+
+        Returns:
+            List[Path]: the written and deleted files.
+
+        Raises:
+            LockUpgradeError: If the thread holds the shared lock of the
+            database (see ReqFolder.lock): nothing is applied and the
+            transaction is still active.
+        """
+        self._check_active()
+        # the events are delivered after the release of the lock
+        with EVENTS.batch(), self.req_folder.lock():
+            self._append({"op": "commit"})
+            self._journal.flush()
+            os.fsync(self._journal.fileno())
+            _apply(self.req_folder.rootdir, self._changes)
+        self._close(remove=True)
+        return list(self._changes)
+
+    def rollback(self):
+        """Discard the changes."""
+        if self._journal is not None:
+            self._close(remove=True)
+
+    def __enter__(self) -> Transaction:
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            try:
+                self.commit()
+            except LockUpgradeError:
+                self.rollback()  # nothing was applied
+                raise
+        else:
+            self.rollback()
+
+    # ------------------------------ PRIVATE ----------------------------- #
+
+    def _append(self, record: Dict[str, str]):
+        """PRIVATE - append a record to the journal (not synced)"""
+        self._check_active()
+        self._journal.write(json.dumps(record) + "\n")
+
+    def _check_active(self):
+        """PRIVATE - raise an error if the transaction is ended"""
+        if self._journal is None:
+            raise TransactionError("The transaction is ended")
+
+    def _close(self, remove: bool):
+        """PRIVATE - close (and remove) the journal"""
+        if remove:
+            self._journal_path.unlink()
+        self._journal_lock.__exit__(None, None, None)
+        self._journal.close()
+        self._journal = None
+
+    def _path(self, path: Path) -> Path:
+        """PRIVATE - path of a file in the database"""
+        path = Path(path)
+        try:
+            path.relative_to(self.req_folder.rootdir)
+            return path
+        except ValueError:
+            return self.req_folder.rootdir / path
+
+    def _key(self, path: Path) -> str:
+        """PRIVATE - journal name of a file: path relative to the rootdir"""
+        return path.relative_to(self.req_folder.rootdir).as_posix()
+
+
+def recover_journals(rootdir: Path) -> int:
+    """
+    Replay the committed journals and discard the incomplete ones. The
+    journals of the running transactions (locked) are skipped. The
+    journals are replayed under the exclusive lock of the database; they
+    are left for a later recovery if the thread holds the shared lock.
+
+    Args:
+        rootdir (Path): root directory of the database.
+
+    Returns:
+        int: the number of replayed journals.
+    """
+    journal_folder = _journal_folder(rootdir)
+    if not journal_folder.is_dir():
+        return 0
+
+    replayed = 0
+    for journal_path in sorted(journal_folder.glob(
+            "*" + TransactionSettings.journal_extension)):
+        try:
+            with open_locked(journal_path, timeout=0) as journal:
+                records = []
+                for line in journal.read().decode("utf-8").splitlines():
+                    try:
+                        records.append(json.loads(line))
+                    except ValueError:  # truncated last record
+                        break
+                if records and records[-1]["op"] == "commit":
+                    changes: Dict[Path, Optional[str]] = {
+                        Path(rootdir) / record["path"]: record.get("data")
+                        for record in records[:-1]
+                    }
+                    # not interleaved with the live writers (see commit)
+                    with EVENTS.batch(), lock_database(rootdir):
+                        _apply(Path(rootdir), changes)
+                    replayed += 1
+                journal_path.unlink()
+        except (LockTimeout, FileNotFoundError):
+            continue  # running or already recovered transaction
+        except LockUpgradeError:
+            break
+    return replayed
+
+
+def _apply(rootdir: Path, changes: Dict[Path, Optional[str]]):
+    """PRIVATE - write and delete the files, then sync them in one batch
+    (the events are delivered after the sync)"""
+    folders = set()
+    with EVENTS.batch():
+        for path, data in changes.items():
+            folders.add(path.parent)
+            if data is None:
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    continue
+                EVENTS.emit(FileDeleted(path))
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            created = not path.exists()
+            if not (created and create_file(path, data.encode("utf-8"))):
+                with open_locked(path):
+                    replace_file(path, data.encode("utf-8"))
+            EVENTS.emit(FileWritten(path, created))
+
+        # the events are delivered once the files are durable
+        for path, data in changes.items():
+            if data is not None:
+                _fsync(path, os.O_RDONLY)
+        for folder in folders:
+            _fsync(folder, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+
+
+def _fsync(path: Path, flags: int):
+    """PRIVATE - sync a file or a folder"""
+    try:
+        fd = os.open(path, flags)
+    except OSError:  # folder sync not supported by the platform
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _journal_folder(rootdir: Path) -> Path:
+    """PRIVATE - folder of the journals"""
+    return (Path(rootdir) / FolderStructure.metadata_folder /
+            TransactionSettings.journal_folder)
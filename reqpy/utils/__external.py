@@ -0,0 +1,160 @@
+"""
+# ========================== OUT-OF-CORE TOOLS =========================== #
+"""
+
+# EXPORT
+__all__ = [
+    "externalSort",
+    "groupBy",
+]
+
+# IMPORT
+import heapq
+import itertools
+import os
+import pickle
+import tempfile
+from operator import itemgetter
+from typing import Any, Callable, Iterable, Iterator, Optional
+
+# approximate memory of a buffered item besides its pickled size (bytes)
+_ENTRY_OVERHEAD = 100
+_PROTOCOL = pickle.HIGHEST_PROTOCOL
+
+
+def externalSort(iterable: Iterable[Any],
+                 key: Optional[Callable[[Any], Any]] = None,
+                 reverse: bool = False,
+                 memoryBudget: int = 64 << 20,
+                 tmpDir: Optional[str] = None,
+                 fanIn: int = 64,
+                 bufferSize: int = 1 << 16) -> Iterator[Any]:
+    """like sorted (stable), with a bounded memory use: the items are
+    buffered (pickled) up to the memory budget, then each sorted buffer is
+    spilled to a temporary file and the files are merged lazily
+
+    Args:
+        iterable (Iterable[Any]): items (picklable), consumed lazily
+        key (Callable[[Any], Any] | None, optional): sort key of an item.
+            Defaults to None (the item).
+        reverse (bool, optional): descending order. Defaults to False.
+        memoryBudget (int, optional): approximate memory of the buffered
+            items (bytes). Defaults to 64 MiB.
+        tmpDir (str | None, optional): folder of the spill files.
+            Defaults to None (system temporary folder).
+        fanIn (int, optional): maximum number of files merged at once (more
+            files are merged in several passes). Defaults to 64.
+        bufferSize (int, optional): buffer of each spill file (bytes).
+            Defaults to 64 KiB.
+
+    Returns:
+        Iterator[Any]: the sorted items. The spill files are deleted when
+         the iterator is exhausted or closed.
+    """
+    if fanIn < 2:
+        raise ValueError(f"The fan-in shall be at least 2 (current: {fanIn})")
+    getKey = (lambda item: item) if key is None else key
+    return _externalSort(iterable, getKey, reverse, memoryBudget, tmpDir,
+                         fanIn, bufferSize)
+
+
+def groupBy(iterable: Iterable[Any],
+            key: Callable[[Any], Any],
+            presorted: bool = False,
+            **sortOptions: Any) -> Iterator[tuple[Any, Iterator[Any]]]:
+    """like itertools.groupby, but all the items with the same key are in
+    one group: the items are first sorted by externalSort (with a bounded
+    memory use), unless they are already sorted by key
+
+    Args:
+        iterable (Iterable[Any]): items (picklable), consumed lazily
+        key (Callable[[Any], Any]): group key of an item
+        presorted (bool, optional): the items are already sorted by key.
+            Defaults to False.
+        **sortOptions: options of externalSort (memoryBudget, tmpDir...)
+
+    Returns:
+        Iterator[tuple[Any, Iterator[Any]]]: (key, items of the group) by
+         key order. A group shall be consumed before the next one.
+    """
+    if not presorted:
+        iterable = externalSort(iterable, key=key, **sortOptions)
+    return itertools.groupby(iterable, key)
+
+
+def _externalSort(iterable, key, reverse, memoryBudget, tmpDir, fanIn,
+                  bufferSize) -> Iterator[Any]:
+    """PRIVATE - generator of externalSort"""
+    run: list[tuple[Any, bytes]] = []  # (key, pickled item)
+    size = 0
+    with tempfile.TemporaryDirectory(prefix="reqpy-sort-",
+                                     dir=tmpDir) as folder:
+        runs: list[str] = []
+        for item in iterable:
+            blob = pickle.dumps(item, protocol=_PROTOCOL)
+            run.append((key(item), blob))
+            size += len(blob) + _ENTRY_OVERHEAD
+            if size >= memoryBudget:
+                runs.append(_spill(run, folder, len(runs), reverse,
+                                   bufferSize))
+                run, size = [], 0
+
+        if not runs:  # everything fits in memory
+            run.sort(key=itemgetter(0), reverse=reverse)
+            for _, blob in run:
+                yield pickle.loads(blob)
+            return
+        if run:
+            runs.append(_spill(run, folder, len(runs), reverse, bufferSize))
+        del run
+
+        # merge passes until fanIn files remain (files kept in input order
+        # for the stability)
+        count = len(runs)
+        while len(runs) > fanIn:
+            merged = []
+            for start in range(0, len(runs), fanIn):
+                group = runs[start:start + fanIn]
+                path = os.path.join(folder, f"run_{count}")
+                count += 1
+                with open(path, "wb", buffering=bufferSize) as file:
+                    for runKey, item in _merge(group, reverse, bufferSize):
+                        pickle.dump(runKey, file, protocol=_PROTOCOL)
+                        pickle.dump(item, file, protocol=_PROTOCOL)
+                for runPath in group:
+                    os.remove(runPath)
+                merged.append(path)
+            runs = merged
+
+        for _, item in _merge(runs, reverse, bufferSize):
+            yield item
+
+
+def _spill(run: list, folder: str, index: int, reverse: bool,
+           bufferSize: int) -> str:
+    """PRIVATE - sort a buffer and write it to a spill file"""
+    run.sort(key=itemgetter(0), reverse=reverse)
+    path = os.path.join(folder, f"run_{index}")
+    with open(path, "wb", buffering=bufferSize) as file:
+        for runKey, blob in run:
+            pickle.dump(runKey, file, protocol=_PROTOCOL)
+            file.write(blob)
+    return path
+
+
+def _readRun(path: str, bufferSize: int) -> Iterator[tuple[Any, Any]]:
+    """PRIVATE - (key, item) of a spill file"""
+    with open(path, "rb", buffering=bufferSize) as file:
+        while True:
+            try:
+                runKey = pickle.load(file)
+            except EOFError:
+                return
+            yield runKey, pickle.load(file)
+
+
+def _merge(paths: list[str], reverse: bool,
+           bufferSize: int) -> Iterator[tuple[Any, Any]]:
+    """PRIVATE - stable merge of sorted spill files"""
+    return heapq.merge(*(_readRun(path, bufferSize) for path in paths),
+                       key=itemgetter(0), reverse=reverse)
@@ -4,7 +4,10 @@ All tools used by DragonFly Package
 """
 
 from .__myClass import *
+from .__statcache import *
 from . import exception
 from . import validation
 from . import fileIO
 from .__lorem_ipsum import *
+from .__parallel import *
+from .__external import *
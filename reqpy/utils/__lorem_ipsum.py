@@ -1,11 +1,14 @@
 """ LOREM ISPUM MODULE TO GENERATE RANDOM TEXT"""
 
 import random
+from typing import Iterator, Optional
+import numpy as np
 
 __all__ = [
     'randomParagraph',
     'randomSentence',
-    "randomText"
+    "randomText",
+    "BulkLorem",
 ]
 
 # list of possibles words
@@ -157,3 +160,160 @@ def randomText(*args, **kwargs):
         str: A randomly generated paragraph.
     """
     return TextLorem().text(*args, **kwargs)
+
+
+class BulkLorem():
+    """
+    Seeded Lorem Ipsum generator of requirement titles and details, for
+    large synthetic corpora.
+
+    The word indices and the sentence, paragraph and title lengths are drawn
+    by batches with a NumPy Generator, so that only the joins of the words
+    remain in Python. For a given seed and batch size, the output is
+    reproducible (and the records of a shorter stream are the first
+    records of a longer one).
+
+    Attributes:
+        batch_size (int): number of records drawn at once.
+    """
+
+    def __init__(self,
+                 seed: Optional[int] = None,
+                 srange=(4, 8),
+                 prange=(5, 10),
+                 trange=(3, 6),
+                 title_range=(2, 6),
+                 title_length=(8, 60),
+                 max_detail_length: int = 2000,
+                 batch_size: int = 10_000):
+        """
+        Initialize the generator.
+
+        Args:
+            seed (int | None): seed of the NumPy Generator. Default is None
+                (not reproducible).
+            srange (tuple): range of the sentence lengths (words).
+            prange (tuple): range of the paragraph lengths (sentences).
+            trange (tuple): range of the detail lengths (paragraphs).
+            title_range (tuple): range of the title lengths (words).
+            title_length (tuple): (min, max) number of characters of a
+                title (see RequirementSettings).
+            max_detail_length (int): maximum number of characters of a
+                detail, cut after the last complete sentence (see
+                RequirementSettings).
+            batch_size (int): number of records drawn at once.
+        """
+        self._rng = np.random.default_rng(seed)
+        self._srange = srange
+        self._prange = prange
+        self._trange = trange
+        self._title_range = title_range
+        self._title_length = title_length
+        self._max_detail_length = max_detail_length
+        self.batch_size = batch_size
+        self._words = np.array(DATA, dtype=object)
+        self._capitalized = np.array(
+            [word[0].upper() + word[1:] for word in DATA], dtype=object)
+        # titles: no punctuation and lower case (see Requirement validators)
+        self._title_words = np.array(
+            sorted({word.replace(",", "").lower() for word in DATA}),
+            dtype=object)
+
+    def _lengths(self, bounds, number: int) -> np.ndarray:
+        """PRIVATE - draw lengths in an inclusive range"""
+        return self._rng.integers(bounds[0], bounds[1] + 1, number)
+
+    @staticmethod
+    def _join(separator: str, items: list, lengths: np.ndarray) -> list:
+        """PRIVATE - join consecutive groups of strings"""
+        ends = np.cumsum(lengths).tolist()
+        starts = [0] + ends[:-1]
+        return [separator.join(items[start:end])
+                for start, end in zip(starts, ends)]
+
+    def titles(self, number: int, start: Optional[int] = None) -> list[str]:
+        """
+        Generate titles passing the Requirement title validators.
+
+        Args:
+            number (int): number of titles.
+            start (int | None): if given, the titles end with a unique
+                number (start, start + 1, ...). Default is None.
+
+        Returns:
+            list[str]: the titles.
+        """
+        lengths = self._lengths(self._title_range, number)
+        indices = self._rng.integers(0, len(self._title_words),
+                                     int(lengths.sum()))
+        words = self._title_words[indices].tolist()
+        min_length, max_length = self._title_length
+
+        titles = []
+        for rank, title in enumerate(self._join(" ", words, lengths)):
+            suffix = "" if start is None else f" {start + rank}"
+            if len(title) + len(suffix) > max_length:
+                title = title[:max_length - len(suffix) + 1].rsplit(" ", 1)[0]
+            title = (title + suffix).capitalize()
+            while len(title) < min_length:
+                title += " " + self._title_words[
+                    self._rng.integers(len(self._title_words))]
+            titles.append(title[:max_length].rstrip())
+        return titles
+
+    def details(self, number: int) -> list[str]:
+        """
+        Generate details below the maximum detail length.
+
+        Args:
+            number (int): number of details.
+
+        Returns:
+            list[str]: the details (paragraphs of sentences).
+        """
+        paragraphs = self._lengths(self._trange, number)
+        sentences = self._lengths(self._prange, int(paragraphs.sum()))
+        words = self._lengths(self._srange, int(sentences.sum()))
+        indices = self._rng.integers(0, len(self._words), int(words.sum()))
+
+        # the first word of each sentence is capitalized
+        firsts = np.zeros(len(indices), dtype=bool)
+        firsts[np.cumsum(words) - words] = True
+        texts = np.where(firsts, self._capitalized[indices],
+                         self._words[indices]).tolist()
+
+        sentence_list = [
+            sentence.rstrip(",") + "."
+            for sentence in self._join(WORD_SEPARATOR, texts, words)]
+        paragraph_list = self._join(SENTENCE_SEPARATOR, sentence_list,
+                                    sentences)
+        details = []
+        for detail in self._join(PARAGRAPH_SEPARATOR, paragraph_list,
+                                 paragraphs):
+            if len(detail) > self._max_detail_length:
+                end = detail.rfind(".", 0, self._max_detail_length)
+                detail = detail[:end + 1]
+            details.append(detail)
+        return details
+
+    def records(self,
+                number: int,
+                unique_titles: bool = True) -> Iterator[tuple[str, str]]:
+        """
+        Stream (title, detail) records, drawn by batches.
+
+        Args:
+            number (int): number of records.
+            unique_titles (bool): If True, the titles end with the rank of
+                the record so that they are unique. Default is True.
+
+        Yields:
+            tuple[str, str]: the title and the detail of a record.
+        """
+        for start in range(0, number, self.batch_size):
+            # full batches: the first records do not depend on the number
+            titles = self.titles(self.batch_size,
+                                 start if unique_titles else None)
+            details = self.details(self.batch_size)
+            size = min(self.batch_size, number - start)
+            yield from zip(titles[:size], details[:size])
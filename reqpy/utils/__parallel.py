@@ -0,0 +1,38 @@
+"""
+# ============================ PARALLEL TOOLS ============================ #
+"""
+
+# EXPORT
+__all__ = [
+    "boundedMap",
+]
+
+# IMPORT
+from collections import deque
+from concurrent.futures import Executor
+from typing import Any, Callable, Iterable, Iterator
+
+
+def boundedMap(executor: Executor,
+               function: Callable[[Any], Any],
+               iterable: Iterable[Any],
+               window: int) -> Iterator[Any]:
+    """like executor.map, but the iterable is consumed lazily and at most
+    window tasks are in flight, so that the memory use is bounded
+
+    Args:
+        executor (Executor): executor running the tasks
+        function (Callable[[Any], Any]): function applied to each item
+        iterable (Iterable[Any]): items (consumed lazily)
+        window (int): maximum number of submitted and not consumed tasks
+
+    Returns:
+        Iterator[Any]: results, in the order of the items
+    """
+    futures: deque = deque()
+    for item in iterable:
+        futures.append(executor.submit(function, item))
+        if len(futures) >= window:
+            yield futures.popleft().result()
+    while futures:
+        yield futures.popleft().result()
@@ -0,0 +1,131 @@
+"""
+# ============================== STAT CACHE ============================== #
+"""
+
+# EXPORT
+__all__ = [
+    "StatCache",
+    "statCacheScope",
+    "cachedStat",
+    "invalidateStat",
+]
+
+# IMPORT
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, Optional
+
+
+class StatCache():
+    """memory of the os.stat results of paths (None for the missing
+    paths), optionally expiring after a time to live"""
+
+    def __init__(self, ttl: Optional[float] = None):
+        """create an empty cache
+
+        Args:
+            ttl (float | None, optional): seconds before an entry is
+             refreshed. Defaults to None (never).
+        """
+        self.ttl = ttl
+        self._entries: dict[str, tuple[float, Optional[os.stat_result]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stat(self, path: str | os.PathLike[str]) -> Optional[os.stat_result]:
+        """get the stat of a path (follows the symbolic links)
+
+        Args:
+            path (str | os.PathLike): path (relative or absolute)
+
+        Returns:
+            os.stat_result | None: the stat, None if the path does not exist
+        """
+        key = os.fspath(path)
+        entry = self._entries.get(key)
+        now = time.monotonic()
+        if entry is not None and (self.ttl is None or
+                                  now - entry[0] <= self.ttl):
+            return entry[1]
+        try:
+            result: Optional[os.stat_result] = os.stat(key)
+        except (FileNotFoundError, NotADirectoryError):
+            result = None
+        self._entries[key] = (now, result)
+        return result
+
+    def invalidate(self, path: Optional[str | os.PathLike[str]] = None):
+        """forget the stat of a path, or of all the paths
+
+        Args:
+            path (str | os.PathLike | None, optional): the path.
+             Defaults to None (all the paths).
+        """
+        if path is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(os.fspath(path), None)
+
+
+# cache of the current scope (None: no cache)
+_ACTIVE_CACHE: ContextVar[Optional[StatCache]] = ContextVar(
+    "reqpy_stat_cache", default=None)
+
+
+@contextmanager
+def statCacheScope(ttl: Optional[float] = None) -> Iterator[StatCache]:
+    """cache the stat of the paths checked by cachedStat (e.g. the path
+    validation tools and ReqFolder) in the with block. In a nested scope,
+    the cache of the enclosing scope is reused
+
+    Args:
+        ttl (float | None, optional): seconds before an entry is refreshed.
+         Defaults to None (never).
+
+    Yields:
+        StatCache: the cache of the scope
+    """
+    cache = _ACTIVE_CACHE.get()
+    if cache is not None:
+        yield cache
+        return
+    token = _ACTIVE_CACHE.set(StatCache(ttl))
+    try:
+        yield _ACTIVE_CACHE.get()
+    finally:
+        _ACTIVE_CACHE.reset(token)
+
+
+def cachedStat(path: str | os.PathLike[str]) -> Optional[os.stat_result]:
+    """get the stat of a path from the cache of the current scope (see
+    statCacheScope), or from the file system out of a scope
+
+    Args:
+        path (str | os.PathLike): path (relative or absolute)
+
+    Returns:
+        os.stat_result | None: the stat, None if the path does not exist
+    """
+    cache = _ACTIVE_CACHE.get()
+    if cache is not None:
+        return cache.stat(path)
+    try:
+        return os.stat(path)
+    except (FileNotFoundError, NotADirectoryError):
+        return None
+
+
+def invalidateStat(path: Optional[str | os.PathLike[str]] = None):
+    """forget the stat of a path (or all the paths) in the cache of the
+    current scope, after the path was modified. No effect out of a scope
+
+    Args:
+        path (str | os.PathLike | None, optional): the path.
+         Defaults to None (all the paths).
+    """
+    cache = _ACTIVE_CACHE.get()
+    if cache is not None:
+        cache.invalidate(path)
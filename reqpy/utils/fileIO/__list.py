@@ -4,12 +4,15 @@
 
 # EXPORT
 __all__ = [
-    "listdirectory"
+    "listdirectory",
+    "iterdirectory",
 ]
 
 # IMPORT
 import os
 import pathlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
 from .. import validation
 
 
@@ -61,3 +64,87 @@ def listdirectory(dirpath: str, *,
                     result.add(rel_file)
 
     return list(result)
+
+
+def iterdirectory(dirpath: str | os.PathLike[str], *,
+                  extensions: str | tuple[str] = (""),
+                  excluded_folders: str | tuple[str] = (""),
+                  workers: int = 1) -> Iterator[str]:
+    """iterate over the files in a directory and subdirectories, with
+    possibility to select extensions and exclude some folders.
+
+    The excluded folders are pruned before being scanned and the files
+    are yielded in a deterministic order (sorted names, the files of a
+    folder before its subfolders), whatever the number of workers.
+
+    Args:
+        dirpath (str | os.PathLike): path of the directory to assess
+         (absolute or relative)
+        extensions (str | tuple[str], optional): tuple of the
+         selected extension.
+            Defaults all with ("").
+        excluded_folders (str | tuple[str], optional): names of the
+         folders to exclude (exact match of the folder name, at any level).
+            Defaults none with ("").
+        workers (int, optional): number of threads walking the top-level
+         subfolders in parallel. Defaults to 1 (no thread).
+
+    Yields:
+        str: path of the file relative to dirpath
+    """
+    if not extensions:
+        extension_set = None
+    else:
+        extension_set = frozenset(
+            validation.validateExtensionDefinition(extensions))
+    if isinstance(excluded_folders, str):
+        excluded_folders = (excluded_folders,)
+    excluded_set = frozenset(name for name in excluded_folders if name)
+
+    files, folders = _scanFolder(dirpath, "", extension_set, excluded_set)
+    yield from files
+    if workers > 1 and len(folders) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            for subtree in executor.map(
+                    lambda folder: list(_walkFolder(
+                        dirpath, folder, extension_set, excluded_set)),
+                    folders):
+                yield from subtree
+    else:
+        for folder in folders:
+            yield from _walkFolder(dirpath, folder,
+                                   extension_set, excluded_set)
+
+
+def _walkFolder(dirpath: str | os.PathLike[str],
+                relpath: str,
+                extension_set: frozenset | None,
+                excluded_set: frozenset) -> Iterator[str]:
+    """PRIVATE - depth first walk of a folder (relative path)"""
+    stack = [relpath]
+    while stack:
+        files, folders = _scanFolder(dirpath, stack.pop(),
+                                     extension_set, excluded_set)
+        yield from files
+        stack.extend(reversed(folders))
+
+
+def _scanFolder(dirpath: str | os.PathLike[str],
+                relpath: str,
+                extension_set: frozenset | None,
+                excluded_set: frozenset) -> tuple[list[str], list[str]]:
+    """PRIVATE - sorted selected files and not excluded subfolders of a
+    folder (paths relative to dirpath)"""
+    files = []
+    folders = []
+    with os.scandir(os.path.join(dirpath, relpath)) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name not in excluded_set:
+                    folders.append(os.path.join(relpath, entry.name))
+            elif (extension_set is None or
+                  os.path.splitext(entry.name)[1] in extension_set):
+                files.append(os.path.join(relpath, entry.name))
+    files.sort()
+    folders.sort()
+    return files, folders
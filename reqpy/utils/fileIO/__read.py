@@ -5,11 +5,19 @@
 # EXPORT
 __all__ = [
     "readASCIIFile",
+    "readBytesFile",
+    "mapFile",
+    "readMany",
 ]
 
 # IMPORT PACKAGES
 import pathlib
 import os
+import mmap
+from concurrent.futures import (FIRST_COMPLETED, Future, ThreadPoolExecutor,
+                                wait)
+from contextlib import contextmanager
+from typing import Iterable, Iterator, Optional
 
 
 def readASCIIFile(filePath: str | os.PathLike[str]) -> str:
@@ -22,3 +30,99 @@ def readASCIIFile(filePath: str | os.PathLike[str]) -> str:
         str: contents of the file
     """
     return pathlib.Path(filePath).read_text()
+
+
+def readBytesFile(filePath: str | os.PathLike[str],
+                  size: Optional[int] = None) -> bytes:
+    """read an existing file without decoding it, e.g. for a parser
+    accepting bytes
+
+    Args:
+        filePath (str | os.PathLike): file path (absolute or relative)
+        size (int | None, optional): maximum number of bytes read from the
+         beginning of the file. Defaults to None (whole file).
+
+    Returns:
+        bytes: contents (or prefix) of the file
+    """
+    with open(filePath, "rb") as file:
+        return file.read() if size is None else file.read(size)
+
+
+@contextmanager
+def mapFile(filePath: str | os.PathLike[str]) -> Iterator[memoryview]:
+    """map an existing file in memory (read only): the pages are loaded
+    only when they are accessed and the contents are not copied
+
+    Args:
+        filePath (str | os.PathLike): file path (absolute or relative)
+
+    Yields:
+        memoryview: contents of the file (only valid in the with block)
+    """
+    with open(filePath, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:  # can't map an empty file
+            yield memoryview(b"")
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapping:
+            view = memoryview(mapping)
+            try:
+                yield view
+            finally:
+                view.release()
+
+
+def readMany(paths: Iterable[str | os.PathLike[str]],
+             workers: int = 8,
+             *,
+             encoding: Optional[str] = None,
+             returnExceptions: bool = False
+             ) -> Iterator[tuple[pathlib.Path, bytes | str | Exception]]:
+    """read files on a thread pool (the I/O releases the GIL) and yield
+    the contents as soon as they are read. The paths are consumed lazily
+    and at most 2 x workers files are in flight
+
+    Args:
+        paths (Iterable[str | os.PathLike]): paths of the files
+        workers (int, optional): number of threads. Defaults to 8.
+        encoding (str | None, optional): if given, the contents are decoded
+         (strict: an invalid file raises UnicodeDecodeError).
+         Defaults to None (bytes).
+        returnExceptions (bool, optional): if True, the errors (OSError,
+         UnicodeDecodeError) are yielded in place of the contents instead
+         of being raised. Defaults to False.
+
+    Yields:
+        tuple[Path, bytes | str | Exception]: path and contents of the
+         files, in completion order
+    """
+    def read(path: pathlib.Path) -> bytes | str:
+        data = readBytesFile(path)
+        return data if encoding is None else data.decode(encoding)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        pending: dict[Future, pathlib.Path] = {}
+        paths = iter(paths)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < 2 * max(1, workers):
+                try:
+                    path = pathlib.Path(next(paths))
+                except StopIteration:
+                    exhausted = True
+                    break
+                pending[executor.submit(read, path)] = path
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                path = pending.pop(future)
+                try:
+                    result = future.result()
+                except (OSError, UnicodeDecodeError) as error:
+                    if not returnExceptions:
+                        for other in pending:
+                            other.cancel()
+                        raise
+                    result = error
+                yield path, result
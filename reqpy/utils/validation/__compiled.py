@@ -0,0 +1,152 @@
+"""
+######################## COMPILED DATA VALIDATION #######################
+"""
+
+# EXPORT
+__all__ = [
+    "compileInstanceValidator",
+    "compileExtensionValidator",
+    "checkArguments",
+]
+
+# IMPORT
+import functools
+import inspect
+import os
+import typing
+from reqpy.utils.exception import createErrorMessage
+from .__datatype import validateTupleInstances
+from .__paths import InvalidFileExtension, validateExtensionDefinition
+
+# the checkArguments decorator returns the function unchanged if False
+# (default: disabled in optimized runs, python -O). To change before the
+# decorated modules are imported.
+ARGUMENT_CHECKS = __debug__
+
+Validator = typing.Callable[[typing.Any], typing.Any]
+
+
+def compileInstanceValidator(
+    instances: type | tuple[type],
+    inheritance: bool = False
+) -> Validator:
+    """create a checker with the behaviour of validateInstance, with the
+    types validated once at creation instead of at each call
+
+    Args:
+        instances (type | Tuple[type]): expected types
+        inheritance (bool, optional): inheritance activated
+            Defaults to False.
+
+    Returns:
+        Callable[[Any], Any]: function returning its argument if it has
+         the expected type, else raising TypeError
+    """
+    listTypes = validateTupleInstances(data=instances, instance=type)
+
+    def fail(data):
+        msg = createErrorMessage(
+            errorMsg=("The input shall respected the"
+                      f" expected types (inheritance: {inheritance})"),
+            expected=str(instances),
+            current=f"{data} ({type(data)})",
+        )
+        raise TypeError(msg)
+
+    if inheritance:
+        def validator(data):
+            if isinstance(data, listTypes):
+                return data
+            fail(data)
+    else:
+        setTypes = frozenset(listTypes)
+
+        def validator(data):
+            if type(data) in setTypes:
+                return data
+            fail(data)
+    return validator
+
+
+def compileExtensionValidator(validExtensions: str | tuple[str]) -> Validator:
+    """create a checker with the behaviour of validateFileExtension, with
+    the extensions validated once at creation instead of at each call
+
+    Args:
+        validExtensions (str | tuple[str]): list of valid extensions
+                                            (shall start with ".")
+
+    Returns:
+        Callable[[str], str]: function returning the file path if the
+         extension is correct, else raising InvalidFileExtension
+    """
+    tupleExtension = validateExtensionDefinition(validExtensions)
+    setExtension = frozenset(tupleExtension)
+    checkPath = compileInstanceValidator(str)
+
+    def validator(filepath):
+        # same result as pathlib suffix, without building a Path object
+        name = os.path.basename(checkPath(filepath))
+        dot = name.rfind(".")
+        file_extension = name[dot:] if 0 < dot < len(name) - 1 else ""
+        if file_extension in setExtension:
+            return filepath
+        msg = createErrorMessage(
+            errorMsg=(f"The file [{filepath}] has not the "
+                      "appropriate extension"),
+            expected=str(tupleExtension),
+            current=file_extension,
+        )
+        raise InvalidFileExtension(msg)
+    return validator
+
+
+def checkArguments(**specs: type | tuple[type] | Validator):
+    """decorator checking the arguments of a function at each call
+
+    The specs are compiled once, when the function is decorated. If
+    ARGUMENT_CHECKS is False at this moment (optimized run), the function
+    is returned unchanged, without any overhead.
+
+    Args:
+        **specs: per argument name, the expected types (see
+         compileInstanceValidator, without inheritance) or a checker
+         (e.g. compileExtensionValidator)
+
+    Returns:
+        Callable: the decorator
+
+    Example:
+        @checkArguments(filepath=compileExtensionValidator(".yml"),
+                        size=int)
+        def read(filepath, size): ...
+    """
+    def decorator(function):
+        if not ARGUMENT_CHECKS:
+            return function
+
+        parameters = list(inspect.signature(function).parameters)
+        unknown = set(specs) - set(parameters)
+        if unknown:
+            raise TypeError(
+                f"The arguments {sorted(unknown)} are not parameters of " +
+                f"{function.__qualname__}"
+            )
+        # (name, position, checker)
+        checks = [
+            (name, parameters.index(name),
+             spec if callable(spec) and not isinstance(spec, type)
+             else compileInstanceValidator(spec))
+            for name, spec in specs.items()
+        ]
+
+        @functools.wraps(function)
+        def wrapper(*args, **kwargs):
+            for name, position, checker in checks:
+                if position < len(args):
+                    checker(args[position])
+                elif name in kwargs:
+                    checker(kwargs[name])
+            return function(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -7,4 +7,5 @@ from .__linalg import *
 from .__datatype import *
 from .__paths import *
 from .__string import *
+from .__compiled import *
 
@@ -8,12 +8,15 @@
 __all__ = [
     "input_check_3x1",
     "input_check_3x3",
+    "StackCheck",
+    "input_check_Nx3x1",
+    "input_check_Nx3x3",
 ]
 
 # IMPORT
 import numpy as np
 import reqpy
-from typing import Any
+from typing import Any, NamedTuple
 
 
 def input_check_3x1(x_in: Any) -> np.ndarray:
@@ -67,3 +70,106 @@ def input_check_3x3(x_in: Any) -> np.ndarray:
         current=f"Values: {x_in} - Type: {type(x_in)}"
     )
     raise ValueError(msg)
+
+
+# ########################### STACKED CHECKERS ########################## #
+
+
+class StackCheck(NamedTuple):
+    array: np.ndarray  # the stacked data (view of the input if possible)
+    invalid: np.ndarray  # indices of the entries with non real values
+
+
+def input_check_Nx3x1(x_in: Any) -> StackCheck:
+    """Check if a data is a stack of N [3x1] vectors: (N, 3) or (N, 3, 1)
+    array (or nested lists). The shape and dtype are checked once for the
+    whole stack and the entries with a non finite (or non numeric) value
+    are reported instead of raising an error
+
+    Args:
+        x_in (Any): data to assess
+
+    Raises:
+        ValueError: exception raised if the data can not be a stack of
+         [3x1] vectors
+
+    Returns:
+        StackCheck: the data as a (N, 3, 1) numpy array (a view for a
+         numeric array input) and the indices of the invalid vectors
+    """
+    return _check_stack(x_in, ((3,), (3, 1)), (3, 1), "[Nx3x1]")
+
+
+def input_check_Nx3x3(x_in: Any) -> StackCheck:
+    """Check if a data is a stack of N [3x3] matrices: (N, 3, 3) array (or
+    nested lists). The shape and dtype are checked once for the whole stack
+    and the entries with a non finite (or non numeric) value are reported
+    instead of raising an error
+
+    Args:
+        x_in (Any): data to assess
+
+    Raises:
+        ValueError: exception raised if the data can not be a stack of
+         [3x3] matrices
+
+    Returns:
+        StackCheck: the data as a (N, 3, 3) numpy array (the input itself
+         for a numeric array) and the indices of the invalid matrices
+    """
+    return _check_stack(x_in, ((3, 3),), (3, 3), "[Nx3x3]")
+
+
+def _check_stack(x_in: Any,
+                 entry_shapes: tuple[tuple[int, ...], ...],
+                 target_shape: tuple[int, ...],
+                 name: str) -> StackCheck:
+    """PRIVATE - check the shape and the values of a stack of arrays"""
+    array = x_in if isinstance(x_in, np.ndarray) else _as_array(x_in)
+
+    if array.ndim == 0 or tuple(array.shape[1:]) not in entry_shapes:
+        msg = reqpy.utils.exception.createErrorMessage(
+            errorMsg=f"The input shall be mutable to a {name} numpy array",
+            expected=f"{name} Numpy Array",
+            current=f"Shape: {array.shape} - Type: {type(x_in)}",
+        )
+        raise ValueError(msg)
+    array = array.reshape((array.shape[0],) + target_shape)  # view
+
+    axes = tuple(range(1, array.ndim))
+    if array.dtype == object:
+        valid = np.vectorize(_is_real, otypes=[bool])(array).all(axis=axes)
+        if valid.all():
+            array = array.astype(float)
+        return StackCheck(array, np.flatnonzero(~valid))
+    if not (np.issubdtype(array.dtype, np.integer) or
+            np.issubdtype(array.dtype, np.floating)):
+        msg = reqpy.utils.exception.createErrorMessage(
+            errorMsg=f"The {name} stack shall contain real numbers",
+            expected="integer or floating dtype",
+            current=f"dtype: {array.dtype}",
+        )
+        raise ValueError(msg)
+    if np.issubdtype(array.dtype, np.integer):
+        return StackCheck(array, np.empty(0, dtype=np.intp))
+    return StackCheck(
+        array, np.flatnonzero(~np.isfinite(array).all(axis=axes)))
+
+
+def _as_array(x_in: Any) -> np.ndarray:
+    """PRIVATE - convert nested lists in one call (object array if the
+    lists are ragged or contain non numeric values)"""
+    try:
+        array = np.asarray(x_in)
+    except ValueError:  # ragged nested lists
+        return np.asarray(x_in, dtype=object)
+    if array.dtype.kind in "US":  # strings mixed with numbers
+        return np.asarray(x_in, dtype=object)
+    return array
+
+
+def _is_real(value: Any) -> bool:
+    """PRIVATE - check if a value is a finite real number"""
+    return (isinstance(value, (int, float, np.integer, np.floating)) and
+            not isinstance(value, (bool, np.bool_)) and
+            bool(np.isfinite(value)))
@@ -8,12 +8,16 @@ __all__ = [
     "validateFileExtension",
     "isValidExtension",
     "validateFolder",
-    "validateExtensionDefinition"
+    "validateExtensionDefinition",
+    "validateFiles",
+    "validateFolders",
 ]
 
 # IMPORT
 import os
 import pathlib
+import stat
+from reqpy.utils.__statcache import cachedStat, statCacheScope
 from reqpy.utils.validation import validateInstance, validateTupleInstances
 from reqpy.utils.exception import createErrorMessage
 
@@ -37,9 +41,9 @@ def validateFile(filepath: str) -> str:
     # chech arguments:
     filepath = validateInstance(filepath, str)
 
-    # Analysis
+    # Analysis (see statCacheScope)
     try:
-        if os.path.isfile(filepath):
+        if _isMode(filepath, stat.S_ISREG):
             return os.path.abspath(filepath)
     except Exception as e:
         msg = f"impossible to assess the arg1 [{filepath}]"
@@ -159,9 +163,9 @@ def validateFolder(folderpath: str) -> str:
     # chech arguments:
     folderpath = validateInstance(folderpath, str)
 
-    # Analysis
+    # Analysis (see statCacheScope)
     try:
-        if os.path.isdir(folderpath):
+        if _isMode(folderpath, stat.S_ISDIR):
             return os.path.abspath(folderpath)
     except Exception as e:
         msg = f"impossible to assess the arg1 [{folderpath}]"
@@ -174,3 +178,51 @@ def validateFolder(folderpath: str) -> str:
         f"Not a folder [{folderpath}]"
     )
     raise ValueError(msg)
+
+
+def validateFiles(filepaths: list[str]) -> list[str]:
+    """check if the files exist and provide the absolute paths. The stats
+    are shared with the enclosing statCacheScope, if any
+
+    Args:
+        filepaths (list[str]): file paths to asses (relative or absolute)
+
+    Returns:
+        list[str]: absolute paths, in the same order
+    """
+    return _validatePaths(filepaths, stat.S_ISREG, "file")
+
+
+def validateFolders(folderpaths: list[str]) -> list[str]:
+    """check if the folders exist and provide the absolute paths. The stats
+    are shared with the enclosing statCacheScope, if any
+
+    Args:
+        folderpaths (list[str]): folder paths to asses (relative or absolute)
+
+    Returns:
+        list[str]: absolute paths of the existing folders, in the same order
+    """
+    return _validatePaths(folderpaths, stat.S_ISDIR, "folder")
+
+
+def _isMode(path: str, isMode) -> bool:
+    """PRIVATE - check the type of a path (False if missing)"""
+    result = cachedStat(path)
+    return result is not None and isMode(result.st_mode)
+
+
+def _validatePaths(paths: list[str], isMode, kind: str) -> list[str]:
+    """PRIVATE - validate a batch of paths and report all the invalid ones
+    in a single error"""
+    paths = [validateInstance(path, str) for path in paths]
+    with statCacheScope():
+        invalid = [path for path in paths if not _isMode(path, isMode)]
+    if invalid:
+        msg = createErrorMessage(
+            errorMsg=f"{len(invalid)} paths are not existing {kind}s",
+            expected=f"Existing {kind}s",
+            current=f"Not a {kind} {invalid}"
+        )
+        raise ValueError(msg)
+    return [os.path.abspath(path) for path in paths]
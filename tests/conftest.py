@@ -0,0 +1,13 @@
+import pytest
+from reqpy.database import ReqFolder
+
+
+@pytest.fixture
+def req_folder(tmp_path):
+    """empty database in tmp_path / "db" (the other files of a test can be
+    written in tmp_path). The test modules override it to write their
+    requirements."""
+    (tmp_path / "db").mkdir()
+    req_folder = ReqFolder(rootdir=tmp_path / "db")
+    req_folder.create_dirs()
+    return req_folder
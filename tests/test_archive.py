@@ -0,0 +1,128 @@
+import tarfile
+import zipfile
+from datetime import datetime
+from pathlib import PurePosixPath
+import pytest
+from reqpy import Requirement, ReqFile
+from reqpy.archive import (ArchiveError, ArchiveReader, TarArchiveReader,
+                           ZipArchiveReader, open_archive)
+
+REQUIREMENTS = {
+    f"requirements/{folder}Title_{i}.yml": Requirement(
+        title=f"Title number {i}", detail=f"Line {i}\nsecond line",
+        creation_date=datetime(2026, 1, i + 1))
+    for i, folder in enumerate(["", "", "lins/", "info/", ""])
+}
+
+
+@pytest.fixture
+def database(req_folder):
+    for name, requirement in REQUIREMENTS.items():
+        ReqFile(path=req_folder.rootdir / name).write(requirement)
+    (req_folder.rootdir / "requirements/Broken.yml").write_text("title: [")
+    (req_folder.rootdir / "requirements/notes.txt").write_text("notes")
+    (req_folder.rootdir / "README.md").write_text("baseline")
+    return req_folder.rootdir
+
+
+def _zip(database, path, prefix=""):
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+        for file in sorted(database.rglob("*")):
+            archive.write(file, prefix + file.relative_to(database).as_posix())
+    return path
+
+
+def _tar(database, path, mode, prefix="."):
+    with tarfile.open(path, mode) as archive:
+        archive.add(database, arcname=prefix)
+    return path
+
+
+@pytest.fixture(params=["zip", "tar", "tar.gz", "tar.xz"])
+def archive_path(request, database, tmp_path):
+    path = tmp_path / f"baseline.{request.param}"
+    if request.param == "zip":
+        return _zip(database, path)
+    return _tar(database, path, "w:" + request.param[4:])
+
+
+def test_open_archive(archive_path):
+    with open_archive(archive_path) as archive:
+        assert isinstance(archive, ZipArchiveReader if
+                          archive_path.suffix == ".zip" else
+                          TarArchiveReader)
+        assert archive.root == PurePosixPath("")
+        assert "README.md" in archive
+        assert len(archive.get_list_of_files()) == 7
+        assert sorted(map(str, archive.get_list_of_requirement_files())) == \
+            sorted(list(REQUIREMENTS) + ["requirements/Broken.yml"])
+
+        assert archive.read("requirements/lins/Title_2.yml") == \
+            REQUIREMENTS["requirements/lins/Title_2.yml"]
+        assert archive.read_bytes("requirements/notes.txt") == b"notes"
+        with pytest.raises(KeyError):
+            archive.read("requirements/Unknown.yml")
+
+
+def test_iter_requirements(archive_path):
+    errors = []
+    with open_archive(archive_path) as archive:
+        requirements = dict(archive.iter_requirements(
+            on_error=lambda file, error: errors.append(file)))
+        assert {str(file): requirement
+                for file, requirement in requirements.items()} == \
+            REQUIREMENTS
+        assert errors == [PurePosixPath("requirements/Broken.yml")]
+
+        # random order (backward reads of the compressed archives)
+        names = list(reversed(REQUIREMENTS))
+        assert [requirement for _, requirement in
+                archive.iter_requirements(names)] == \
+            [REQUIREMENTS[name] for name in names]
+
+
+def test_corrupted_member(database, tmp_path):
+    path = tmp_path / "baseline.zip"
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_STORED) as archive:
+        for name in REQUIREMENTS:
+            archive.write(database / name, name)
+    # same size, wrong CRC
+    path.write_bytes(path.read_bytes().replace(b"Title number 1",
+                                               b"Title number X"))
+    errors = []
+
+    with open_archive(path) as archive:
+        requirements = dict(archive.iter_requirements(
+            on_error=lambda file, error: errors.append((file, error))))
+
+    assert len(requirements) == len(REQUIREMENTS) - 1
+    assert [(str(file), type(error)) for file, error in errors] == \
+        [("requirements/Title_1.yml", zipfile.BadZipFile)]
+
+
+def test_top_level_folder(database, tmp_path):
+    for path in (_zip(database, tmp_path / "b.zip", "baseline-1.0/"),
+                 _tar(database, tmp_path / "b.tgz", "w:gz", "baseline-1.0")):
+        with open_archive(path) as archive:
+            assert archive.root == PurePosixPath("baseline-1.0")
+            files = archive.get_list_of_requirement_files()
+            assert len(files) == 6
+            assert archive.read(
+                "baseline-1.0/requirements/Title_0.yml") == \
+                REQUIREMENTS["requirements/Title_0.yml"]
+
+
+def test_not_an_archive(tmp_path):
+    path = tmp_path / "file.zip"
+    path.write_text("not an archive")
+    with pytest.raises(ArchiveError):
+        open_archive(path)
+
+
+def test_incomplete_reader(tmp_path):
+    class IncompleteReader(ArchiveReader):
+        def _read_index(self):
+            return {}
+
+    with pytest.raises(TypeError):
+        IncompleteReader(tmp_path / "baseline.zip")
@@ -0,0 +1,104 @@
+import pytest
+import yaml
+from datetime import datetime
+from reqpy import Requirement, ReqFile
+from reqpy.bundle import BundleError, BundleReader, BundleWriter
+from reqpy.database import ReqFolder, DataBaseError
+
+REQUIREMENTS = {
+    f"requirements/Title_{i}.yml": Requirement(
+        title=f"Title number {i}", detail=f"Line {i}\nsecond line",
+        creation_date=datetime(2026, 1, i + 1))
+    for i in range(5)
+}
+
+
+@pytest.fixture
+def bundle_path(tmp_path):
+    path = tmp_path / "bundle.yml"
+    with BundleWriter(path) as bundle:
+        for name, requirement in REQUIREMENTS.items():
+            bundle.add(name, requirement)
+    return path
+
+
+def test_random_access(bundle_path):
+    with BundleReader(bundle_path) as bundle:
+        assert len(bundle) == 5
+        assert bundle.names() == list(REQUIREMENTS)
+        assert "requirements/Title_3.yml" in bundle
+        assert bundle.read("requirements/Title_3.yml") == \
+            REQUIREMENTS["requirements/Title_3.yml"]
+        with pytest.raises(KeyError):
+            bundle.read("unknown")
+
+
+def test_sequential_streaming(bundle_path):
+    with BundleReader(bundle_path) as bundle:
+        assert list(bundle) == list(REQUIREMENTS.values())
+
+    # the bundle is a standard YAML stream
+    with open(bundle_path) as file:
+        assert len(list(yaml.safe_load_all(file))) == 5
+
+
+def test_duplicated_name(tmp_path):
+    with BundleWriter(tmp_path / "bundle.yml") as bundle:
+        bundle.add("name", Requirement())
+        with pytest.raises(BundleError):
+            bundle.add("name", Requirement())
+
+
+def test_failed_bundle_is_discarded(bundle_path):
+    with pytest.raises(RuntimeError):
+        with BundleWriter(bundle_path) as bundle:
+            bundle.add("name", Requirement())
+            raise RuntimeError("interrupted")
+
+    assert sorted(p.name for p in bundle_path.parent.iterdir()) == \
+        ["bundle.yml"]
+    with BundleReader(bundle_path) as bundle:
+        assert bundle.names() == list(REQUIREMENTS)
+
+
+def test_invalid_bundle(tmp_path):
+    path = tmp_path / "bundle.yml"
+    path.write_text("title: not a bundle\n")
+    with pytest.raises(BundleError):
+        BundleReader(path)
+
+    path.write_text("")
+    with pytest.raises(BundleError):
+        BundleReader(path)
+
+
+def test_empty_bundle(tmp_path):
+    path = tmp_path / "bundle.yml"
+    BundleWriter(path).close()
+
+    with BundleReader(path) as bundle:
+        assert len(bundle) == 0
+        assert list(bundle) == []
+
+
+def test_reqfolder_bundle(tmp_path):
+    (tmp_path / "source").mkdir()
+    source = ReqFolder(rootdir=tmp_path / "source")
+    source.create_dirs()
+    for name, requirement in REQUIREMENTS.items():
+        ReqFile(path=source.rootdir / name).write(requirement)
+
+    bundle_path = source.write_bundle(tmp_path / "bundle.yml")
+
+    (tmp_path / "target").mkdir()
+    target = ReqFolder(rootdir=tmp_path / "target")
+    files = target.extract_bundle(bundle_path)
+
+    assert len(files) == 5
+    for name, requirement in REQUIREMENTS.items():
+        assert ReqFile(path=target.rootdir / name).read() == requirement
+
+    with BundleWriter(bundle_path) as bundle:
+        bundle.add("../outside.yml", Requirement())
+    with pytest.raises(DataBaseError):
+        target.extract_bundle(bundle_path)
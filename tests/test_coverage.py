@@ -0,0 +1,80 @@
+import io
+import numpy as np
+import pytest
+from reqpy import Requirement, ReqFile
+from reqpy.coverage import CoverageMatrix
+
+BRAKE = "requirements/Brake_system.yml"
+ENGINE = "requirements/Engine_power.yml"
+LIGHT = "requirements/info/Light_level.yml"
+
+
+@pytest.fixture
+def req_folder(req_folder):
+    for name in (BRAKE, ENGINE, LIGHT):
+        ReqFile(path=req_folder.rootdir / name).write(
+            Requirement(title="Some title"))
+    return req_folder
+
+
+def test_queries(req_folder):
+    coverage = CoverageMatrix.from_folder(req_folder, [
+        (BRAKE, "test_brake"), (BRAKE, "test_system"),
+        (LIGHT, "test_system"), (BRAKE, "test_brake")])
+
+    assert coverage.shape == (3, 2)
+    assert coverage.matrix.nnz == 3
+    assert coverage.uncovered() == [ENGINE]
+    assert coverage.tests_of(BRAKE) == ["test_brake", "test_system"]
+    assert coverage.tests_of(ENGINE) == []
+    assert sorted(coverage.requirements_of("test_system")) == [BRAKE, LIGHT]
+    with pytest.raises(KeyError):
+        coverage.tests_of("unknown")
+
+    assert coverage.folder_coverage() == {
+        "requirements": (1, 2, 0.5),
+        "requirements/info": (1, 1, 1.0),
+    }
+
+    # links added after a query
+    coverage.add_links([(ENGINE, "test_engine"), ("new.yml", "test_new")])
+    assert coverage.uncovered() == []
+    assert coverage.requirements_of("test_engine") == [ENGINE]
+    assert coverage.shape == (4, 4)
+
+
+def test_export_and_save(req_folder, tmp_path):
+    coverage = CoverageMatrix.from_folder(
+        req_folder, [(BRAKE, "test_brake"), (BRAKE, "test_system")])
+
+    stream = io.StringIO()
+    assert coverage.export(stream) == 4
+    rows = stream.getvalue().splitlines()
+    assert rows[0] == "requirement,test"
+    assert f"{ENGINE}," in rows
+
+    path = CoverageMatrix.default_path(req_folder)
+    path.parent.mkdir(exist_ok=True)
+    coverage.save(path)
+    loaded = CoverageMatrix.load(path)
+    assert loaded.requirements == coverage.requirements
+    assert loaded.tests == coverage.tests
+    assert (loaded.matrix != coverage.matrix).nnz == 0
+
+    # any file name is kept (no .npz suffix appended)
+    other = tmp_path / "coverage.matrix"
+    coverage.save(other)
+    assert CoverageMatrix.load(other).tests == coverage.tests
+    assert sorted(p.name for p in tmp_path.glob("coverage*")) == \
+        ["coverage.matrix"]
+
+
+def test_large_matrix_stays_sparse():
+    rng = np.random.default_rng(0)
+    requirements = [f"requirements/r{i}.yml" for i in range(20_000)]
+    coverage = CoverageMatrix(requirements)
+    rows = rng.integers(0, 10_000, 50_000)
+    coverage.add_links((requirements[row], f"test_{row % 3000}")
+                       for row in rows)
+    assert coverage.matrix.nnz <= 50_000
+    assert len(coverage.uncovered()) >= 10_000
@@ -0,0 +1,201 @@
+import io
+from pathlib import Path
+import pytest
+from reqpy import Requirement, ReqFile
+from reqpy import events, transaction
+from reqpy.database import ReqFolder
+from reqpy.events import (EVENTS, Changelog, EventBus, FileDeleted,
+                          FileRenamed, FileWritten, FolderCleaned, coalesce)
+from reqpy.interchange import import_requirements
+
+A, B, C = Path("/db/requirements/a.yml"), Path("/db/requirements/b.yml"), \
+    Path("/db/requirements/c.yml")
+
+
+@pytest.fixture(autouse=True)
+def isolated_bus(monkeypatch):
+    monkeypatch.setattr(EVENTS, "_subscribers", [])
+    monkeypatch.setattr(events, "_ATTACHED", {})
+
+
+@pytest.fixture
+def received():
+    batches = []
+    EVENTS.subscribe(batches.append)
+    return batches
+
+
+@pytest.mark.parametrize("batch, expected", [
+    ([FileWritten(A, True), FileWritten(A, False)], [FileWritten(A, True)]),
+    ([FileWritten(A, True), FileDeleted(A)], []),
+    ([FileWritten(A, False), FileDeleted(A)], [FileDeleted(A)]),
+    ([FileWritten(A, True), FileRenamed(B, A)], [FileWritten(B, True)]),
+    ([FileRenamed(B, A), FileRenamed(C, B)], [FileRenamed(C, A)]),
+    ([FileRenamed(B, A), FileRenamed(A, B)], []),
+    ([FileRenamed(B, A), FileDeleted(B)], [FileDeleted(A)]),
+    ([FileWritten(A, False), FileRenamed(B, A), FileWritten(B, False)],
+     [FileWritten(A, False), FileRenamed(B, A), FileWritten(B, False)]),
+    ([FileWritten(A, True), FileWritten(B, False), FileWritten(A, False)],
+     [FileWritten(B, False), FileWritten(A, True)]),
+    ([FileWritten(A, False), FileRenamed(B, Path("/other/b.yml")),
+      FolderCleaned(Path("/db/requirements"))],
+     [FileRenamed(B, Path("/other/b.yml")),
+      FolderCleaned(Path("/db/requirements"))]),
+])
+def test_coalesce(batch, expected):
+    assert coalesce(batch) == expected
+
+
+def test_event_bus():
+    bus = EventBus()
+    batches = []
+    bus.subscribe(batches.append)
+    bus.emit(FileWritten(A, True))
+    with bus.batch():
+        bus.emit(FileWritten(B, True))
+        with bus.batch():
+            bus.emit(FileWritten(B, False))
+        with bus.muted():
+            bus.emit(FileDeleted(C))
+        assert len(batches) == 1
+    assert batches == [[FileWritten(A, True)], [FileWritten(B, True)]]
+
+    bus.unsubscribe(batches.append)
+    bus.emit(FileDeleted(A))
+    assert len(batches) == 2
+
+
+def test_failing_subscriber(req_folder, received, caplog):
+    def failing(batch):
+        raise RuntimeError("subscriber failure")
+
+    EVENTS.subscribe(failing)
+    path = req_folder.rootdir / "requirements/Brake_pad.yml"
+    ReqFile(path=path).write(Requirement(title="Brake pad"))
+
+    # the write succeeds, the other subscribers are called
+    assert ReqFile(path=path).read().title == "Brake pad"
+    assert received == [[FileWritten(path, True)]]
+    assert "subscriber failure" in caplog.text
+
+
+def test_transaction_events_after_sync(req_folder, monkeypatch):
+    synced = []
+    monkeypatch.setattr(transaction, "_fsync",
+                        lambda path, flags: synced.append(path))
+    EVENTS.subscribe(lambda batch: synced.append("delivered"))
+
+    with req_folder.transaction() as tx:
+        tx.write("requirements/First_title.yml",
+                 Requirement(title="First title"))
+
+    assert synced[-1] == "delivered" and len(synced) == 3
+
+
+def test_file_events(req_folder, received):
+    path = req_folder.rootdir / "requirements/Title_to_rename.yml"
+    ReqFile(path=path).write(Requirement(title="Brake pad"))
+    ReqFile(path=path).write(Requirement(title="Brake pad"))
+    new_path = ReqFile(path=path).rename_file()
+    req_folder.clean_dirs()
+
+    assert received == [
+        [FileWritten(path, True)],
+        [FileWritten(path, False)],
+        [FileRenamed(new_path, path)],
+        # the sub-folders are removed with the main folder
+        [FolderCleaned(req_folder.rootdir / "requirements")],
+    ]
+
+
+def test_bulk_events(req_folder, received):
+    with req_folder.transaction() as tx:
+        tx.write("requirements/First_title.yml",
+                 Requirement(title="First title"))
+        tx.write("requirements/Second_title.yml",
+                 Requirement(title="Second title"))
+    assert len(received) == 1 and len(received[0]) == 2
+
+    received.clear()
+    stream = io.StringIO("".join(
+        f'{{"title": "Imported number {index}"}}\n' for index in range(5)))
+    result = import_requirements(req_folder, stream, workers=2,
+                                 chunk_size=2)
+    # one batch per chunk, emitted by the parent process
+    assert [len(batch) for batch in received] == [2, 2, 1]
+    assert [event.path for batch in received for event in batch] == \
+        result.files
+
+
+def test_changelog(req_folder, tmp_path):
+    changelog = req_folder.enable_changelog()
+    assert changelog.last_sequence == 0
+    for index in range(3):
+        ReqFile(path=req_folder.rootdir /
+                f"requirements/Title_{index}.yml").write(
+            Requirement(title=f"Title number {index}"))
+    # files of other databases are not recorded
+    ReqFile(path=tmp_path / "Outside.yml").write(
+        Requirement(title="Outside title"))
+
+    records = list(changelog.read())
+    assert [record.sequence for record in records] == [1, 2, 3]
+    assert records[0].event == FileWritten(
+        req_folder.rootdir.absolute() / "requirements/Title_0.yml", True)
+    assert [record.sequence for record in changelog.read(since=2)] == [3]
+
+    # after a restart: the changelog is attached by the ReqFolder
+    events._ATTACHED.clear()
+    EVENTS._subscribers.clear()
+    ReqFolder(rootdir=req_folder.rootdir)
+    req_folder.clean_dirs()
+    assert changelog.last_sequence == 4
+    assert list(changelog.read(3))[0].event == FolderCleaned(
+        req_folder.rootdir.absolute() / "requirements")
+
+
+def test_changelog_catch_up(tmp_path):
+    changelog = Changelog(tmp_path)
+    for start in range(0, 2000, 100):
+        changelog.append([FileWritten(tmp_path / f"requirements/{index}.yml",
+                                      False)
+                          for index in range(start, start + 100)])
+    assert changelog.last_sequence == 2000
+    for since in (0, 1, 999, 1500, 1999, 2000):
+        records = list(changelog.read(since))
+        assert [record.sequence for record in records] == \
+            list(range(since + 1, 2001))
+    assert list(changelog.read(1234))[0].event.path.name == "1234.yml"
+
+
+def test_changelog_torn_and_corrupted_lines(tmp_path):
+    changelog = Changelog(tmp_path)
+    changelog.append([FileWritten(tmp_path / "requirements/a.yml", True)])
+    with open(changelog.path, "ab") as file:
+        file.write(b"not json\n")
+    changelog.append([FileWritten(tmp_path / "requirements/b.yml", True)])
+    with open(changelog.path, "ab") as file:
+        file.write(b'{"seq": 3, "type": "writ')  # crash of a writer
+
+    assert [record.sequence for record in changelog.read()] == [1, 2]
+
+    assert changelog.append(
+        [FileDeleted(tmp_path / "requirements/a.yml")]) == 3
+    assert [record.event for record in changelog.read(1)] == [
+        FileWritten(tmp_path / "requirements/b.yml", True),
+        FileDeleted(tmp_path / "requirements/a.yml"),
+    ]
+    assert changelog.path.read_bytes().endswith(b"}\n")
+
+
+def test_changelog_attached_by_file_events(req_folder):
+    changelog = req_folder.enable_changelog()
+    # a process which only uses ReqFile
+    events._ATTACHED.clear()
+    EVENTS._subscribers.clear()
+
+    path = req_folder.rootdir / "requirements/Title_0.yml"
+    ReqFile(path=path).write(Requirement(title="Title number 0"))
+
+    assert [record.event for record in changelog.read()] == [
+        FileWritten(path.absolute(), True)]
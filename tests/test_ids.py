@@ -0,0 +1,163 @@
+import pytest
+from concurrent.futures import ThreadPoolExecutor
+from reqpy import Requirement, ReqFile
+from reqpy.__settings import FolderStructure, IdSettings, LayoutSettings
+from reqpy.database import DataBaseError, ReqFolder
+from reqpy.ids import BloomFilter, IdIndex, normalize_title
+
+
+def test_normalize_title():
+    assert normalize_title("Brake  System") == "brake system"
+    assert normalize_title("Brake_system") == normalize_title("brake system")
+
+
+def test_bloom_filter():
+    bloom = BloomFilter(size=1024, hashes=5)
+    keys = [f"title {i}" for i in range(50)]
+    for key in keys:
+        bloom.add(key)
+    assert all(key in bloom for key in keys)
+    false_positives = sum(f"other {i}" in bloom for i in range(1000))
+    assert false_positives < 100
+
+    restored = BloomFilter(bloom.size, bloom.hashes, bloom.to_bytes())
+    assert all(key in restored for key in keys)
+
+
+def test_allocate_monotonic(tmp_path):
+    index = IdIndex(tmp_path)
+    assert list(index.allocate()) == [1]
+    assert list(index.allocate(3)) == [2, 3, 4]
+    assert list(IdIndex(tmp_path).allocate()) == [5]
+
+
+def test_allocate_concurrent(tmp_path):
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        ids = list(executor.map(
+            lambda _: IdIndex(tmp_path).allocate()[0], range(40)))
+    assert sorted(ids) == list(range(1, 41))
+
+
+def test_create_requirement(req_folder):
+    req_file = req_folder.create_requirement(
+        Requirement(title="Brake system"))
+    assert req_file.read().identifier == 1
+    assert req_file.path.parent.name == FolderStructure.main_folder
+
+    second = req_folder.create_requirement(Requirement(title="Engine power"))
+    assert second.read().identifier == 2
+
+    assert req_folder.get_by_id(1) == req_file
+    assert req_folder.get_by_id(3) is None
+    assert req_folder.get_by_title("brake_SYSTEM") == req_file
+    assert req_folder.get_by_title("Unknown title") is None
+
+
+def test_create_duplicate_title(req_folder):
+    req_folder.create_requirement(Requirement(title="Brake system"))
+    with pytest.raises(DataBaseError):
+        req_folder.create_requirement(Requirement(title="brake  System"))
+
+
+def test_index_shared_between_processes(req_folder):
+    req_folder.create_requirement(Requirement(title="Brake system"))
+    other = ReqFolder(rootdir=req_folder.rootdir)
+    other.create_requirement(Requirement(title="Engine power"))
+
+    # the first instance reloads the index saved by the other one
+    assert req_folder.get_by_title("Engine power").read().identifier == 2
+    with pytest.raises(DataBaseError):
+        req_folder.create_requirement(Requirement(title="Engine power"))
+
+
+def test_rebuild(req_folder):
+    req_folder.create_requirement(Requirement(title="Brake system"))
+    ReqFile(path=req_folder.rootdir / "requirements/Engine_power.yml").write(
+        Requirement(title="Engine power", identifier=7))
+    ReqFile(path=req_folder.rootdir / "requirements/No_identifier.yml").write(
+        Requirement(title="No identifier"))
+
+    ids = req_folder.rebuild_id_index()
+    assert len(ids) == 2
+    assert req_folder.get_by_id(7).read().title == "Engine power"
+    # the counter continues after the found IDs
+    created = req_folder.create_requirement(Requirement(title="Gear ratio"))
+    assert created.read().identifier == 8
+
+
+def test_rebuild_reports_errors(req_folder):
+    for name, title, identifier in [("Brake_system", "Brake system", 1),
+                                    ("Brake__system", "Brake  system", 2),
+                                    ("Engine_power", "Engine power", 1),
+                                    ("Gear_ratio", "Gear ratio", 3)]:
+        ReqFile(path=req_folder.rootdir / f"requirements/{name}.yml").write(
+            Requirement(title=title, identifier=identifier))
+    (req_folder.rootdir / "requirements/Broken.yml").write_text(
+        "title: Broken\nidentifier: one\n")
+    errors = []
+
+    ids = req_folder.rebuild_id_index(
+        on_error=lambda file, error: errors.append(file.name))
+
+    assert len(ids) == 2
+    assert sorted(errors) == ["Brake__system.yml", "Broken.yml",
+                              "Engine_power.yml"]
+    assert req_folder.create_requirement(
+        Requirement(title="Steering")).read().identifier == 4
+
+
+def test_index_follows_migration(req_folder):
+    req_folder.create_requirement(Requirement(title="Brake system"))
+
+    req_folder.migrate_layout(LayoutSettings.sharded)
+
+    path = req_folder.get_by_id(1).path
+    assert path.is_file()
+    assert ReqFolder(rootdir=req_folder.rootdir).get_by_id(1).path == path
+
+
+def test_index_follows_retitle(req_folder):
+    req_file = req_folder.create_requirement(
+        Requirement(title="Brake system"))
+
+    req_file.write(req_file.read().copy(update={"title": "Braking system"}))
+    new_path = req_file.rename_file()
+
+    assert req_folder.get_by_title("Braking system").path == new_path
+    assert req_folder.get_by_id(1).path == new_path
+    created = req_folder.create_requirement(Requirement(title="Brake system"))
+    assert created.read().identifier == 2
+
+
+def test_index_follows_transactions(req_folder):
+    req_file = req_folder.create_requirement(
+        Requirement(title="Brake system"))
+
+    with req_folder.transaction() as tx:
+        tx.delete(req_file.path)
+        tx.write("requirements/Engine_power.yml",
+                 Requirement(title="Engine power", identifier=9))
+
+    assert req_folder.get_by_id(1) is None
+    assert req_folder.get_by_title("Engine power").read().identifier == 9
+    created = req_folder.create_requirement(Requirement(title="Brake system"))
+    assert created.read().identifier == 10
+
+
+def test_bloom_grows(tmp_path):
+    index = IdIndex(tmp_path)
+    count = IdSettings.bloom_bits // IdSettings.bits_per_title + 10
+    for identifier in range(count):
+        index.add(identifier, f"title {identifier}",
+                  tmp_path / f"{identifier}.yml")
+    assert index._bloom.size > IdSettings.bloom_bits
+    assert all(index.has_title(f"title {i}") for i in range(0, count, 97))
+
+    index.remove(0)
+    assert not index.has_title("title 0")
+
+
+def test_file_without_identifier_unchanged():
+    document = ReqFile.to_yaml(Requirement(title="Brake system"))
+    assert "identifier" not in document
+    assert ReqFile.from_yaml(document).identifier is None
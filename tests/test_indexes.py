@@ -0,0 +1,129 @@
+import os
+import pytest
+from datetime import datetime
+from reqpy import Requirement, ReqFile
+from reqpy.database import ReqFolder
+from reqpy.indexes import DateIndex, RequirementIndex, StatusIndex
+
+
+def write(req_folder, title, status, day):
+    path = req_folder.get_requirement_path(title.replace(" ", "_") + ".yml")
+    ReqFile(path=path).write(Requirement(
+        title=title, validation_status=status,
+        creation_date=datetime(2026, 1, day)))
+    return path
+
+
+def test_status_index():
+    index = StatusIndex(capacity=8)
+    index.set(0, "VALID")
+    index.set(3, "INVALID")
+
+    with pytest.raises(IndexError):
+        index.set(9, "UNVALID")  # out of capacity
+    index.grow(32)
+    index.set(9, "UNVALID")
+    index.set(16, "UNVALID")
+
+    selected = index.select("unvalid", "INVALID")
+    assert selected.dtype.name == "uint8"
+    assert list(selected[:3]) == [0b00010000, 0b01000000, 0b10000000]
+
+    index.set(3, None)
+    assert not index.select("INVALID").any()
+
+    with pytest.raises(ValueError):
+        index.select("UNKNOWN")
+
+
+def test_date_index():
+    index = DateIndex()
+    for row, date in enumerate([30, 10, 20, 10]):
+        index.add(row, date)
+
+    assert index.select() == [1, 3, 2, 0]
+    assert index.select(10, 30) == [1, 3, 2]
+    assert index.select(start=15) == [2, 0]
+
+    index.remove(3, 10)
+    assert index.select(end=20) == [1]
+
+    with pytest.raises(ValueError):
+        index.remove(3, 10)
+
+    assert DateIndex([(30, 0), (10, 1), (20, 2)]).select(end=30) == [1, 2]
+
+
+def test_filter(req_folder):
+    valid = write(req_folder, "Brake system", "VALID", 1)
+    unvalid = write(req_folder, "Engine power", "UNVALID", 2)
+    invalid = write(req_folder, "Wheel count", "INVALID", 3)
+
+    index = req_folder.get_index()
+
+    assert len(index) == 3
+    assert set(index.filter()) == {valid, unvalid, invalid}
+    assert set(index.filter(["UNVALID", "INVALID"])) == {unvalid, invalid}
+    assert index.filter(start=datetime(2026, 1, 2)) == [unvalid, invalid]
+    assert index.filter(["VALID", "INVALID"],
+                        end=datetime(2026, 1, 3)) == [valid]
+
+
+def test_incremental_refresh_and_persistence(req_folder):
+    brake = write(req_folder, "Brake system", "VALID", 1)
+    engine = write(req_folder, "Engine power", "UNVALID", 2)
+    req_folder.get_index()
+
+    # update, delete and create files
+    ReqFile(path=brake).write(Requirement(
+        title="Brake system", validation_status="INVALID",
+        creation_date=datetime(2026, 1, 5)))
+    stat = os.stat(brake)
+    os.utime(brake, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000))
+    engine.unlink()
+    wheel = write(req_folder, "Wheel count", "UNVALID", 3)
+
+    index = req_folder.get_index()
+    assert index.filter(["INVALID"]) == [brake]
+    assert index.filter(["UNVALID"]) == [wheel]
+    assert engine not in index
+
+    # a new ReqFolder loads the persisted index
+    loaded = RequirementIndex.load(req_folder.rootdir)
+    assert len(loaded) == 2
+    assert loaded.filter(start=datetime(2026, 1, 4)) == [brake]
+    assert ReqFolder(rootdir=req_folder.rootdir).get_index().filter(
+        ["UNVALID"]) == [wheel]
+
+
+def test_unreadable_files_are_skipped(req_folder):
+    brake = write(req_folder, "Brake system", "VALID", 1)
+    bad = req_folder.get_requirement_path("bad.yml")
+    bad.write_text("title: [unclosed\n")
+    text_date = req_folder.get_requirement_path("Text_date.yml")
+    text_date.write_text("title: Text date\ncreation_date: '2026-01-04T00:00:00'\n")
+    bad_date = req_folder.get_requirement_path("Bad_date.yml")
+    bad_date.write_text("title: Bad date\ncreation_date: yesterday\n")
+
+    errors = []
+    index = req_folder.get_index(
+        on_error=lambda file, error: errors.append(file))
+
+    assert sorted(errors) == sorted([bad, bad_date])
+    assert set(index.errors) == {bad, bad_date}
+    assert set(index.filter()) == {brake, text_date}
+    assert index.filter(start=datetime(2026, 1, 3)) == [text_date]
+
+    # unchanged: reported again without being read; fixed: indexed
+    errors.clear()
+    req_folder.get_index(on_error=lambda file, error: errors.append(file))
+    assert sorted(errors) == sorted([bad, bad_date])
+    bad.write_text("title: Fixed file\nvalidation_status: INVALID\n")
+    bad_date.unlink()
+    index = req_folder.get_index()
+    assert index.errors == {}
+    assert index.filter(["INVALID"]) == [bad]
+
+    # an indexed file which becomes unreadable is removed
+    brake.write_text("title: [unclosed\n")
+    assert brake not in req_folder.get_index()
@@ -0,0 +1,160 @@
+import io
+import json
+import pytest
+from datetime import datetime
+from click.testing import CliRunner
+from reqpy import Requirement, ReqFile
+from reqpy.__main__ import cli
+from reqpy.__settings import LayoutSettings
+from reqpy.database import ReqFolder
+from reqpy.interchange import (export_requirements, group_requirements,
+                               import_requirements)
+
+
+@pytest.fixture
+def req_folder(req_folder):
+    for i in range(3):
+        ReqFile(path=req_folder.get_requirement_path(f"Title_number_{i}.yml")).write(
+            Requirement(title=f"Title number {i}", detail=f"Line {i}\nend",
+                        validation_status="VALID",
+                        creation_date=datetime(2026, 1, i + 1)))
+    return req_folder
+
+
+@pytest.fixture
+def target(tmp_path):
+    (tmp_path / "target").mkdir()
+    target = ReqFolder(rootdir=tmp_path / "target")
+    target.create_dirs()
+    return target
+
+
+@pytest.mark.parametrize("format", ["jsonl", "csv"])
+def test_round_trip(req_folder, target, format):
+    stream = io.StringIO()
+    assert export_requirements(req_folder, stream, format) == 3
+
+    stream.seek(0)
+    result = import_requirements(target, stream, format, workers=1)
+
+    assert result.errors == []
+    assert sorted(p.name for p in result.files) == \
+        ["Title_number_0.yml", "Title_number_1.yml",
+         "Title_number_2.yml"]
+    for path in result.files:
+        assert ReqFile(path=path).read() == \
+            ReqFile(path=req_folder.get_requirement_path(path.name)).read()
+
+
+def test_export_projection(req_folder):
+    stream = io.StringIO()
+    export_requirements(req_folder, stream, fields=["title"])
+
+    rows = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert sorted(rows, key=str) == [{"title": f"Title number {i}"}
+                                     for i in range(3)]
+
+
+@pytest.mark.parametrize("reverse", [False, True])
+def test_export_sorted(req_folder, reverse):
+    ReqFile(path=req_folder.get_requirement_path("Oldest_title.yml")).write(
+        Requirement(title="Oldest title",
+                    creation_date=datetime(2025, 6, 1)))
+    stream = io.StringIO()
+    assert export_requirements(req_folder, stream, fields=["title"],
+                               sort_by="creation_date", reverse=reverse,
+                               memory_budget=100) == 4
+
+    titles = [json.loads(line)["title"]
+              for line in stream.getvalue().splitlines()]
+    expected = ["Oldest title"] + [f"Title number {i}" for i in range(3)]
+    assert titles == (expected[::-1] if reverse else expected)
+
+    with pytest.raises(ValueError):
+        export_requirements(req_folder, stream, sort_by="owner")
+
+
+def test_import_collisions_and_errors(target):
+    lines = [
+        {"title": "Same title"},
+        {"title": "Same title", "detail": "other"},
+        {"title": "1 invalid title"},
+        {"title": "Unknown field", "unknown": 1},
+    ]
+    stream = io.StringIO("\n".join(json.dumps(line) for line in lines) +
+                         "\n\nnot json\n")
+
+    result = import_requirements(target, stream, workers=1, chunk_size=2)
+
+    assert [p.name for p in result.files] == ["Same_title.yml",
+                                              "Same_title_2.yml"]
+    assert [number for number, _ in result.errors] == [3, 4, 6]
+    assert sorted(p.name for p in result.files[0].parent.iterdir()
+                  if p.is_file()) == ["Same_title.yml", "Same_title_2.yml"]
+
+
+@pytest.mark.parametrize("format", ["jsonl", "csv"])
+def test_import_drops_identifiers(req_folder, format):
+    req_folder.create_requirement(Requirement(title="Record with ID"))
+    stream = io.StringIO()
+    export_requirements(req_folder, stream, format)
+
+    stream.seek(0)
+    result = import_requirements(req_folder, stream, format, workers=1)
+
+    assert result.errors == []
+    assert all(ReqFile(path=path).read().identifier is None
+               for path in result.files)
+    # the IDs still point to the original files
+    assert req_folder.get_by_id(1).path.name == "Record_with_id.yml"
+    assert req_folder.rebuild_id_index().get_path(1).name == "Record_with_id.yml"
+
+
+def test_import_parallel_sharded(target):
+    target.migrate_layout(LayoutSettings.sharded)
+    stream = io.StringIO("".join(
+        json.dumps({"title": f"Requirement {i}"}) + "\n" for i in range(50)))
+
+    result = import_requirements(target, stream, workers=2, chunk_size=7)
+
+    assert result.errors == []
+    assert len(result.files) == 50
+    assert all(path == target.get_requirement_path(path.name)
+               for path in result.files)
+
+
+def test_cli(req_folder, target, tmp_path):
+    runner = CliRunner()
+    output = tmp_path / "export.csv"
+
+    result = runner.invoke(cli, ["export", "--rootdir", str(req_folder.rootdir),
+                                 "--format", "csv", "--output", str(output)])
+    assert result.exit_code == 0
+
+    result = runner.invoke(cli, ["import", str(output), "--rootdir",
+                                 str(target.rootdir), "--workers", "1"])
+    assert result.exit_code == 0
+    assert len(target.get_list_of_requirement_files()) == 3
+
+
+def test_group_requirements(req_folder):
+    ReqFile(path=req_folder.get_requirement_path("Draft_title.yml")).write(
+        Requirement(title="Draft title", validation_status="INVALID"))
+
+    groups = [(status, sorted(row["title"] for row in rows))
+              for status, rows in group_requirements(req_folder,
+                                                     memory_budget=100)]
+
+    assert groups == [("INVALID", ["Draft title"]),
+                      ("VALID", ["Title number 0", "Title number 1",
+                                 "Title number 2"])]
+    with pytest.raises(ValueError):
+        list(group_requirements(req_folder, group_by="owner"))
+
+
+def test_group_cli(req_folder):
+    result = CliRunner().invoke(cli, ["group", "--rootdir",
+                                      str(req_folder.rootdir)])
+
+    assert result.exit_code == 0
+    assert result.output == "VALID: 3\n"
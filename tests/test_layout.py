@@ -0,0 +1,139 @@
+import pytest
+from reqpy import Requirement, ReqFile
+from reqpy.__settings import FolderStructure, LayoutSettings
+from reqpy.database import ReqFolder
+from reqpy.layout import (database_rootdir, is_sharded_path, layout_path,
+                          logical_folder, read_layout, shard_folders,
+                          write_layout)
+
+
+def write_requirements(req_folder, titles, folder=FolderStructure.main_folder):
+    paths = []
+    for title in titles:
+        path = req_folder.get_requirement_path(
+            title.capitalize().replace(" ", "_") + ".yml", folder)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        ReqFile(path=path).write(Requirement(title=title))
+        paths.append(path)
+    return paths
+
+
+def test_shard_folders_are_stable():
+    folders = shard_folders("Brake_system.yml")
+    assert folders == shard_folders("Brake_system.yaml")
+    assert len(folders) == LayoutSettings.shard_levels
+    assert all(len(f) == LayoutSettings.shard_width for f in folders)
+
+
+def test_layout_path(tmp_path):
+    flat = layout_path(tmp_path, "Brake_system.yml", LayoutSettings.flat)
+    sharded = layout_path(tmp_path, "Brake_system.yml",
+                          LayoutSettings.sharded)
+
+    assert flat == tmp_path / "Brake_system.yml"
+    assert is_sharded_path(sharded)
+    assert not is_sharded_path(flat)
+    assert logical_folder(sharded) == tmp_path
+    assert logical_folder(flat) == tmp_path
+
+    with pytest.raises(ValueError):
+        layout_path(tmp_path, "Brake_system.yml", "unknown")
+
+
+def test_database_rootdir(tmp_path):
+    main_folder = tmp_path / FolderStructure.main_folder
+
+    assert database_rootdir(main_folder / "Brake_system.yml") == tmp_path
+    assert database_rootdir(
+        layout_path(main_folder / "info", "Brake_system.yml",
+                    LayoutSettings.sharded)) == tmp_path
+    assert database_rootdir(tmp_path / "Brake_system.yml") is None
+
+
+def test_default_layout_is_flat(req_folder):
+    assert req_folder.get_layout() == LayoutSettings.flat
+
+
+def test_migrate_layout_round_trip(req_folder):
+    titles = ["Brake system shall stop", "Engine power is limited"]
+    flat_paths = write_requirements(req_folder, titles)
+    info_paths = write_requirements(req_folder, ["Information only"],
+                                    "requirements/info")
+
+    moved = req_folder.migrate_layout(LayoutSettings.sharded)
+
+    assert len(moved) == 3
+    assert req_folder.get_layout() == LayoutSettings.sharded
+    assert all(is_sharded_path(path) for path in moved)
+    assert not any(path.exists() for path in flat_paths + info_paths)
+    assert len(req_folder.get_list_of_files()) == 3
+    assert req_folder.is_correct_files()
+
+    # new files follow the layout
+    path = req_folder.get_requirement_path("Brake_system_shall_stop.yml")
+    assert path in moved
+
+    # migrate back
+    req_folder.migrate_layout(LayoutSettings.flat)
+
+    assert req_folder.get_layout() == LayoutSettings.flat
+    assert all(path.exists() for path in flat_paths + info_paths)
+    main_folder = req_folder.rootdir / FolderStructure.main_folder
+    assert sorted(p.name for p in main_folder.iterdir() if p.is_dir()) == \
+        ["info", "lins"]
+
+
+def test_migrate_layout_is_idempotent(req_folder):
+    write_requirements(req_folder, ["Brake system shall stop"])
+
+    req_folder.migrate_layout(LayoutSettings.sharded)
+
+    assert req_folder.migrate_layout(LayoutSettings.sharded) == []
+
+
+def test_rename_file_keeps_sharded_layout(req_folder):
+    req_folder.migrate_layout(LayoutSettings.sharded)
+    path = req_folder.get_requirement_path("Old_name.yml")
+    path.parent.mkdir(parents=True)
+    ReqFile(path=path).write(Requirement(title="New requirement name"))
+
+    new_path = ReqFile(path=path).rename_file()
+
+    assert new_path == req_folder.get_requirement_path(
+        "New_requirement_name.yml")
+    assert new_path.exists()
+
+
+def test_rename_file_removes_empty_shards(req_folder):
+    req_folder.migrate_layout(LayoutSettings.sharded)
+    path = req_folder.get_requirement_path("Old_name.yml")
+    path.parent.mkdir(parents=True)
+    ReqFile(path=path).write(Requirement(title="New requirement name"))
+
+    ReqFile(path=path).rename_file()
+
+    main_folder = req_folder.rootdir / FolderStructure.main_folder
+    assert not path.parent.exists()
+    assert sorted(p.name for p in main_folder.iterdir() if p.is_dir()) == \
+        sorted(["info", "lins", shard_folders("New_requirement_name.yml")[0]])
+
+
+def test_layout_is_read_once(req_folder):
+    req_folder.migrate_layout(LayoutSettings.sharded)
+    write_layout(req_folder.rootdir, LayoutSettings.flat)
+
+    assert req_folder.get_layout() == LayoutSettings.sharded
+    assert ReqFolder(rootdir=req_folder.rootdir).get_layout() == \
+        LayoutSettings.flat
+
+
+def test_interrupted_migration_is_resumed_on_open(req_folder):
+    paths = write_requirements(req_folder, ["Brake system shall stop"])
+    write_layout(req_folder.rootdir, LayoutSettings.sharded, migrating=True)
+
+    reopened = ReqFolder(rootdir=req_folder.rootdir)
+
+    assert read_layout(req_folder.rootdir) == (LayoutSettings.sharded, False)
+    assert not paths[0].exists()
+    assert all(is_sharded_path(path)
+               for path in reopened.get_list_of_requirement_files())
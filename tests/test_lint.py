@@ -0,0 +1,123 @@
+import pytest
+from click.testing import CliRunner
+from reqpy import Requirement, ReqFile
+from reqpy.__main__ import cli
+from reqpy.lint import RULES, SCHEMA_RULE, lint, register_rule
+
+CALLS = []
+
+
+@register_rule("test-counter", version="1")
+def counter_rule(requirement):
+    CALLS.append(requirement.title)
+    return None
+
+
+@register_rule("test-failing", version="1")
+def failing_rule(requirement):
+    CALLS.append(requirement.title)
+    if requirement.title == "Engine power":
+        raise ZeroDivisionError("division by zero")
+    return None
+
+
+@pytest.fixture
+def req_folder(req_folder):
+    write(req_folder, "Brake system", "The brake shall stop the car")
+    write(req_folder, "Engine power", "Power is TBD")
+    CALLS.clear()
+    return req_folder
+
+
+def write(req_folder, title, detail):
+    path = req_folder.get_requirement_path(title.replace(" ", "_") + ".yml")
+    ReqFile(path=path).write(Requirement(title=title, detail=detail))
+    return path
+
+
+def test_builtin_rules(req_folder):
+    report = lint(req_folder, ["shall", "no-tbd", "max-words"], workers=1)
+
+    assert sorted((issue.path.name, issue.rule) for issue in report.issues) \
+        == [("Engine_power.yml", "no-tbd"), ("Engine_power.yml", "shall")]
+    assert report.files == 2
+    assert set(report.timings) == {"shall", "no-tbd", "max-words"}
+
+
+def test_cache(req_folder, monkeypatch):
+    report = lint(req_folder, ["test-counter", "no-tbd"], workers=1)
+    assert report.cached == 0
+    assert len(CALLS) == 2
+
+    # unchanged files are not linted again
+    report = lint(req_folder, ["test-counter", "no-tbd"], workers=1)
+    assert report.cached == 2
+    assert len(CALLS) == 2
+    assert [issue.rule for issue in report.issues] == ["no-tbd"]
+
+    # only the modified file is linted
+    write(req_folder, "Brake system", "The brake shall stop TBD")
+    report = lint(req_folder, ["test-counter", "no-tbd"], workers=1)
+    assert report.cached == 1
+    assert CALLS[2:] == ["Brake system"]
+    assert len(report.issues) == 2
+
+    # a new rule version invalidates the cache
+    monkeypatch.setitem(RULES, "test-counter",
+                        RULES["test-counter"]._replace(version="2"))
+    lint(req_folder, ["test-counter"], workers=1)
+    assert len(CALLS) == 5
+    lint(req_folder, ["test-counter"], workers=1, use_cache=False)
+    assert len(CALLS) == 7
+
+
+def test_failing_rule(req_folder):
+    report = lint(req_folder, ["no-tbd", "test-failing", "shall"],
+                  workers=1)
+
+    assert [(issue.path.name, issue.rule) for issue in report.issues] == [
+        ("Engine_power.yml", "no-tbd"),
+        ("Engine_power.yml", "shall"),
+        ("Engine_power.yml", "test-failing"),
+    ]
+    assert "ZeroDivisionError" in report.issues[-1].message
+
+    # the failure is not cached
+    report = lint(req_folder, ["test-failing"], workers=1)
+    assert report.cached == 1
+    assert CALLS[2:] == ["Engine power"]
+
+
+def test_cache_keeps_the_executed_rules(req_folder):
+    lint(req_folder, ["test-counter"], workers=1)
+    lint(req_folder, ["no-tbd"], workers=1)
+
+    report = lint(req_folder, ["test-counter"], workers=1)
+    assert report.cached == 0
+
+
+def test_unreadable_file(req_folder):
+    req_folder.get_requirement_path("Broken.yml").write_text("title: 1\n")
+
+    report = lint(req_folder, ["shall"], workers=1)
+
+    assert [issue.path.name for issue in report.issues
+            if issue.rule == SCHEMA_RULE] == ["Broken.yml"]
+
+
+def test_parallel(req_folder):
+    for i in range(20):
+        write(req_folder, f"Requirement number {i}", "TBD")
+
+    report = lint(req_folder, ["no-tbd"], workers=2)
+
+    assert len(report.issues) == 21
+
+
+def test_cli(req_folder):
+    result = CliRunner().invoke(cli, ["lint", "--rootdir",
+                                      str(req_folder.rootdir), "--rule",
+                                      "shall", "--workers", "1"])
+
+    assert result.exit_code == 1
+    assert "Engine_power.yml: [shall]" in result.output
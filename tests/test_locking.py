@@ -0,0 +1,179 @@
+import os
+import threading
+import pytest
+from concurrent.futures import ProcessPoolExecutor
+from reqpy import Requirement, ReqFile
+from reqpy.locking import (ConflictError, LockTimeout, LockUpgradeError,
+                           content_hash, open_locked, replace_file)
+
+
+def increment(path, number):
+    """read-modify-write loop with optimistic concurrency"""
+    req_file = ReqFile(path=path)
+    for _ in range(number):
+        while True:
+            requirement, expected_hash = req_file.read_with_hash()
+            requirement.detail = str(int(requirement.detail) + 1)
+            try:
+                req_file.write(requirement, expected_hash)
+                break
+            except ConflictError:
+                continue
+
+
+def test_write_returns_hash(tmp_path):
+    req_file = ReqFile(path=tmp_path / "Brake_system.yml")
+    assert req_file.content_hash() == content_hash(b"")
+
+    new_hash = req_file.write(Requirement(title="Brake system"))
+
+    assert new_hash == req_file.content_hash()
+    assert req_file.read_with_hash() == (Requirement(title="Brake system"),
+                                         new_hash)
+
+
+def test_write_conflict(tmp_path):
+    req_file = ReqFile(path=tmp_path / "Brake_system.yml")
+    requirement = Requirement(title="Brake system")
+    first_hash = req_file.write(requirement, content_hash(b""))
+
+    # another writer modifies the file
+    requirement.detail = "modified"
+    req_file.write(requirement, first_hash)
+
+    requirement.detail = "lost update"
+    with pytest.raises(ConflictError):
+        req_file.write(requirement, first_hash)
+    assert req_file.read().detail == "modified"
+
+
+def test_conflict_on_missing_file(tmp_path):
+    req_file = ReqFile(path=tmp_path / "Brake_system.yml")
+
+    with pytest.raises(ConflictError):
+        req_file.write(Requirement(title="Brake system"), "other hash")
+    assert not req_file.exists()
+
+    # deleted while waiting for the lock: the file is not created again
+    with pytest.raises(FileNotFoundError):
+        with open_locked(req_file.path, create=False):
+            pass
+    assert not req_file.exists()
+
+
+def test_lock_timeout(tmp_path):
+    path = tmp_path / "Brake_system.yml"
+    ReqFile(path=path).write(Requirement(title="Brake system"))
+
+    with open_locked(path):
+        with pytest.raises(LockTimeout):
+            ReqFile(path=path).write(Requirement(title="Brake system"),
+                                     timeout=0.05)
+        with pytest.raises(LockTimeout):
+            with open_locked(path, shared=True, timeout=0.05):
+                pass
+
+    with open_locked(path, shared=True):
+        with open_locked(path, shared=True, timeout=0.05):
+            pass
+
+
+def test_folder_lock(req_folder):
+    def lock_in_thread(shared):
+        errors = []
+
+        def target():
+            try:
+                with req_folder.lock(shared=shared, timeout=0.05):
+                    pass
+            except LockTimeout as error:
+                errors.append(error)
+
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+        return errors
+
+    with req_folder.lock(shared=True):
+        with req_folder.lock(shared=True, timeout=0.05):
+            pass
+        with pytest.raises(LockUpgradeError):
+            with req_folder.lock(timeout=0.05):
+                pass
+        assert not lock_in_thread(shared=True)
+        assert lock_in_thread(shared=False)
+
+    # reentrant exclusive lock
+    with req_folder.lock():
+        with req_folder.lock(timeout=0.05), req_folder.lock(shared=True):
+            pass
+        assert lock_in_thread(shared=True)
+    assert not lock_in_thread(shared=False)
+
+
+def test_concurrent_writers(tmp_path):
+    path = tmp_path / "Counter.yml"
+    ReqFile(path=path).write(Requirement(title="Counter value", detail="0"))
+
+    with ProcessPoolExecutor(max_workers=4) as executor:
+        list(executor.map(increment, [path] * 4, [25] * 4))
+
+    assert ReqFile(path=path).read().detail == "100"
+
+
+def test_write_replaces_the_file(tmp_path):
+    req_file = ReqFile(path=tmp_path / "Brake_system.yml")
+    req_file.write(Requirement(title="Brake system"))
+    os.chmod(req_file.path, 0o640)
+    inode = os.stat(req_file.path).st_ino
+
+    req_file.write(Requirement(title="Brake system", detail="new"))
+
+    # new file (readers keep the old complete content), same permissions
+    assert os.stat(req_file.path).st_ino != inode
+    assert os.stat(req_file.path).st_mode & 0o777 == 0o640
+    assert [path.name for path in tmp_path.iterdir()] == ["Brake_system.yml"]
+
+
+def test_lock_follows_replaced_file(tmp_path):
+    path = tmp_path / "file.txt"
+    path.write_bytes(b"old")
+    seen = []
+
+    def waiting_writer():
+        with open_locked(path) as file:
+            seen.append(file.read())
+
+    with open_locked(path):
+        thread = threading.Thread(target=waiting_writer)
+        thread.start()
+        thread.join(0.1)
+        replace_file(path, b"new")
+    thread.join()
+
+    assert seen == [b"new"]
+
+
+def test_write_waits_for_the_database_lock(req_folder):
+    req_file = ReqFile(
+        path=req_folder.rootdir / "requirements" / "Brake_system.yml")
+    errors = []
+
+    def writer():
+        try:
+            req_file.write(Requirement(title="Brake system"), timeout=0.05)
+        except LockTimeout as error:
+            errors.append(error)
+
+    with req_folder.lock():
+        req_file.write(Requirement(title="Brake system"))  # reentrant
+        req_file.path.unlink()
+        thread = threading.Thread(target=writer)
+        thread.start()
+        thread.join()
+
+    assert len(errors) == 1
+    assert not req_file.exists()
+    with req_folder.lock(shared=True):
+        writer()
+    assert req_file.exists()
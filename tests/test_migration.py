@@ -0,0 +1,226 @@
+import json
+import sys
+import pytest
+import yaml
+from click.testing import CliRunner
+from reqpy import migration
+from reqpy.__main__ import cli
+from reqpy.__settings import FolderStructure, MigrationSettings
+from reqpy.migration import (MigrationError, get_schema_version, migrate,
+                             register_migration)
+
+
+def rename_status(data):
+    # version 1: the former "status" field is renamed
+    if "status" in data:
+        data["validation_status"] = data.pop("status")
+    return data
+
+
+def strip_title(data):
+    # version 2: the titles are stripped
+    data["title"] = data["title"].strip()
+    return data
+
+
+@pytest.fixture(autouse=True)
+def migrations(monkeypatch):
+    monkeypatch.setattr(migration, "MIGRATIONS", {})
+    register_migration(1, "rename status")(rename_status)
+    register_migration(2, "strip title")(strip_title)
+    return migration.MIGRATIONS
+
+
+@pytest.fixture
+def req_folder(req_folder):
+    for index in range(6):
+        path = req_folder.rootdir / f"requirements/Requirement_{index}.yml"
+        path.write_text(yaml.safe_dump({
+            "title": f"  Requirement {index} ",
+            "detail": "The system shall work",
+            "status": "VALID",
+        }))
+    (req_folder.rootdir / "requirements/lins/Stripped.yml").write_text(
+        yaml.safe_dump({"title": "Stripped", "validation_status": "VALID"}))
+    return req_folder
+
+
+def _load(req_folder, name):
+    return yaml.safe_load(
+        (req_folder.rootdir / "requirements" / name).read_text())
+
+
+def test_register_migration_twice():
+    with pytest.raises(ValueError):
+        register_migration(1)(strip_title)
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_migrate(req_folder, workers):
+    report = migrate(req_folder, workers=workers, chunk_size=2)
+
+    assert (report.from_version, report.to_version) == (0, 2)
+    assert report.files == 7
+    assert not report.errors and not report.resumed
+    assert len(report.changed) == 6
+    assert report.changed[0][1] == ["status", "title",
+                                    "validation_status"]
+    data = _load(req_folder, "Requirement_0.yml")
+    assert data["title"] == "Requirement 0"
+    assert data["validation_status"] == "VALID"
+    assert "status" not in data
+    assert get_schema_version(req_folder.rootdir) == 2
+    assert not (req_folder.rootdir / FolderStructure.metadata_folder /
+                MigrationSettings.checkpoint_file).exists()
+
+    # already at the target version
+    assert migrate(req_folder, workers=1).files == 0
+
+
+def test_migrate_partial_then_latest(req_folder):
+    migrate(req_folder, target=1, workers=1)
+    assert get_schema_version(req_folder.rootdir) == 1
+    assert _load(req_folder, "Requirement_0.yml")["title"].startswith(" ")
+
+    report = migrate(req_folder, workers=1)
+    assert (report.from_version, report.to_version) == (1, 2)
+    assert [fields for _, fields in report.changed] == [["title"]] * 6
+
+    with pytest.raises(MigrationError):
+        migrate(req_folder, target=1)
+
+
+def test_migrate_dry_run(req_folder):
+    before = _load(req_folder, "Requirement_0.yml")
+    report = migrate(req_folder, workers=1, dry_run=True)
+
+    assert report.dry_run and len(report.changed) == 6
+    assert _load(req_folder, "Requirement_0.yml") == before
+    assert get_schema_version(req_folder.rootdir) == 0
+    assert not list((req_folder.rootdir /
+                     FolderStructure.metadata_folder).glob("migration*"))
+
+
+def test_migrate_resume(req_folder):
+    checkpoint = (req_folder.rootdir / FolderStructure.metadata_folder /
+                  MigrationSettings.checkpoint_file)
+    checkpoint.parent.mkdir(exist_ok=True)
+    checkpoint.write_text(json.dumps({
+        "from": 0, "to": 2, "last": "requirements/Requirement_2.yml"}))
+
+    report = migrate(req_folder, workers=1, chunk_size=2)
+
+    assert report.resumed
+    assert report.files == 4  # Requirement_3..5 and lins/Stripped
+    assert _load(req_folder, "Requirement_2.yml")["status"] == "VALID"
+    assert _load(req_folder, "Requirement_3.yml")["title"] == \
+        "Requirement 3"
+    assert get_schema_version(req_folder.rootdir) == 2
+
+
+@pytest.mark.parametrize("content", ['{"from": 0, "to": 2, "la', "[]"])
+def test_migrate_corrupted_checkpoint(req_folder, content):
+    checkpoint = (req_folder.rootdir / FolderStructure.metadata_folder /
+                  MigrationSettings.checkpoint_file)
+    checkpoint.parent.mkdir(exist_ok=True)
+    checkpoint.write_text(content)
+
+    report = migrate(req_folder, workers=1)
+
+    assert not report.resumed and report.files == 7
+    assert get_schema_version(req_folder.rootdir) == 2
+    assert not checkpoint.exists()
+
+
+def test_migrate_added_field(req_folder, migrations):
+    def add_owner(data):
+        data.setdefault("owner", "system team")
+        return data
+    register_migration(3, "add owner")(add_owner)
+
+    report = migrate(req_folder, workers=1)
+
+    assert not report.errors
+    data = _load(req_folder, "Requirement_0.yml")
+    assert data["owner"] == "system team"
+    assert data["validation_status"] == "VALID"
+
+
+def test_migrate_resume_other_target(req_folder):
+    checkpoint = (req_folder.rootdir / FolderStructure.metadata_folder /
+                  MigrationSettings.checkpoint_file)
+    checkpoint.parent.mkdir(exist_ok=True)
+    checkpoint.write_text(json.dumps({"from": 0, "to": 1, "last": ""}))
+
+    with pytest.raises(MigrationError):
+        migrate(req_folder, target=2, workers=1)
+
+
+def test_migrate_errors(req_folder):
+    (req_folder.rootdir / "requirements/Broken.yml").write_text(
+        yaml.safe_dump({"title": "Broken", "status": "UNKNOWN_STATUS"}))
+
+    report = migrate(req_folder, workers=1)
+
+    assert [path.name for path, _ in report.errors] == ["Broken.yml"]
+    assert len(report.changed) == 6
+    # the version is kept: all the files are migrated again at next call
+    assert get_schema_version(req_folder.rootdir) == 0
+    (req_folder.rootdir / "requirements/Broken.yml").unlink()
+    report = migrate(req_folder, workers=1)
+    assert not report.errors and not report.changed
+    assert get_schema_version(req_folder.rootdir) == 2
+
+
+def strip_title_interrupted(data):
+    # version 2, interrupted at the fourth requirement
+    if data["title"].strip() == "Requirement 3":
+        raise RuntimeError("interrupted")
+    return strip_title(data)
+
+
+def test_migrate_resume_after_errors(req_folder, migrations):
+    # sorted before the other files: fails in the first chunk
+    (req_folder.rootdir / "requirements/Broken.yml").write_text(
+        yaml.safe_dump({"title": "Broken", "status": "UNKNOWN_STATUS"}))
+    migrations[2] = migration.Migration(2, strip_title_interrupted)
+    with pytest.raises(RuntimeError):
+        migrate(req_folder, workers=1, chunk_size=2)
+
+    migrations[2] = migration.Migration(2, strip_title)
+    report = migrate(req_folder, workers=1, chunk_size=2)
+
+    assert report.resumed
+    assert [path.name for path, _ in report.errors] == ["Broken.yml"]
+    # the failed file is not migrated: the version is kept
+    assert get_schema_version(req_folder.rootdir) == 0
+    assert not (req_folder.rootdir / FolderStructure.metadata_folder /
+                MigrationSettings.checkpoint_file).exists()
+
+
+def test_cli_module(req_folder, tmp_path, monkeypatch, migrations):
+    migrations.clear()
+    monkeypatch.setattr(sys, "path", list(sys.path))
+    (tmp_path / "user_migrations.py").write_text(
+        "from reqpy.migration import register_migration\n"
+        "\n"
+        "@register_migration(1)\n"
+        "def rename_and_strip(data):\n"
+        "    data['validation_status'] = data.pop('status', 'UNVALID')\n"
+        "    data['title'] = data['title'].strip()\n"
+        "    return data\n")
+    monkeypatch.delitem(sys.modules, "user_migrations", raising=False)
+
+    result = CliRunner().invoke(cli, [
+        "migrate", "--rootdir", str(req_folder.rootdir), "--workers", "1",
+        "--module", str(tmp_path / "user_migrations.py")])
+
+    assert result.exit_code == 0, result.output
+    assert get_schema_version(req_folder.rootdir) == 1
+    assert _load(req_folder, "Requirement_0.yml")["validation_status"] == \
+        "VALID"
+    result = CliRunner().invoke(cli, [
+        "migrate", "--rootdir", str(req_folder.rootdir),
+        "--module", "missing_migrations_module"])
+    assert result.exit_code != 0
+    assert "missing_migrations_module" in result.output
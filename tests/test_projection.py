@@ -0,0 +1,95 @@
+import pytest
+from datetime import datetime
+from reqpy import Requirement, ReqFile
+from reqpy.projection import read_fields
+
+
+@pytest.fixture
+def req_file(tmp_path):
+    req_file = ReqFile(path=tmp_path / "Brake_system.yml")
+    req_file.write(Requirement(
+        title="Brake system",
+        detail="The brake\nshall stop the car",
+        validation_status="valid",
+        creation_date=datetime(2026, 1, 2, 3, 4, 5),
+    ))
+    return req_file
+
+
+def test_read_fields(req_file):
+    data = read_fields(req_file.path, ["title", "creation_date"])
+
+    assert data == {
+        "title": "Brake system",
+        "creation_date": datetime(2026, 1, 2, 3, 4, 5),
+    }
+
+
+def test_read_fields_nested_values(tmp_path):
+    path = tmp_path / "nested.yml"
+    path.write_text("a: [1, {b: 2}]\nc: {d: [x]}\ne: last\n")
+
+    assert read_fields(path, ["e"]) == {"e": "last"}
+    assert read_fields(path, ["a", "c"]) == {"a": [1, {"b": 2}],
+                                             "c": {"d": ["x"]}}
+    assert read_fields(path, ["unknown"]) == {}
+
+
+def test_reqfile_read_fields(req_file):
+    assert req_file.read_fields(["validation_status", "title"]) == {
+        "validation_status": "VALID",
+        "title": "Brake system",
+    }
+
+    with pytest.raises(ValueError):
+        req_file.read_fields(["unknown"])
+
+    with pytest.raises(FileNotFoundError):
+        ReqFile(path=req_file.path.with_name("missing.yml")).read_fields(
+            ["title"])
+
+
+def test_reqfile_read_fields_default_value(tmp_path):
+    path = tmp_path / "partial.yml"
+    path.write_text("title: Partial requirement\n")
+
+    assert ReqFile(path=path).read_fields(["validation_status"]) == {
+        "validation_status": "UNVALID"}
+
+
+def test_reqfolder_load_fields(req_folder):
+    titles = ["Brake system", "Engine power"]
+    for title in titles:
+        ReqFile(path=req_folder.get_requirement_path(title + ".yml")).write(
+            Requirement(title=title))
+    (req_folder.rootdir / "requirements" / "notes.txt").touch()
+
+    rows = req_folder.load_fields(["title", "validation_status"])
+
+    assert sorted(row["title"] for row in rows) == titles
+    assert all(row["validation_status"] == "UNVALID" for row in rows)
+    assert all(set(row) == {"path", "title", "validation_status"}
+               for row in rows)
+
+
+def test_read_fields_anchors_and_aliases(tmp_path):
+    path = tmp_path / "anchors.yml"
+    path.write_text(
+        "title: &name Brake system\n"
+        "detail: *name\n"
+        "skipped: &list [1, 2]\n"
+        "extra: {a: *list}\n"
+    )
+
+    assert read_fields(path, ["title", "detail"]) == {
+        "title": "Brake system", "detail": "Brake system"}
+    # anchor defined in a skipped value: whole file loaded
+    assert read_fields(path, ["extra"]) == {"extra": {"a": [1, 2]}}
+
+
+def test_read_fields_merge_key(tmp_path):
+    path = tmp_path / "merge.yml"
+    path.write_text("base: &base {title: Merged}\n<<: *base\ndetail: x\n")
+
+    assert read_fields(path, ["title", "detail"]) == {
+        "title": "Merged", "detail": "x"}
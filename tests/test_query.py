@@ -0,0 +1,148 @@
+from datetime import datetime
+import pytest
+import yaml
+from click.testing import CliRunner
+from reqpy import Requirement, ReqFile
+from reqpy.__main__ import cli
+from reqpy.query import (And, Not, Or, Query, QueryError, Term, parse_query,
+                         plan_query)
+
+STATUSES = ("VALID", "UNVALID", "INVALID")
+
+
+@pytest.fixture
+def req_folder(req_folder):
+    for index in range(30):
+        ReqFile(path=req_folder.rootdir /
+                f"requirements/Requirement_{index:02d}.yml").write(
+            Requirement(
+                title=f"Brake pad {index}" if index % 2
+                else f"Wheel rim {index}",
+                detail=f"Detail number {index}",
+                validation_status=STATUSES[index % 3],
+                creation_date=datetime(2025, 12, 20 + index % 10)
+                if index < 10 else datetime(2026, 1, index - 9),
+                identifier=index))
+    return req_folder
+
+
+def _titles(results):
+    return [requirement.title for _, requirement in results]
+
+
+def test_parse_query():
+    assert parse_query('status:unvalid and (title~"brake pad" or id>=3)'
+                       ) == And((
+                           Term("status", "=", "UNVALID"),
+                           Or((Term("title", "~", "brake pad"),
+                               Term("id", ">=", 3)))))
+    # not > and > or
+    assert parse_query("not status:VALID or title:a and detail:b") == Or((
+        Not(Term("status", "=", "VALID")),
+        And((Term("title", "=", "a"), Term("detail", "=", "b")))))
+    assert parse_query("created:2026-01-01").value == (
+        datetime(2026, 1, 1), datetime(2026, 1, 2))
+
+
+@pytest.mark.parametrize("text", [
+    "", "status:FOO", "owner:me", "title<3", "status:", "(title~a",
+    "title~a b", "created>=2026-13-01", "id=one", "title~a !",
+])
+def test_parse_query_errors(text):
+    with pytest.raises(QueryError):
+        parse_query(text)
+
+
+def test_plan_query():
+    plan = plan_query(parse_query(
+        'status:UNVALID and created>=2026-01-01 and created<=2026-01-05' +
+        ' and title~"brake"'))
+    assert plan.uses_index
+    assert plan.statuses == {"UNVALID"}
+    assert (plan.start, plan.end) == (datetime(2026, 1, 1),
+                                      datetime(2026, 1, 6))
+    assert plan.residual == Term("title", "~", "brake")
+
+    plan = plan_query(parse_query(
+        "(status:VALID or status:INVALID) and not status:INVALID"))
+    assert plan.statuses == {"VALID"} and plan.residual is None
+
+    plan = plan_query(parse_query("status:VALID or title~a"))
+    assert not plan.uses_index
+    assert "scan" in plan.explain()
+
+
+@pytest.mark.parametrize("text", [
+    'status:UNVALID and created>=2026-01-01 and title~"brake"',
+    "status!=VALID and created<2026-01-05",
+    "created:2025-12-25 or id>27",
+    "not (status:VALID or status:INVALID) and id<=20",
+    'detail~"number 1" and created>"2026-01-02T00:00:00"',
+    "status:VALID and status:INVALID",
+])
+def test_query_matches_scan(req_folder, text):
+    query = Query(text)
+    expected = sorted(
+        (file for file, requirement in req_folder.iter_requirements()
+         if query.matches(requirement)),
+        key=lambda file: file.name)
+    assert [file for file, _ in query.iter(req_folder)] == expected
+
+
+def test_query_pages(req_folder):
+    query = Query("status!=INVALID")
+    expected = _titles(query.iter(req_folder))
+    assert len(expected) == 20
+
+    titles, cursor, pages = [], None, 0
+    while True:
+        page = query.page(req_folder, limit=6, cursor=cursor)
+        titles += _titles(page.results)
+        pages += 1
+        cursor = page.cursor
+        if cursor is None:
+            break
+    assert titles == expected and pages == 4
+
+    # the cursor does not depend on the removed results
+    first = query.page(req_folder, limit=6)
+    first.results[0][0].unlink()
+    assert _titles(query.page(req_folder, limit=6,
+                              cursor=first.cursor).results) == \
+        expected[6:12]
+
+    with pytest.raises(QueryError):
+        Query("status:VALID").page(req_folder, cursor=first.cursor)
+    with pytest.raises(QueryError):
+        query.page(req_folder, cursor="not a cursor")
+
+
+def test_query_errors(req_folder):
+    (req_folder.rootdir / "requirements/Broken.yml").write_text("title: [")
+    errors = []
+    results = list(Query("title~brake").iter(
+        req_folder, on_error=lambda file, error: errors.append(file.name)))
+    assert len(results) == 15
+    assert errors == ["Broken.yml"]
+
+
+def test_query_errors_with_index(req_folder):
+    (req_folder.rootdir / "requirements/Broken.yml").write_text("title: [")
+    query = Query("status:UNVALID")
+    errors = []
+
+    page = query.page(req_folder, limit=5, on_error=lambda file, error:
+                      errors.append(file.name))
+    assert len(page.results) == 5
+    assert errors == ["Broken.yml"]
+    # reported once: not after the cursor
+    query.page(req_folder, cursor=page.cursor,
+               on_error=lambda file, error: errors.append(file.name))
+    assert errors == ["Broken.yml"]
+    with pytest.raises(yaml.YAMLError):
+        list(query.iter(req_folder))
+
+    result = CliRunner().invoke(cli, ["query", "status:UNVALID",
+                                      "--rootdir", str(req_folder.rootdir)])
+    assert result.exit_code == 0
+    assert "Broken.yml" in result.output
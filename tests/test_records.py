@@ -0,0 +1,73 @@
+import pickle
+import pytest
+import tracemalloc
+from datetime import datetime
+from reqpy import Requirement, RequirementRecord
+
+
+@pytest.fixture
+def requirement():
+    return Requirement(title="Brake system", detail="The brake shall stop",
+                       validation_status="valid",
+                       creation_date=datetime(2026, 1, 2))
+
+
+def test_round_trip(requirement):
+    record = RequirementRecord.from_requirement(requirement)
+
+    assert record.title == "Brake system"
+    assert record.to_requirement() == requirement
+    assert record.to_requirement(validate=False) == requirement
+
+
+def test_round_trip_with_identifier(requirement):
+    requirement.identifier = 7
+    record = RequirementRecord.from_requirement(requirement)
+
+    assert record.identifier == 7
+    assert record.to_requirement() == requirement
+    assert pickle.loads(pickle.dumps(record)).identifier == 7
+
+
+def test_record_is_immutable(requirement):
+    record = RequirementRecord.from_requirement(requirement)
+
+    assert not hasattr(record, "__dict__")
+    with pytest.raises(AttributeError):
+        record.title = "Other title"
+    with pytest.raises(AttributeError):
+        record.other = 1
+
+
+def test_status_is_interned():
+    first = RequirementRecord("Title one", "", "valid", datetime(2026, 1, 1))
+    second = RequirementRecord("Title two", "", "".join(["VAL", "ID"]),
+                               datetime(2026, 1, 1))
+
+    assert first.validation_status == "VALID"
+    assert first.validation_status is second.validation_status
+
+    with pytest.raises(ValueError):
+        RequirementRecord("Title", "", "unknown", datetime(2026, 1, 1))
+
+
+def test_equality_hash_and_pickle(requirement):
+    record = RequirementRecord.from_requirement(requirement)
+    copy = pickle.loads(pickle.dumps(record))
+
+    assert copy == record
+    assert hash(copy) == hash(record)
+    assert len({record, copy}) == 1
+
+
+def test_memory_per_record():
+    number = 10_000
+    tracemalloc.start()
+    records = [RequirementRecord("Title", "Detail", "VALID",
+                                 datetime(2026, 1, 1, 0, 0, i % 60))
+               for i in range(number)]
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert len(records) == number
+    assert memory / number <= RequirementRecord.RECORD_MEMORY_TARGET
@@ -0,0 +1,72 @@
+import re
+import pytest
+from reqpy import Requirement, ReqFile
+from reqpy.report import escape_latex, write_latex_report
+
+
+@pytest.fixture
+def req_folder(req_folder):
+    for index in range(5):
+        ReqFile(path=req_folder.rootdir /
+                f"requirements/Requirement_{index}.yml").write(
+            Requirement(title=f"Requirement {index}",
+                        detail=f"The system shall cost 100$ & 50% #{index}"))
+    ReqFile(path=req_folder.rootdir /
+            "requirements/lins/Linked_requirement.yml").write(
+        Requirement(title="Linked requirement"))
+    (req_folder.rootdir / "requirements/Broken.yml").write_text("title: [")
+    return req_folder
+
+
+def test_escape_latex():
+    assert escape_latex("a_b & 50% {x} \\") == \
+        r"a\_b \& 50\% \{x\} \textbackslash{}"
+
+
+def test_write_latex_report(req_folder, tmp_path):
+    report = write_latex_report(req_folder, tmp_path / "out",
+                                title="My spec", chapter_size=2)
+
+    assert report.requirements == 6
+    assert [path.name for path, _ in report.errors] == ["Broken.yml"]
+    # 5 requirements in the main folder (3 files) + 1 in lins (1 file)
+    assert len(report.chapters) == 4
+
+    main = report.main_file.read_text()
+    assert main.startswith("\\documentclass")
+    assert main.rstrip().endswith("\\end{document}")
+    assert "\\title{My spec}" in main
+    for chapter in report.chapters:
+        assert f"\\input{{chapters/{chapter.name}}}" in main
+
+    first = report.chapters[0].read_text()
+    assert first.startswith("\\chapter{requirements}")
+    assert "100\\$ \\& 50\\%" in first
+    assert first.count("\\section{") == 2
+    # the following files of the same folder do not repeat the chapter
+    assert "\\chapter" not in report.chapters[1].read_text()
+    assert report.chapters[3].read_text().startswith("\\chapter{lins}")
+
+
+def test_unique_labels(req_folder, tmp_path):
+    ReqFile(path=req_folder.rootdir / "requirements/lins/Requirement_0.yml"
+            ).write(Requirement(title="Requirement 0 bis"))
+    ReqFile(path=req_folder.rootdir / "requirements/Identified.yml").write(
+        Requirement(title="Identified", identifier=12))
+
+    report = write_latex_report(req_folder, tmp_path / "out")
+
+    labels = re.findall(r"\\label\{(.*)\}", "".join(
+        chapter.read_text() for chapter in report.chapters))
+    assert len(labels) == len(set(labels)) == 8
+    assert "req:path-requirements/lins/Requirement_0" in labels
+    assert "req:id-12" in labels
+
+
+def test_stale_chapters_removed(req_folder, tmp_path):
+    write_latex_report(req_folder, tmp_path / "out", chapter_size=1)
+
+    report = write_latex_report(req_folder, tmp_path / "out")
+
+    assert sorted((tmp_path / "out" / "chapters").iterdir()) == \
+        sorted(report.chapters)
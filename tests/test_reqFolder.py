@@ -72,18 +72,6 @@ from reqpy.__settings import FolderStructure, RequirementFileSettings
 from reqpy.database import ReqFolder, DataBaseError
 import shutil
 
-@pytest.fixture
-def req_folder(tmp_path):
-    # Create a temporary directory for testing
-    rootdir = tmp_path / "requirements"
-    rootdir.mkdir()
-
-    # Create the required folder structure
-    for folder in FolderStructure.folder_structure:
-        (rootdir / folder).mkdir()
-
-    return ReqFolder(rootdir=rootdir)
-
 def test_rootdir_must_be_a_folder_existing_path(req_folder):
     # Existing folder path should not raise an error
     assert ReqFolder(rootdir=req_folder.rootdir)
@@ -0,0 +1,107 @@
+import os
+from datetime import datetime
+import pytest
+from reqpy import Requirement, ReqFile
+from reqpy.rollup import RollupIndex
+
+
+def write(rootdir, name, status, date):
+    path = rootdir / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    ReqFile(path=path).write(Requirement(
+        title=path.stem.replace("_", " "), validation_status=status,
+        creation_date=date))
+    return path
+
+
+@pytest.fixture
+def req_folder(req_folder):
+    rootdir = req_folder.rootdir
+    write(rootdir, "requirements/Top_requirement.yml", "VALID",
+          datetime(2026, 1, 1))
+    write(rootdir, "requirements/info/Info_requirement.yml", "UNVALID",
+          datetime(2026, 3, 1))
+    write(rootdir, "requirements/info/sub/Deep_requirement.yml", "VALID",
+          datetime(2026, 2, 1))
+    write(rootdir, "requirements/other/Other_requirement.yml", "INVALID",
+          datetime(2026, 4, 1))
+    return req_folder
+
+
+def test_rollup(req_folder):
+    rollup = req_folder.rollup()
+    top = rollup["requirements"]
+    assert top.total == 4
+    assert top.counts == {"VALID": 2, "UNVALID": 1, "INVALID": 1}
+    assert top.latest == datetime(2026, 4, 1)
+
+    info = rollup["requirements/info"]
+    assert info.total == 2
+    assert info.counts == {"VALID": 1, "UNVALID": 1}
+    assert info.latest == datetime(2026, 3, 1)
+    assert rollup["requirements/info/sub"].total == 1
+    assert rollup["requirements/lins"].total == 0  # empty structure folder
+
+
+def test_incremental_update(req_folder, monkeypatch):
+    req_folder.rollup()
+
+    reads = []
+    original = ReqFile.read_fields
+    monkeypatch.setattr(ReqFile, "read_fields",
+                        lambda self, fields: reads.append(self.path) or
+                        original(self, fields))
+    aggregated = []
+    original_aggregate = RollupIndex._aggregate
+    monkeypatch.setattr(
+        RollupIndex, "_aggregate",
+        lambda self, node: aggregated.append(node) or
+        original_aggregate(self, node))
+
+    deep = write(req_folder.rootdir,
+                 "requirements/info/sub/Deep_requirement.yml", "INVALID",
+                 datetime(2026, 5, 1))
+    os.utime(deep, ns=(1, 1))
+    rollup = req_folder.rollup()
+
+    assert reads == [deep]
+    assert len(aggregated) == 3  # sub, info and requirements
+    assert rollup["requirements/info"].counts == {"UNVALID": 1, "INVALID": 1}
+    assert rollup["requirements"].latest == datetime(2026, 5, 1)
+    assert rollup["requirements/other"].total == 1
+
+
+def test_remove_and_reload(req_folder):
+    req_folder.rollup()
+    (req_folder.rootdir / "requirements/other/Other_requirement.yml").unlink()
+    rollup = req_folder.rollup()
+    assert "requirements/other" not in rollup
+    assert rollup["requirements"].latest == datetime(2026, 3, 1)
+    assert rollup["requirements"].counts == {"VALID": 2, "UNVALID": 1}
+
+    reloaded = RollupIndex.load(req_folder.rootdir)
+    assert reloaded.folders() == {
+        key: value for key, value in rollup.items() if value.total}
+
+
+def test_unreadable_files_are_skipped(req_folder):
+    bad = req_folder.rootdir / "requirements/info/bad.yml"
+    bad.write_text("title: [unclosed\n")
+    errors = []
+
+    rollup = req_folder.rollup(on_error=lambda file, error:
+                               errors.append(file))
+
+    assert errors == [bad]
+    assert rollup["requirements/info"].total == 2
+    index = RollupIndex(req_folder.rootdir)
+    index.refresh(req_folder.get_list_of_requirement_files())
+    assert set(index.errors) == {bad}
+    assert len(index) == 4
+
+    # a counted file which becomes unreadable is removed
+    deep = req_folder.rootdir / "requirements/info/sub/Deep_requirement.yml"
+    deep.write_text("creation_date: yesterday\n")
+    rollup = req_folder.rollup()
+    assert rollup["requirements/info"].total == 1
+    assert "requirements/info/sub" not in rollup
@@ -0,0 +1,159 @@
+import json
+import os
+import time
+import urllib.error
+import urllib.request
+import pytest
+from datetime import datetime
+from click.testing import CliRunner
+from reqpy import Requirement, ReqFile
+from reqpy.__main__ import cli
+from reqpy.server import (DaemonError, RequirementCache, RequirementDaemon,
+                          connect)
+
+
+@pytest.fixture
+def req_folder(req_folder):
+    write(req_folder, "Brake system", "VALID", 1, "The car shall stop")
+    write(req_folder, "Engine power", "UNVALID", 2, "Power is limited")
+    return req_folder
+
+
+def write(req_folder, title, status, day, detail=""):
+    path = req_folder.get_requirement_path(title.replace(" ", "_") + ".yml")
+    ReqFile(path=path).write(Requirement(
+        title=title, detail=detail, validation_status=status,
+        creation_date=datetime(2026, 1, day)))
+    return path
+
+
+def test_cache_queries(req_folder):
+    cache = RequirementCache(req_folder)
+
+    assert len(cache) == 2
+    assert [r["title"] for r in cache.search("STOP")] == ["Brake system"]
+    assert [r["title"] for r in cache.filter(["UNVALID"])] == \
+        ["Engine power"]
+    assert [r["title"] for r in cache.filter(start="2026-01-02")] == \
+        ["Engine power"]
+    assert cache.get("brake SYSTEM")["validation_status"] == "VALID"
+    assert cache.get("unknown") is None
+    with pytest.raises(ValueError):
+        cache.execute("unknown")
+
+
+def test_cache_refresh(req_folder):
+    cache = RequirementCache(req_folder)
+    assert not cache.refresh()
+
+    brake = req_folder.get_requirement_path("Brake_system.yml")
+    brake.unlink()
+    write(req_folder, "Wheel count", "INVALID", 3)
+    invalid = req_folder.get_requirement_path("Invalid.yml")
+    invalid.write_text("title: 1\n")
+
+    assert cache.refresh()
+    assert cache.get("Brake system") is None
+    assert cache.get("Wheel count") is not None
+    assert list(cache.errors) == [invalid]
+    assert cache.execute("ping")["requirements"] == 2
+
+
+def test_cache_duplicate_titles(req_folder):
+    copy = req_folder.get_requirement_path("A_copy.yml")
+    ReqFile(path=copy).write(Requirement(title="Brake system",
+                                         validation_status="INVALID"))
+    cache = RequirementCache(req_folder)
+
+    assert cache.get("Brake system")["path"] == str(copy)  # first by path
+    copy.unlink()
+    cache.refresh()
+    assert cache.get("Brake system")["validation_status"] == "VALID"
+
+
+def test_cache_validate(req_folder, tmp_path):
+    cache = RequirementCache(req_folder)
+    path = req_folder.rootdir / "Other.yml"
+    path.write_text("validation_status: unknown\n")
+
+    assert cache.validate(str(req_folder.get_requirement_path(
+        "Brake_system.yml")))["valid"]
+    result = cache.validate(str(path))
+    assert not result["valid"]
+    assert "unknown" in result["error"]
+    assert cache.validate("requirements/Brake_system.yml")["valid"]
+    with pytest.raises(ValueError):
+        cache.validate(str(tmp_path / "Other.yml"))
+    with pytest.raises(ValueError):
+        cache.validate("../Other.yml")
+
+
+def test_daemon(req_folder):
+    assert connect(req_folder.rootdir) is None
+
+    daemon = RequirementDaemon(req_folder, refresh_interval=0.05)
+    daemon.start()
+    try:
+        client = connect(req_folder.rootdir)
+        assert client is not None
+        assert client.execute("get", {"title": "Engine power"})["title"] == \
+            "Engine power"
+        assert client.execute("filter", {"status": "VALID"})[0]["title"] == \
+            "Brake system"
+        with pytest.raises(DaemonError):
+            client.execute("unknown")
+        with pytest.raises(DaemonError):
+            client.execute("get", {"unknown": 1})
+        for body in (b"[1]", b'"text"'):
+            request = urllib.request.Request(client.url, data=body)
+            with pytest.raises(urllib.error.HTTPError) as error:
+                urllib.request.urlopen(request)
+            assert error.value.code == 400
+    finally:
+        daemon.stop()
+
+
+def test_daemon_survives_refresh_errors(req_folder, caplog):
+    daemon = RequirementDaemon(req_folder, refresh_interval=0.01)
+    daemon.start()
+    try:
+        req_folder.clean_dirs()
+        time.sleep(0.1)
+        req_folder.create_dirs()
+        write(req_folder, "Wheel count", "INVALID", 3)
+        for _ in range(100):
+            if daemon.cache.get("Wheel count") is not None:
+                break
+            time.sleep(0.01)
+        assert daemon.cache.get("Wheel count") is not None
+        assert daemon.cache.get("Brake system") is None
+    finally:
+        daemon.stop()
+
+    assert "Refresh of the requirement cache failed" in caplog.text
+
+    assert connect(req_folder.rootdir) is None
+
+
+def test_cli_without_daemon(req_folder):
+    result = CliRunner().invoke(cli, ["search", "power", "--rootdir",
+                                      str(req_folder.rootdir)])
+
+    assert result.exit_code == 0
+    assert [r["title"] for r in json.loads(result.output)] == \
+        ["Engine power"]
+
+
+def test_cli_forwards_to_daemon(req_folder):
+    daemon = RequirementDaemon(req_folder, refresh_interval=60)
+    daemon.start()
+    try:
+        # the daemon answers from memory: a deleted file is still known
+        os.remove(req_folder.get_requirement_path("Engine_power.yml"))
+        result = CliRunner().invoke(cli, ["get", "Engine power", "--rootdir",
+                                          str(req_folder.rootdir)])
+    finally:
+        daemon.stop()
+
+    assert result.exit_code == 0
+    assert json.loads(result.output)["title"] == "Engine power"
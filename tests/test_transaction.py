@@ -0,0 +1,157 @@
+import json
+import threading
+import pytest
+from reqpy import Requirement, ReqFile
+from reqpy.__settings import FolderStructure, TransactionSettings
+from reqpy.database import ReqFolder
+from reqpy.locking import LockUpgradeError
+from reqpy.transaction import TransactionError, recover_journals
+
+BRAKE = "requirements/Brake_system.yml"
+ENGINE = "requirements/Engine_power.yml"
+
+
+@pytest.fixture
+def req_folder(req_folder):
+    ReqFile(path=req_folder.rootdir / BRAKE).write(Requirement(title="Brake system"))
+    return req_folder
+
+
+def journals(req_folder):
+    folder = (req_folder.rootdir / FolderStructure.metadata_folder /
+              TransactionSettings.journal_folder)
+    return list(folder.glob("*" + TransactionSettings.journal_extension))
+
+
+def test_commit(req_folder):
+    with req_folder.transaction() as tx:
+        requirement = tx.read(BRAKE)
+        requirement.validation_status = "VALID"
+        tx.write(BRAKE, requirement)
+        tx.write(req_folder.rootdir / ENGINE, Requirement(title="Engine power"))
+        tx.delete(ENGINE)
+        tx.write(ENGINE, Requirement(title="Engine power", detail="last"))
+
+        # read your writes, nothing applied before the commit
+        assert tx.read(BRAKE).validation_status == "VALID"
+        assert ReqFile(path=req_folder.rootdir / BRAKE).read() \
+            .validation_status == "UNVALID"
+        assert not (req_folder.rootdir / ENGINE).exists()
+        assert len(journals(req_folder)) == 1
+
+    assert ReqFile(path=req_folder.rootdir / BRAKE).read() \
+        .validation_status == "VALID"
+    assert ReqFile(path=req_folder.rootdir / ENGINE).read().detail == "last"
+    assert journals(req_folder) == []
+    with pytest.raises(TransactionError):
+        tx.write(BRAKE, Requirement())
+
+
+def test_rollback_on_exception(req_folder):
+    with pytest.raises(RuntimeError):
+        with req_folder.transaction() as tx:
+            tx.delete(BRAKE)
+            with pytest.raises(FileNotFoundError):
+                tx.read(BRAKE)
+            raise RuntimeError("stop")
+
+    assert (req_folder.rootdir / BRAKE).exists()
+    assert journals(req_folder) == []
+
+
+def test_running_transaction_is_not_recovered(req_folder):
+    tx = req_folder.transaction()
+    tx.delete(BRAKE)
+
+    assert recover_journals(req_folder.rootdir) == 0
+    assert len(journals(req_folder)) == 1
+    tx.rollback()
+
+
+def write_journal(req_folder, records):
+    folder = (req_folder.rootdir / FolderStructure.metadata_folder /
+              TransactionSettings.journal_folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    journal = folder / ("interrupted" + TransactionSettings.journal_extension)
+    journal.write_text("".join(json.dumps(r) + "\n" for r in records))
+
+
+def test_recovery_replays_committed_journal(req_folder):
+    write_journal(req_folder, [
+        {"op": "write", "path": ENGINE,
+         "data": ReqFile.to_yaml(Requirement(title="Engine power"))},
+        {"op": "delete", "path": BRAKE},
+        {"op": "commit"},
+    ])
+
+    # recovery when the database is opened
+    ReqFolder(rootdir=req_folder.rootdir)
+
+    assert not (req_folder.rootdir / BRAKE).exists()
+    assert ReqFile(path=req_folder.rootdir / ENGINE).read().title == \
+        "Engine power"
+    assert journals(req_folder) == []
+
+
+def test_recovery_discards_incomplete_journal(req_folder):
+    write_journal(req_folder, [{"op": "delete", "path": BRAKE}])
+
+    assert recover_journals(req_folder.rootdir) == 0
+    assert (req_folder.rootdir / BRAKE).exists()
+    assert journals(req_folder) == []
+
+
+def test_recovery_waits_for_the_database_lock(req_folder):
+    write_journal(req_folder, [{"op": "delete", "path": BRAKE},
+                               {"op": "commit"}])
+    thread = threading.Thread(target=recover_journals,
+                              args=(req_folder.rootdir,))
+
+    with req_folder.lock():
+        thread.start()
+        thread.join(0.1)
+        assert (req_folder.rootdir / BRAKE).exists()  # live writer
+    thread.join()
+
+    assert not (req_folder.rootdir / BRAKE).exists()
+    assert journals(req_folder) == []
+
+
+def test_journal_is_locked_when_visible(req_folder):
+    tx = req_folder.transaction()
+
+    # no temporary journal left, the visible journal is locked
+    assert [path.name for path in journals(req_folder)[0].parent.iterdir()
+            ] == [journals(req_folder)[0].name]
+    assert recover_journals(req_folder.rootdir) == 0
+    assert len(journals(req_folder)) == 1
+    tx.rollback()
+
+
+def test_commit_under_the_database_lock(req_folder):
+    with req_folder.lock():
+        with req_folder.transaction() as tx:
+            tx.delete(BRAKE)
+
+    assert not (req_folder.rootdir / BRAKE).exists()
+
+    with req_folder.lock(shared=True):
+        with pytest.raises(LockUpgradeError):
+            with req_folder.transaction() as tx:
+                tx.write(ENGINE, Requirement(title="Engine power"))
+
+    assert not (req_folder.rootdir / ENGINE).exists()
+    assert journals(req_folder) == []
+
+
+def test_recovery_under_the_shared_lock(req_folder):
+    write_journal(req_folder, [{"op": "delete", "path": BRAKE},
+                               {"op": "commit"}])
+
+    with req_folder.lock(shared=True):
+        ReqFolder(rootdir=req_folder.rootdir)  # no deadlock
+        assert len(journals(req_folder)) == 1
+
+    ReqFolder(rootdir=req_folder.rootdir)
+    assert not (req_folder.rootdir / BRAKE).exists()
+    assert journals(req_folder) == []
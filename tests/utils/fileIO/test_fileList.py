@@ -10,4 +10,25 @@ def test_listdirectory():
     try:
         reqpy.utils.fileIO.listdirectory(os.getcwd(),extensions=".py",excluded_folders=("venv",".git"))
     except:
-        assert False  
\ No newline at end of file
+        assert False  
+
+def test_iterdirectory(tmp_path):
+    for name in ("b.py", "a.txt", "src/x.py", "src/y.txt", "src/sub/z.py",
+                 "doc/w.py", ".git/objects/o.py", "venv/lib/v.py"):
+        file = tmp_path / name
+        file.parent.mkdir(parents=True, exist_ok=True)
+        file.touch()
+
+    result = list(reqpy.utils.fileIO.iterdirectory(
+        tmp_path, extensions=".py", excluded_folders=("venv", ".git")))
+    assert result == ["b.py", os.path.join("doc", "w.py"),
+                      os.path.join("src", "x.py"),
+                      os.path.join("src", "sub", "z.py")]
+
+    everything = list(reqpy.utils.fileIO.iterdirectory(tmp_path))
+    assert len(everything) == 8
+
+    parallel = list(reqpy.utils.fileIO.iterdirectory(
+        tmp_path, extensions=".py", excluded_folders=("venv", ".git"),
+        workers=4))
+    assert parallel == result
@@ -4,6 +4,7 @@
 
 # IMPORT
 import tempfile
+import pytest
 import reqpy
 
 
@@ -28,3 +29,54 @@ class Test_readASCIIFile():
         #assert
         data = reqpy.utils.fileIO.readASCIIFile(f1)
         assert data == content
+
+
+def test_readBytesFile(tmp_path):
+    f1 = tmp_path / "myfile.yml"
+    f1.write_bytes(b"title: abc\ndetail: def\n")
+
+    assert reqpy.utils.fileIO.readBytesFile(f1) == f1.read_bytes()
+    assert reqpy.utils.fileIO.readBytesFile(f1, size=5) == b"title"
+
+
+def test_mapFile(tmp_path):
+    f1 = tmp_path / "myfile.yml"
+    f1.write_bytes(b"title: abc\n")
+    with reqpy.utils.fileIO.mapFile(f1) as data:
+        assert bytes(data[:5]) == b"title"
+        assert len(data) == 11
+
+    empty = tmp_path / "empty.yml"
+    empty.touch()
+    with reqpy.utils.fileIO.mapFile(empty) as data:
+        assert len(data) == 0
+
+
+def test_readMany(tmp_path):
+    files = [tmp_path / f"file_{i}.txt" for i in range(50)]
+    for i, file in enumerate(files):
+        file.write_text(f"content {i}")
+
+    result = dict(reqpy.utils.fileIO.readMany(files, workers=4))
+    assert result == {file: f"content {i}".encode()
+                      for i, file in enumerate(files)}
+
+    result = dict(reqpy.utils.fileIO.readMany(files, encoding="ascii"))
+    assert result[files[3]] == "content 3"
+
+
+def test_readMany_errors(tmp_path):
+    good = tmp_path / "good.txt"
+    good.write_text("good")
+    bad = tmp_path / "bad.txt"
+    bad.write_bytes(b"\xff\xfe")
+    missing = tmp_path / "missing.txt"
+
+    with pytest.raises(UnicodeDecodeError):
+        list(reqpy.utils.fileIO.readMany([good, bad], encoding="utf-8"))
+
+    result = dict(reqpy.utils.fileIO.readMany(
+        [good, bad, missing], encoding="utf-8", returnExceptions=True))
+    assert result[good] == "good"
+    assert isinstance(result[bad], UnicodeDecodeError)
+    assert isinstance(result[missing], FileNotFoundError)
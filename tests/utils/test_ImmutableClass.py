@@ -49,3 +49,29 @@ def test_immutable():
     # test mutation
     with pytest.raises(AttributeError):
         myObject.x = 3
+
+
+class mySlottedClass(ImmutableClass):
+    __slots__ = ("x",)
+
+    def __init__(self, x):
+        object.__setattr__(self, "x", x)
+        super().__init__()
+
+
+def test_slots_do_not_grow():
+    """ test that the instantiation does not modify the class"""
+    slots = ImmutableClass.__slots__
+    myClass2(3, 4)
+    myClass2(5, 6)
+    assert ImmutableClass.__slots__ == slots
+
+
+def test_slotted_subclass():
+    """ test a subclass defining its own __slots__"""
+    myObject = mySlottedClass(3)
+
+    assert myObject.x == 3
+    assert not hasattr(myObject, "__dict__")
+    with pytest.raises(AttributeError):
+        myObject.x = 4
@@ -0,0 +1,56 @@
+import random
+import pytest
+from reqpy.utils import externalSort, groupBy
+
+
+def _items(count, seed=0):
+    rng = random.Random(seed)
+    # (key, position): the position checks the stability
+    return [(rng.randrange(50), position) for position in range(count)]
+
+
+@pytest.mark.parametrize("memoryBudget, fanIn", [
+    (1 << 30, 64),  # in memory
+    (2000, 64),  # one merge pass
+    (500, 3),  # several merge passes
+])
+@pytest.mark.parametrize("reverse", [False, True])
+def test_externalSort(tmp_path, memoryBudget, fanIn, reverse):
+    items = _items(1000)
+    result = list(externalSort(iter(items), key=lambda item: item[0],
+                               reverse=reverse, memoryBudget=memoryBudget,
+                               tmpDir=str(tmp_path), fanIn=fanIn))
+    assert result == sorted(items, key=lambda item: item[0],
+                            reverse=reverse)
+    # the spill files are deleted
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_externalSort_spill_files(tmp_path):
+    sortedItems = externalSort(range(1000, 0, -1), memoryBudget=1000,
+                               tmpDir=str(tmp_path))
+    assert next(sortedItems) == 1
+    folder, = tmp_path.iterdir()
+    assert len(list(folder.iterdir())) > 1
+    sortedItems.close()
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_externalSort_errors():
+    with pytest.raises(ValueError):
+        externalSort([], fanIn=1)
+
+
+def test_groupBy(tmp_path):
+    items = _items(500, seed=1)
+    groups = [(key, list(group)) for key, group in groupBy(
+        iter(items), key=lambda item: item[0] % 7, memoryBudget=1000,
+        tmpDir=str(tmp_path))]
+    assert [key for key, _ in groups] == list(range(7))
+    for key, group in groups:
+        assert group == [item for item in items if item[0] % 7 == key]
+
+    presorted = [(1, "a"), (1, "b"), (2, "c"), (1, "d")]
+    assert [(key, len(list(group))) for key, group in groupBy(
+        presorted, key=lambda item: item[0], presorted=True)] == \
+        [(1, 2), (2, 1), (1, 1)]
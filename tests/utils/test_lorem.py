@@ -56,3 +56,43 @@ def test_randomText_returns_string():
     """
     text = randomText()
     assert isinstance(text, str)
+
+
+def test_bulk_records_are_valid_requirements():
+    """
+    Test that the bulk generator gives valid titles and details.
+    """
+    from reqpy import Requirement
+    from reqpy.utils import BulkLorem
+
+    records = list(BulkLorem(seed=0, batch_size=100).records(250))
+    assert len(records) == 250
+    assert len({title for title, _ in records}) == 250
+    for title, detail in records:
+        requirement = Requirement(title=title, detail=detail)
+        assert requirement.title == title
+        assert detail.endswith(".")
+
+
+def test_bulk_reproducible():
+    """
+    Test that the bulk generator output only depends on the seed.
+    """
+    from reqpy.utils import BulkLorem
+
+    first = list(BulkLorem(seed=42, batch_size=50).records(120))
+    assert list(BulkLorem(seed=42, batch_size=50).records(120)) == first
+    assert list(BulkLorem(seed=42, batch_size=50).records(10)) == first[:10]
+    assert list(BulkLorem(seed=43, batch_size=50).records(120)) != first
+
+
+def test_bulk_detail_length():
+    """
+    Test that the details are cut after the last complete sentence.
+    """
+    from reqpy.utils import BulkLorem
+
+    details = BulkLorem(seed=1, trange=(8, 8),
+                        max_detail_length=300).details(20)
+    assert all(0 < len(detail) <= 300 for detail in details)
+    assert all(detail.endswith(".") for detail in details)
@@ -0,0 +1,78 @@
+import os
+import pytest
+import reqpy
+from reqpy.utils import (StatCache, cachedStat, invalidateStat,
+                         statCacheScope)
+
+
+def test_cache_hits_memory(tmp_path, monkeypatch):
+    file = tmp_path / "file.txt"
+    file.touch()
+    calls = []
+    real_stat = os.stat
+    monkeypatch.setattr(os, "stat",
+                        lambda path: calls.append(path) or real_stat(path))
+
+    with statCacheScope() as cache:
+        for _ in range(10):
+            assert cachedStat(file) is not None
+            assert cachedStat(tmp_path / "missing") is None
+        assert len(calls) == 2
+        assert len(cache) == 2
+
+    # out of a scope, no cache
+    cachedStat(file)
+    assert len(calls) == 3
+
+
+def test_invalidation(tmp_path):
+    file = tmp_path / "file.txt"
+    with statCacheScope():
+        assert cachedStat(file) is None
+        file.touch()
+        assert cachedStat(file) is None  # stale entry
+        invalidateStat(file)
+        assert cachedStat(file) is not None
+        file.unlink()
+        invalidateStat()
+        assert cachedStat(file) is None
+
+
+def test_ttl(tmp_path):
+    file = tmp_path / "file.txt"
+    cache = StatCache(ttl=0)
+    assert cache.stat(file) is None
+    file.touch()
+    assert cache.stat(file) is not None
+
+
+def test_nested_scope():
+    with statCacheScope() as outer:
+        with statCacheScope() as inner:
+            assert inner is outer
+
+
+def test_reqfolder_uses_cache(tmp_path):
+    req_folder = reqpy.ReqFolder(rootdir=tmp_path)
+    with statCacheScope():
+        assert req_folder.get_missing_drectories()
+        req_folder.create_dirs()  # invalidates the created folders
+        assert req_folder.get_missing_drectories() == []
+        reqpy.ReqFile(path=tmp_path / "requirements/Brake_system.yml").write(
+            reqpy.Requirement(title="Brake system"))
+        assert len(req_folder.get_list_of_files()) == 1
+        req_folder.clean_dirs()
+        assert req_folder.get_missing_drectories()
+
+
+def test_validate_batch(tmp_path):
+    files = [str(tmp_path / f"file_{i}.txt") for i in range(20)]
+    for file in files:
+        open(file, "w").close()
+
+    assert reqpy.utils.validation.validateFiles(files) == files
+    assert reqpy.utils.validation.validateFolders([str(tmp_path)]) == \
+        [str(tmp_path)]
+    with pytest.raises(ValueError, match="2 paths"):
+        reqpy.utils.validation.validateFiles(
+            files + [str(tmp_path), str(tmp_path / "missing")])
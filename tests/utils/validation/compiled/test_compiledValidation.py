@@ -0,0 +1,66 @@
+""" UNIT TEST FOR COMPILED VALIDATION TOOLS OF UTILS
+"""
+
+# MODULE IMPORT
+import importlib
+import pytest
+import reqpy
+from reqpy.utils.validation import (checkArguments, compileExtensionValidator,
+                                    compileInstanceValidator)
+from reqpy.utils.validation.__paths import InvalidFileExtension
+
+
+def test_compileInstanceValidator():
+    check = compileInstanceValidator((int, str))
+    assert check(3) == 3
+    assert check("a") == "a"
+    with pytest.raises(TypeError):
+        check(True)  # no inheritance
+
+    check = compileInstanceValidator(int, inheritance=True)
+    assert check(True) is True
+
+    # same behaviour as validateInstance
+    with pytest.raises(TypeError):
+        reqpy.utils.validation.validateInstance(True, int)
+
+    with pytest.raises(TypeError):
+        compileInstanceValidator("int")
+
+
+def test_compileExtensionValidator():
+    check = compileExtensionValidator((".yml", ".yaml"))
+    assert check("dir/file.yml") == "dir/file.yml"
+    for path in ("file.c", "dir.yml/file", ".yml", "file."):
+        with pytest.raises(InvalidFileExtension):
+            check(path)
+    with pytest.raises(TypeError):
+        check(3)
+    with pytest.raises(ValueError):
+        compileExtensionValidator("yml")
+
+
+def test_checkArguments():
+    @checkArguments(path=compileExtensionValidator(".yml"), size=int)
+    def read(path, size=0, other=None):
+        return path, size
+
+    assert read("file.yml", 3) == ("file.yml", 3)
+    assert read(path="file.yml") == ("file.yml", 0)
+    with pytest.raises(InvalidFileExtension):
+        read("file.c")
+    with pytest.raises(TypeError):
+        read("file.yml", size="3")
+
+    with pytest.raises(TypeError):
+        checkArguments(unknown=int)(read)
+
+
+def test_checkArguments_disabled(monkeypatch):
+    module = importlib.import_module("reqpy.utils.validation.__compiled")
+    monkeypatch.setattr(module, "ARGUMENT_CHECKS", False)
+
+    def read(path):
+        return path
+
+    assert checkArguments(path=int)(read) is read
@@ -82,3 +82,45 @@ def test_input_check_3x3():
 def assess_NP_object(X,X_expected):
     np.testing.assert_allclose(X,X_expected,atol=ABSOLUTE_TOLERANCE,rtol=RELATIVE_TOLERANCE)
 
+
+
+def test_input_check_Nx3x1():
+    from reqpy.utils.validation import input_check_Nx3x1
+
+    # (N, 3) and (N, 3, 1) arrays give views
+    value = np.arange(12, dtype=float).reshape(4, 3)
+    result = input_check_Nx3x1(value)
+    assert result.array.shape == (4, 3, 1)
+    assert np.shares_memory(result.array, value)
+    assert result.invalid.size == 0
+    assert input_check_Nx3x1(value.reshape(4, 3, 1)).array.base is not None
+
+    # bad entries are reported
+    value[1, 0] = np.nan
+    value[3, 2] = np.inf
+    assert list(input_check_Nx3x1(value).invalid) == [1, 3]
+
+    # nested lists
+    result = input_check_Nx3x1([[1, 2, 3], [4, "a", 6], [7, 8, None]])
+    assert list(result.invalid) == [1, 2]
+    assert list(input_check_Nx3x1([[1, 2, 3]]).invalid) == []
+
+    # wrong shapes and dtypes
+    for value in (np.zeros((4, 2)), np.zeros(3), [[1, 2, 3], [4, 5]],
+                  np.zeros((2, 3), dtype=complex), "a"):
+        with pytest.raises(ValueError):
+            input_check_Nx3x1(value)
+
+
+def test_input_check_Nx3x3():
+    from reqpy.utils.validation import input_check_Nx3x3
+
+    value = np.tile(np.eye(3), (5, 1, 1))
+    value[4, 1, 1] = np.nan
+    result = input_check_Nx3x3(value)
+    assert result.array is value or np.shares_memory(result.array, value)
+    assert list(result.invalid) == [4]
+
+    assert input_check_Nx3x3(np.zeros((2, 3, 3), dtype=int)).invalid.size == 0
+    with pytest.raises(ValueError):
+        input_check_Nx3x3(np.zeros((2, 3, 1)))